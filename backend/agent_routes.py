@@ -31,27 +31,31 @@ def get_current_user():
         if not token:
             return None, jsonify({'error': 'Token missing'}), 401
 
-        # Decode token
+        # Decode token; user fields come from its claims, only the token version is checked
+        from app import user_from_token
         try:
-            data_token = jwt.decode(token, current_app.config['SECRET_KEY'], algorithms=['HS256'])
+            user = user_from_token(token)
         except jwt.ExpiredSignatureError:
             return None, jsonify({'error': 'Token expired'}), 401
         except jwt.InvalidTokenError:
             return None, jsonify({'error': 'Token invalid'}), 401
 
-        # Get database and models from current app context
-        db, User, _ = get_db_and_models()
-        
-        user = db.session.get(User, data_token['user_id'])
         if not user:
             return None, jsonify({'error': 'User not found'}), 401
-            
+
+        # Lets the audit trail attribute changes made by agent routes
+        g.current_user = user
         return user, None, None
         
     except Exception as e:
         current_app.logger.error(f"Authentication error: {str(e)}")
         return None, jsonify({'error': f'Authentication failed: {str(e)}'}), 500
 
+def prerender_completed(quotation):
+    """Queue the completed quotation's summary PDF so its first download is a cache hit"""
+    from app import prerender_pdf
+    prerender_pdf(quotation)
+
 @agent_bp.route('/api/agent-registrations', methods=['POST'])
 def create_agent_registration():
     """Create a new agent registration quotation"""
@@ -217,6 +221,7 @@ def complete_agent_registration(quotation_id):
         quotation.approved_at = datetime.utcnow()
         
         db.session.commit()
+        prerender_completed(quotation)
 
         return jsonify({
             'success': True,
@@ -361,6 +366,7 @@ def update_agent_pricing(quotation_id):
         quotation.approved_at = datetime.utcnow()
         
         db.session.commit()
+        prerender_completed(quotation)
 
         return jsonify({
             'success': True,
@@ -1,14 +1,16 @@
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, request, jsonify, send_file, Response, stream_with_context, make_response, g
 from flask_sqlalchemy import SQLAlchemy
 from flask_cors import CORS, cross_origin
 from datetime import datetime, timedelta
 from werkzeug.security import generate_password_hash, check_password_hash
 from sqlalchemy.ext.mutable import MutableList
 from sqlalchemy.orm.attributes import flag_modified
-import jwt, uuid, json, traceback, logging, os
-from pdf_generator import QuotationPDFGenerator
-import threading
-import time
+from sqlalchemy.orm.exc import StaleDataError
+from sqlalchemy.exc import IntegrityError
+from jinja2 import TemplateNotFound
+import jwt, json, traceback, logging, os, io, base64, mimetypes
+from pdf_generator import TEMPLATE_NAMES, ENGINES, resolve_engine
+import pdf_generator as pdf_generator_module
 
 # **Import from our services_data module**
 from services_data import (
@@ -21,14 +23,37 @@ from services_data import (
     requires_approval_due_to_packages,
     requires_approval_due_to_customized_header
 )
+import search_index
+import service_index
+import export
+import events
+import audit
+import validity
+import maintenance
+import archive
+import migrations
+import json_provider
+import compression
+import auth_cache
+import brochure
+import pdf_cache
+import pdf_jobs
+import pdf_batch
+import quotation_view
 
 app = Flask(__name__)
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///quotations.db'
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///quotations.db')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 app.config['SECRET_KEY'] = 'dev-secret-key'
 app.config['DEBUG'] = True
 app.config['SQLALCHEMY_ECHO'] = False
 
+# orjson-backed encoding (stdlib fallback); compact output even with DEBUG on
+app.json = json_provider.FastJSONProvider(app)
+app.json.compact = True
+
+compression.init_app(app, min_size=int(os.environ.get('COMPRESSION_MIN_SIZE', compression.DEFAULT_MIN_SIZE)))
+
 logging.basicConfig(level=logging.DEBUG)
 app.logger.setLevel(logging.DEBUG)
 
@@ -38,8 +63,8 @@ db = SQLAlchemy(app)
 CORS(app,
      origins=['*'],
      methods=['GET', 'POST', 'PUT', 'DELETE', 'OPTIONS'],
-     allow_headers=['Content-Type', 'Authorization'],
-     expose_headers=['Content-Disposition'],
+     allow_headers=['Content-Type', 'Authorization', 'If-Match', 'If-None-Match'],
+     expose_headers=['Content-Disposition', 'ETag'],
      supports_credentials=True)
 
 @app.before_request
@@ -47,7 +72,7 @@ def handle_preflight():
     if request.method == "OPTIONS":
         response = jsonify()
         response.headers.add("Access-Control-Allow-Origin", "*")
-        response.headers.add('Access-Control-Allow-Headers', "Content-Type,Authorization")
+        response.headers.add('Access-Control-Allow-Headers', "Content-Type,Authorization,If-Match,If-None-Match")
         response.headers.add('Access-Control-Allow-Methods', "GET,PUT,POST,DELETE,OPTIONS")
         response.headers.add('Access-Control-Allow-Credentials', "true")
         return response
@@ -65,25 +90,42 @@ def load_pricing_data():
 
 PRICING_DATA = load_pricing_data()
 
-def cleanup_temp_pdf(filepath, delay=300):
-    def delete_file():
-        time.sleep(delay)
-        try:
-            if os.path.exists(filepath):
-                os.remove(filepath)
-                app.logger.debug(f"Cleaned up temp PDF: {filepath}")
-        except Exception as e:
-            app.logger.error(f"Failed to cleanup temp PDF {filepath}: {str(e)}")
-    
-    cleanup_thread = threading.Thread(target=delete_file)
-    cleanup_thread.daemon = True
-    cleanup_thread.start()
+DASHBOARD_PAGE_SIZE = 50
+
+pdf_files = pdf_cache.PDFCache(
+    os.environ.get('PDF_CACHE_DIR', pdf_cache.DEFAULT_DIR),
+    int(os.environ.get('PDF_CACHE_MAX_BYTES', pdf_cache.DEFAULT_MAX_BYTES))
+)
+
+pdf_job_queue = pdf_jobs.PDFJobQueue(
+    pdf_files,
+    workers=int(os.environ.get('PDF_WORKERS', pdf_jobs.DEFAULT_WORKERS)),
+    max_pending=int(os.environ.get('PDF_MAX_PENDING', pdf_jobs.DEFAULT_MAX_PENDING))
+)
+
+# Code every engine renders through: view model (prices, validity dates) and brochure pages
+PDF_RENDER_SOURCES = ('pdf_generator.py', 'quotation_view.py', 'validity.py', 'brochure.py')
+
+def pdf_template_version(variant, engine=None):
+    """Version of everything besides data and images that shapes a PDF: template, logo, engine and rendering code"""
+    engine = resolve_engine(engine)
+    base_dir = pdf_generator_module.BASE_DIR
+    logos = pdf_generator_module.find_logos(base_dir)
+    if engine == 'reportlab':
+        source = os.path.join(base_dir, 'native_pdf.py')
+    else:
+        source = os.path.join(base_dir, TEMPLATE_NAMES[variant])
+    shared = [os.path.join(base_dir, name) for name in PDF_RENDER_SOURCES]
+    return engine + ':' + pdf_cache.file_version(source, *shared, *logos)
 
 def get_next_quotation_number():
     """Generate next sequential quotation number"""
     try:
+        # Archived ids stay reserved so numbers are never reused
         existing_quotations = db.session.query(Quotation.id).filter(
             Quotation.id.like('REQ %')
+        ).union(
+            db.session.query(QuotationArchive.id).filter(QuotationArchive.id.like('REQ %'))
         ).all()
         
         if not existing_quotations:
@@ -112,6 +154,8 @@ class User(db.Model):
     password_hash = db.Column(db.String(200), nullable=False)
     role = db.Column(db.String(20), default="user")
     threshold = db.Column(db.Float, default=0.0)
+    # Embedded in tokens as "uv"; bumped when claim fields or the password change (see auth_cache.register)
+    token_version = db.Column(db.Integer, nullable=False, default=1)
 
     def set_password(self, password):
         self.password_hash = generate_password_hash(password)
@@ -129,6 +173,8 @@ class Quotation(db.Model):
     contact_mobile = db.Column(db.String(15))
     contact_email = db.Column(db.String(100))
     validity = db.Column(db.String(20), default='7 days')
+    # Derived from validity + created_at on write (see validity.register)
+    valid_until = db.Column(db.DateTime, index=True)
     payment_schedule = db.Column(db.String(10), default='50%')
     rera_number = db.Column(db.String(50))
     headers = db.Column(MutableList.as_mutable(db.JSON))
@@ -147,14 +193,21 @@ class Quotation(db.Model):
     approved_by = db.Column(db.String(100))
     approved_at = db.Column(db.DateTime)
     display_mode = db.Column(db.String(20), default='bifurcated')
+    # Bumped by SQLAlchemy on every UPDATE; backs ETags and optimistic concurrency
+    version = db.Column(db.Integer, nullable=False, default=1)
 
-    def to_dict(self):
+    __mapper_args__ = {'version_id_col': version}
+
+    @property
+    def effective_discount_percent(self):
         effective_discount = (
-            self.discount_percent if self.discount_percent > 0
+            self.discount_percent if self.discount_percent and self.discount_percent > 0
             else (self.discount_amount / (self.total_amount + self.discount_amount) * 100
                   if self.total_amount and self.discount_amount else 0)
         )
+        return round(effective_discount, 2)
 
+    def to_dict(self):
         return {
             'id': self.id,
             'developerType': self.developer_type,
@@ -165,13 +218,14 @@ class Quotation(db.Model):
             'contactMobile': self.contact_mobile,
             'contactEmail': self.contact_email,
             'validity': self.validity,
+            'validUntil': self.valid_until.isoformat() if self.valid_until else None,
             'paymentSchedule': self.payment_schedule,
             'reraNumber': self.rera_number,
             'headers': self.headers or [],
             'pricingBreakdown': self.pricing_breakdown or [],
             'totalAmount': self.total_amount,
             'discountAmount': self.discount_amount,
-            'effectiveDiscountPercent': round(effective_discount, 2),
+            'effectiveDiscountPercent': self.effective_discount_percent,
             'serviceSummary': self.service_summary,
             'createdBy': self.created_by,
             'status': self.status,
@@ -182,9 +236,141 @@ class Quotation(db.Model):
             'requiresApproval': self.requires_approval,
             'approvedBy': self.approved_by,
             'approvedAt': self.approved_at.isoformat() if self.approved_at else None,
-            'displayMode': self.display_mode or 'bifurcated'
+            'displayMode': self.display_mode or 'bifurcated',
+            'version': self.version
+        }
+
+    def to_summary_dict(self):
+        """Lightweight representation for lists and search results (no JSON blobs)"""
+        return {
+            'id': self.id,
+            'developerType': self.developer_type,
+            'projectRegion': self.project_region,
+            'developerName': self.developer_name,
+            'projectName': self.project_name,
+            'reraNumber': self.rera_number,
+            'totalAmount': self.total_amount,
+            'createdBy': self.created_by,
+            'status': self.status,
+            'createdAt': self.created_at.isoformat() if self.created_at else None,
+            'validUntil': self.valid_until.isoformat() if self.valid_until else None,
+            'requiresApproval': self.requires_approval,
+            'displayMode': self.display_mode or 'bifurcated',
+            'version': self.version
         }
 
+    def to_list_dict(self):
+        """Dashboard row: summary fields plus what status/approval badges need, without subservice prose"""
+        data = self.to_summary_dict()
+        data.update({
+            'effectiveDiscountPercent': self.effective_discount_percent,
+            'approvedBy': self.approved_by,
+            'customTerms': self.custom_terms or [],
+            'headers': [
+                {
+                    'header': header.get('header') or header.get('name'),
+                    'services': [
+                        {'id': service.get('id'), 'name': service.get('name') or service.get('label')}
+                        for service in header.get('services', []) or [] if isinstance(service, dict)
+                    ]
+                }
+                for header in self.headers or [] if isinstance(header, dict)
+            ]
+        })
+        return data
+
+class QuotationService(db.Model):
+    """Derived membership rows: one per service selected under a quotation header"""
+    __tablename__ = 'quotation_service'
+    id = db.Column(db.Integer, primary_key=True)
+    quotation_id = db.Column(db.String(50), nullable=False)
+    header_name = db.Column(db.String(200))
+    header_type = db.Column(db.String(20), nullable=False)
+    service_id = db.Column(db.String(100), nullable=False)
+    service_name = db.Column(db.String(200))
+    is_addon = db.Column(db.Boolean, default=False, nullable=False)
+
+    __table_args__ = (
+        db.Index('ix_quotation_service_quotation', 'quotation_id', 'service_id'),
+        db.Index('ix_quotation_service_service', 'service_id', 'quotation_id'),
+        db.Index('ix_quotation_service_name', 'service_name', 'quotation_id'),
+        db.Index('ix_quotation_service_header', 'header_type', 'header_name', 'quotation_id'),
+    )
+
+class QuotationEvent(db.Model):
+    """Append-only audit trail of quotation changes; rows are inserted in batches by audit.AuditWriter"""
+    __tablename__ = 'quotation_event'
+    id = db.Column(db.Integer, primary_key=True)
+    quotation_id = db.Column(db.String(50), nullable=False)
+    action = db.Column(db.String(30), nullable=False)
+    actor = db.Column(db.String(100))
+    occurred_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    version = db.Column(db.Integer)
+    changes = db.Column(db.JSON)
+    reason = db.Column(db.Text)
+
+    __table_args__ = (
+        db.Index('ix_quotation_event_quotation', 'quotation_id', 'occurred_at', 'id'),
+    )
+
+class QuotationArchive(db.Model):
+    """Closed quotations moved out of the hot table; payload is the zlib-compressed full row"""
+    __tablename__ = 'quotation_archive'
+    id = db.Column(db.String(50), primary_key=True)
+    status = db.Column(db.String(20))
+    created_by = db.Column(db.String(200))
+    developer_name = db.Column(db.String(200))
+    project_name = db.Column(db.String(200))
+    created_at = db.Column(db.DateTime, index=True)
+    archived_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    version = db.Column(db.Integer, nullable=False, default=1)
+    payload = db.Column(db.LargeBinary, nullable=False)
+
+def current_actor():
+    user = g.get('current_user') if g else None
+    return user.username if user else None
+
+audit_writer = audit.AuditWriter(
+    QuotationEvent.__table__,
+    spill_path=os.environ.get('AUDIT_SPILL_PATH', os.path.join(app.instance_path, 'audit_spill.ndjson'))
+)
+
+validity.register(Quotation)
+search_index.register(Quotation)
+service_index.register(Quotation, QuotationService)
+events.register(Quotation, db.session)
+audit.register(Quotation, db.session, audit_writer, current_actor)
+
+token_versions = auth_cache.TokenVersionCache(int(os.environ.get('AUTH_CACHE_TTL', auth_cache.DEFAULT_TTL_SECONDS)))
+auth_cache.register(User, token_versions)
+
+def quotation_etag(quotation_id, version):
+    return f"{quotation_id.replace(' ', '-')}.v{version}"
+
+def quotation_response(q, status=200):
+    response = jsonify({'success': True, 'data': q.to_dict()})
+    response.status_code = status
+    response.set_etag(quotation_etag(q.id, q.version))
+    return response
+
+def precondition_failed(q):
+    """412 for a stale If-Match; the body carries the current version so the client can reconcile"""
+    response = jsonify({
+        'error': 'Quotation was modified by someone else',
+        'message': 'Reload the quotation and re-apply your changes.',
+        'currentVersion': q.version if q else None
+    })
+    response.status_code = 412
+    if q:
+        response.set_etag(quotation_etag(q.id, q.version))
+    return response
+
+def check_if_match(q):
+    """Return a 412 response when the client's If-Match does not match the current version"""
+    if request.if_match and not compression.etag_matches(request.if_match, quotation_etag(q.id, q.version)):
+        return precondition_failed(q)
+    return None
+
 def role_required(*roles):
     from functools import wraps
     def wrapper(f):
@@ -198,26 +384,58 @@ def role_required(*roles):
                 return jsonify({"error": "Token missing"}), 401
 
             try:
-                data = jwt.decode(token, app.config['SECRET_KEY'], algorithms=["HS256"])
-                current_user = User.query.get(data["user_id"])
+                current_user = user_from_token(token)
                 if not current_user or current_user.role not in roles:
                     return jsonify({"error": "Insufficient permissions"}), 403
             except Exception as e:
                 return jsonify({"error": "Token invalid"}), 401
 
+            g.current_user = current_user
+
             return f(current_user, *args, **kwargs)
         return decorated
     return wrapper
 
 def generate_token(user):
-    payload = {
-        "user_id": user.id,
-        "username": user.username,
-        "role": user.role,
-        "exp": datetime.utcnow() + timedelta(hours=12)
-    }
+    payload = auth_cache.token_claims(user)
+    payload["exp"] = datetime.utcnow() + timedelta(hours=12)
     return jwt.encode(payload, app.config['SECRET_KEY'], algorithm="HS256")
 
+# EventSource can only send credentials in the URL, where they end up in access logs:
+# the stream takes a short-lived token that is good for nothing else
+STREAM_TOKEN_PURPOSE = "events"
+STREAM_TOKEN_SECONDS = int(os.environ.get('STREAM_TOKEN_SECONDS', 60))
+
+def generate_stream_token(user):
+    payload = auth_cache.token_claims(user)
+    payload["purpose"] = STREAM_TOKEN_PURPOSE
+    payload["exp"] = datetime.utcnow() + timedelta(seconds=STREAM_TOKEN_SECONDS)
+    return jwt.encode(payload, app.config['SECRET_KEY'], algorithm="HS256")
+
+def load_token_version(user_id):
+    return db.session.execute(db.select(User.token_version).where(User.id == user_id)).scalar()
+
+def user_from_token(token, purpose=None):
+    """
+    Authenticated user from the token's claims. Only the user's token_version is
+    checked against the database (through a short TTL cache); None if the user is gone.
+    Single-purpose tokens are only accepted where that purpose is asked for.
+    """
+    data = jwt.decode(token, app.config['SECRET_KEY'], algorithms=["HS256"])
+    if data.get("purpose") != purpose:
+        raise jwt.InvalidTokenError("Token not valid for this endpoint")
+    if "uv" not in data:
+        # Issued before tokens carried claims: load the row once more
+        user = db.session.get(User, data["user_id"])
+        return auth_cache.AuthenticatedUser.from_model(user) if user else None
+
+    version = token_versions.get(data["user_id"], load_token_version)
+    if version is None:
+        return None
+    if version != data["uv"]:
+        raise jwt.InvalidTokenError("Token revoked")
+    return auth_cache.AuthenticatedUser.from_claims(data)
+
 def token_required(f):
     from functools import wraps
     def decorator(*args, **kwargs):
@@ -229,14 +447,14 @@ def token_required(f):
             return jsonify({"error": "Token missing"}), 401
 
         try:
-            data = jwt.decode(token, app.config['SECRET_KEY'], algorithms=["HS256"])
-            current_user = User.query.get(data["user_id"])
+            current_user = user_from_token(token)
             if not current_user:
                 return jsonify({"error": "User not found"}), 401
         except Exception as e:
             app.logger.error(f"Token validation error: {str(e)}")
             return jsonify({"error": "Token invalid"}), 401
 
+        g.current_user = current_user
         return f(current_user, *args, **kwargs)
     return wraps(f)(decorator)
 
@@ -247,20 +465,192 @@ def internal_error(error):
     db.session.rollback()
     return jsonify({'error': 'Internal server error', 'message': str(error)}), 500
 
+# Dashboard column keys accepted by /api/quotations?sort=
+LIST_SORT_COLUMNS = {
+    'createdAt': Quotation.created_at,
+    'id': Quotation.id,
+    'projectName': Quotation.project_name,
+    'developerName': Quotation.developer_name,
+    'totalAmount': Quotation.total_amount,
+    'status': Quotation.status,
+    'createdBy': Quotation.created_by,
+    'approvedBy': Quotation.approved_by,
+}
+
 # Updated quotation endpoints to support display modes
 @app.route('/api/quotations', methods=['GET'])
 @token_required
 def get_quotations(current_user):
     try:
         query = Quotation.query.order_by(Quotation.created_at.desc())
+
+        # ?expired=true lists lapsed quotations, ?expired=false only those still valid;
+        # ?expiringWithin=<days> narrows to quotations lapsing soon
+        now = datetime.utcnow()
+        expired = request.args.get('expired')
+        if expired in ('true', '1'):
+            query = query.filter(db.or_(
+                Quotation.status == maintenance.EXPIRED_STATUS,
+                Quotation.valid_until < now
+            ))
+        elif expired in ('false', '0'):
+            query = query.filter(
+                Quotation.status != maintenance.EXPIRED_STATUS,
+                db.or_(Quotation.valid_until.is_(None), Quotation.valid_until >= now)
+            )
+        expiring_within = request.args.get('expiringWithin', type=int)
+        if expiring_within is not None:
+            query = query.filter(
+                Quotation.valid_until >= now,
+                Quotation.valid_until < now + timedelta(days=expiring_within)
+            )
+
+        # Dashboard search and column sort run here so they cover every page, not just the loaded ones
+        search = request.args.get('q', '').strip()
+        if search:
+            query = query.filter(db.or_(
+                Quotation.id.ilike(f"%{search}%"),
+                search_index.matching(Quotation, search)
+            ))
+        if request.args.get('requiresApproval') in ('true', '1'):
+            query = query.filter(Quotation.requires_approval == True)  # noqa: E712
+        sort = request.args.get('sort')
+        if sort:
+            column = LIST_SORT_COLUMNS.get(sort)
+            if column is None:
+                return jsonify({'error': f"Unsupported sort '{sort}'"}), 400
+            column = column.desc() if request.args.get('order', 'asc').lower() == 'desc' else column.asc()
+            query = query.order_by(None).order_by(column, Quotation.created_at.desc())
+
+        serialize = Quotation.to_list_dict if request.args.get('view') == 'list' else Quotation.to_dict
+
+        # Unpaginated by default for existing callers; page/per_page opt in
+        if 'page' not in request.args and 'per_page' not in request.args:
+            return jsonify({
+                'success': True,
+                'quotations': [serialize(q) for q in query.all()]
+            })
+
+        page = max(request.args.get('page', 1, type=int), 1)
+        per_page = min(max(request.args.get('per_page', DASHBOARD_PAGE_SIZE, type=int), 1), 200)
         return jsonify({
             'success': True,
-            'quotations': [q.to_dict() for q in query.all()]
+            'page': page,
+            'perPage': per_page,
+            'total': query.order_by(None).count(),
+            'quotations': [serialize(q) for q in query.offset((page - 1) * per_page).limit(per_page).all()]
         })
     except Exception as e:
         app.logger.error(f"Get quotations error: {str(e)}")
         return jsonify({'error': 'Failed to fetch quotations'}), 500
 
+@app.route('/api/quotations/search', methods=['GET'])
+@token_required
+def search_quotations(current_user):
+    try:
+        query_text = request.args.get('q', '').strip()
+        page = request.args.get('page', 1, type=int)
+        per_page = request.args.get('per_page', 20, type=int)
+
+        results, total = search_index.search_quotations(
+            db.session, Quotation, query_text, page=page, per_page=per_page
+        )
+        return jsonify({
+            'success': True,
+            'query': query_text,
+            'page': max(page, 1),
+            'perPage': min(max(per_page, 1), search_index.MAX_PER_PAGE),
+            'total': total,
+            'quotations': [q.to_summary_dict() for q in results]
+        })
+    except Exception as e:
+        app.logger.error(f"Search quotations error: {str(e)}")
+        return jsonify({'error': 'Failed to search quotations'}), 500
+
+@app.route('/api/quotations/by-service', methods=['GET'])
+@token_required
+def quotations_by_service(current_user):
+    try:
+        services = [s.strip() for s in request.args.getlist('service') if s.strip()]
+        match = request.args.get('match', 'all').lower()
+        header_name = request.args.get('header')
+        header_type = request.args.get('headerType')
+        addon_param = request.args.get('addon')
+        page = request.args.get('page', 1, type=int)
+        per_page = request.args.get('per_page', 20, type=int)
+
+        if match not in ('all', 'any'):
+            return jsonify({'error': "match must be 'all' or 'any'"}), 400
+        if not services and not header_name and not header_type:
+            return jsonify({'error': 'Provide at least one service, header or headerType filter'}), 400
+
+        addon = None if addon_param is None else addon_param.lower() == 'true'
+
+        results, total = service_index.quotations_with_services(
+            db.session, Quotation, QuotationService, services,
+            match=match, header_name=header_name, header_type=header_type, addon=addon,
+            page=page, per_page=per_page
+        )
+        return jsonify({
+            'success': True,
+            'page': max(page, 1),
+            'perPage': min(max(per_page, 1), service_index.MAX_PER_PAGE),
+            'total': total,
+            'quotations': [q.to_summary_dict() for q in results]
+        })
+    except Exception as e:
+        app.logger.error(f"Quotations by service error: {str(e)}")
+        return jsonify({'error': 'Failed to query quotations by service'}), 500
+
+@app.route('/api/services/co-occurrence', methods=['GET'])
+@token_required
+def services_co_occurrence(current_user):
+    try:
+        service = request.args.get('service', '').strip()
+        if not service:
+            return jsonify({'error': 'service parameter is required'}), 400
+
+        total, related = service_index.service_co_occurrence(
+            db.session, QuotationService, service,
+            header_name=request.args.get('header'),
+            limit=min(request.args.get('limit', 20, type=int), 100)
+        )
+        return jsonify({'success': True, 'service': service, 'quotations': total, 'related': related})
+    except Exception as e:
+        app.logger.error(f"Service co-occurrence error: {str(e)}")
+        return jsonify({'error': 'Failed to compute service co-occurrence'}), 500
+
+@app.route('/api/quotations/export', methods=['GET'])
+@token_required
+def export_quotations(current_user):
+    fmt = request.args.get('format', 'csv').lower()
+    if fmt not in export.EXPORT_FORMATS:
+        return jsonify({'error': f"Unsupported format '{fmt}'. Use csv, ndjson or xlsx"}), 400
+    if fmt == 'xlsx' and not export.xlsx_available():
+        return jsonify({'error': 'XLSX export requires openpyxl on the server'}), 501
+
+    try:
+        filters = {
+            'status': request.args.get('status'),
+            'created_from': export.parse_date(request.args.get('from')),
+            'created_to': export.parse_date(request.args.get('to')),
+        }
+    except ValueError:
+        return jsonify({'error': 'from/to must be ISO dates (YYYY-MM-DD)'}), 400
+
+    flatten_pricing = request.args.get('flatten', '').lower() == 'pricing'
+    chunk_size = min(max(request.args.get('chunk_size', export.DEFAULT_CHUNK_SIZE, type=int), 50), 5000)
+
+    chunks = export.export_stream(db.session, Quotation.__table__, fmt, filters,
+                                  flatten_pricing=flatten_pricing, chunk_size=chunk_size)
+    filename = f"quotations_{datetime.utcnow():%Y%m%d_%H%M%S}.{fmt}"
+
+    response = Response(stream_with_context(chunks), mimetype=export.EXPORT_FORMATS[fmt])
+    response.headers['Content-Disposition'] = f'attachment; filename={filename}'
+    response.headers['Cache-Control'] = 'no-store'
+    app.logger.info(f"Streaming {fmt} export for {current_user.username} (flatten={flatten_pricing})")
+    return response
+
 @app.route('/api/quotations', methods=['POST'])
 @token_required
 def create_quotation(current_user):
@@ -300,7 +690,7 @@ def create_quotation(current_user):
         db.session.add(quotation)
         db.session.commit()
         
-        return jsonify({'success': True, 'data': quotation.to_dict()}), 201
+        return quotation_response(quotation, 201)
         
     except Exception as e:
         db.session.rollback()
@@ -308,6 +698,175 @@ def create_quotation(current_user):
         app.logger.error(f"Traceback: {traceback.format_exc()}")
         return jsonify({'error': 'Failed to create quotation'}), 500
 
+BULK_CREATE_LIMIT = 5000
+BULK_REQUIRED_FIELDS = ['developerType', 'projectRegion', 'plotArea', 'developerName']
+# Commits retried with fresh numbers when a concurrent create takes the reserved ids
+BULK_ID_ATTEMPTS = 3
+
+def quotation_needs_approval(q, current_user):
+    """Same approval rules the pricing/terms endpoints apply one quotation at a time"""
+    if q.discount_percent and q.discount_percent > 0:
+        effective_discount = q.discount_percent
+    elif q.total_amount and q.discount_amount:
+        effective_discount = (q.discount_amount / (q.total_amount + q.discount_amount)) * 100
+    else:
+        effective_discount = 0
+
+    return bool(
+        requires_approval_due_to_packages(q.headers or []) or
+        requires_approval_due_to_customized_header(q.headers or []) or
+        (q.custom_terms and len(q.custom_terms) > 0) or
+        effective_discount > current_user.threshold
+    )
+
+def bulk_shape_error(spec):
+    """Why a bulk spec is malformed (wrong JSON types), or None"""
+    if not isinstance(spec, dict):
+        return 'each quotation must be an object'
+    if not isinstance(spec.get('headers', []), list):
+        return 'headers must be a list'
+    if not isinstance(spec.get('customTerms') or [], list):
+        return 'customTerms must be a list'
+    return None
+
+def build_bulk_quotation(spec, quotation_id, current_user, pricing_data):
+    """Build (but do not add) a Quotation from one well-formed bulk spec. Raises ValueError on bad input."""
+    missing = [f for f in BULK_REQUIRED_FIELDS if spec.get(f) in (None, '')]
+    if missing:
+        raise ValueError(f"Missing required field(s): {', '.join(missing)}")
+
+    try:
+        plot_area = float(spec['plotArea'])
+    except (TypeError, ValueError):
+        raise ValueError('plotArea must be a number')
+
+    headers = spec.get('headers', [])
+    custom_terms = [t.strip() for t in spec.get('customTerms') or [] if isinstance(t, str) and t.strip()]
+
+    q = Quotation(
+        id=quotation_id,
+        developer_type=spec['developerType'],
+        project_region=spec['projectRegion'],
+        plot_area=plot_area,
+        developer_name=spec['developerName'],
+        project_name=spec.get('projectName'),
+        contact_mobile=spec.get('contactMobile'),
+        contact_email=spec.get('contactEmail'),
+        validity=spec.get('validity', '7 days'),
+        payment_schedule=spec.get('paymentSchedule', '50%'),
+        rera_number=spec.get('reraNumber'),
+        service_summary=spec.get('serviceSummary'),
+        created_by=f"{current_user.fname or ''} {current_user.lname or ''}".strip() or current_user.username,
+        terms_accepted=bool(spec.get('termsAccepted', False)),
+        applicable_terms=spec.get('applicableTerms', []) if isinstance(spec.get('applicableTerms'), list) else [],
+        custom_terms=custom_terms,
+        display_mode=spec.get('displayMode', 'bifurcated'),
+        headers=process_headers_with_subservices(headers),
+        pricing_breakdown=[],
+        total_amount=0.0,
+        discount_amount=0.0,
+        discount_percent=0.0,
+        status='draft',
+        requires_approval=False,
+        created_at=datetime.utcnow()
+    )
+
+    if spec.get('calculatePricing', True) and headers:
+        result = calculate_enhanced_pricing(q.developer_type, q.project_region, plot_area, headers, pricing_data)
+        subtotal = float(result['summary']['subtotal'])
+
+        discount_percent = float(spec.get('discountPercent', 0) or 0)
+        discount_amount = float(spec.get('discountAmount', 0) or 0)
+        if discount_percent > 0:
+            discount_amount = round(subtotal * discount_percent / 100, 2)
+
+        q.pricing_breakdown = result['breakdown']
+        q.discount_percent = discount_percent
+        q.discount_amount = discount_amount
+        q.total_amount = round(subtotal - discount_amount, 2)
+
+        if quotation_needs_approval(q, current_user):
+            q.requires_approval = True
+            q.status = 'pending_approval'
+        else:
+            q.status = 'completed'
+            q.approved_by = current_user.username
+            q.approved_at = datetime.utcnow()
+
+    return q
+
+@app.route('/api/quotations/bulk', methods=['POST'])
+@token_required
+def bulk_create_quotations(current_user):
+    data = request.get_json(silent=True) or {}
+    specs = data.get('quotations')
+    all_or_nothing = bool(data.get('allOrNothing', False))
+
+    if not isinstance(specs, list) or not specs:
+        return jsonify({'error': 'quotations must be a non-empty list'}), 400
+    if len(specs) > BULK_CREATE_LIMIT:
+        return jsonify({'error': f'At most {BULK_CREATE_LIMIT} quotations per request'}), 400
+
+    # Malformed items reject the request; content problems are reported per item below
+    for index, spec in enumerate(specs):
+        shape_error = bulk_shape_error(spec)
+        if shape_error:
+            return jsonify({'error': f'quotations[{index}]: {shape_error}'}), 400
+
+    try:
+        # One pricing snapshot and one sequence reservation for the whole batch
+        pricing_data = load_pricing_data()
+        next_number = get_next_quotation_number()
+
+        built, indexes, errors = [], [], []
+        for index, spec in enumerate(specs):
+            try:
+                q = build_bulk_quotation(spec, f"REQ {next_number:04d}", current_user, pricing_data)
+            except Exception as e:
+                errors.append({'index': index, 'error': str(e)})
+                continue
+            built.append(q)
+            indexes.append(index)
+            next_number += 1
+
+        if errors and all_or_nothing:
+            return jsonify({'success': False, 'created': [], 'errors': errors}), 422
+
+        # The reservation is max+1 without a lock: if another create took one of
+        # these ids first, the whole insert rolls back and is renumbered
+        for attempt in range(1, BULK_ID_ATTEMPTS + 1):
+            if not built:
+                break
+            db.session.add_all(built)
+            try:
+                db.session.commit()
+                break
+            except IntegrityError:
+                db.session.rollback()
+                if attempt == BULK_ID_ATTEMPTS:
+                    raise
+                app.logger.warning(f"Bulk create id collision, renumbering (attempt {attempt})")
+                next_number = get_next_quotation_number()
+                for offset, q in enumerate(built):
+                    q.id = f"REQ {next_number + offset:04d}"
+
+        created = [{'index': index, 'id': q.id, 'status': q.status} for index, q in zip(indexes, built)]
+
+        app.logger.info(f"Bulk create by {current_user.username}: {len(built)} created, {len(errors)} rejected")
+        return jsonify({
+            'success': bool(built),
+            'createdCount': len(built),
+            'errorCount': len(errors),
+            'created': created,
+            'errors': errors
+        }), 201 if built else 422
+
+    except Exception as e:
+        db.session.rollback()
+        app.logger.error(f"Bulk create error: {str(e)}")
+        app.logger.error(f"Traceback: {traceback.format_exc()}")
+        return jsonify({'error': f'Bulk create failed, nothing was saved: {str(e)}'}), 500
+
 @app.route('/api/quotations/calculate-pricing', methods=['POST'])
 @token_required
 def calculate_pricing(current_user):
@@ -342,6 +901,10 @@ def update_pricing(current_user, quotation_id):
         if not q:
             return jsonify({'error': 'Not found'}), 404
 
+        stale = check_if_match(q)
+        if stale:
+            return stale
+
         data = request.get_json()
 
         if 'pricingBreakdown' in data:
@@ -406,9 +969,14 @@ def update_pricing(current_user, quotation_id):
             q.approved_by = current_user.username
             q.approved_at = datetime.utcnow()
 
+        audit.annotate(db.session, action='pricing')
         db.session.commit()
-        return jsonify({'success': True, 'data': q.to_dict()})
+        prerender_pdf(q)
+        return quotation_response(q)
 
+    except StaleDataError:
+        db.session.rollback()
+        return precondition_failed(Quotation.query.filter_by(id=quotation_id).first())
     except Exception as e:
         db.session.rollback()
         app.logger.error(f"Error updating pricing: {str(e)}")
@@ -423,6 +991,10 @@ def update_quotation(current_user, quotation_id):
         if not q:
             return jsonify({'error': 'Not found'}), 404
 
+        stale = check_if_match(q)
+        if stale:
+            return stale
+
         data = request.get_json()
 
         if 'headers' in data:
@@ -485,22 +1057,242 @@ def update_quotation(current_user, quotation_id):
             q.status = 'draft'
 
         db.session.commit()
-        return jsonify({'success': True, 'data': q.to_dict()})
+        return quotation_response(q)
 
+    except StaleDataError:
+        db.session.rollback()
+        return precondition_failed(Quotation.query.filter_by(id=quotation_id).first())
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': f'Failed to update quotation: {str(e)}'}), 500
 
 @app.route('/api/quotations/<quotation_id>', methods=['GET'])
 def get_quotation(quotation_id):
+    try:
+        # Check the version alone first so unchanged polls never load or serialize the row
+        version = db.session.query(Quotation.version).filter_by(id=quotation_id).scalar()
+        if version is None:
+            return get_archived_quotation(quotation_id)
+
+        etag = quotation_etag(quotation_id, version)
+        if compression.etag_matches(request.if_none_match, etag):
+            response = make_response('', 304)
+            response.set_etag(etag)
+            return response
+
+        q = Quotation.query.filter_by(id=quotation_id).first()
+        response = quotation_response(q)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+    except Exception as e:
+        return jsonify({'error': 'Failed to fetch quotation'}), 500
+
+@app.route('/api/quotations/<quotation_id>/preview', methods=['GET'])
+@token_required
+def preview_quotation(current_user, quotation_id):
+    """
+    The view model the PDF layouts render: resolved service prices, package totals,
+    grand total and terms. Built once per quotation version and shared with PDF rendering.
+    """
     try:
         q = Quotation.query.filter_by(id=quotation_id).first()
         if not q:
-            return jsonify({'error': 'Not found'}), 404
+            return jsonify({'error': 'Quotation not found'}), 404
+
+        etag = f"{quotation_etag(q.id, q.version)}.view"
+        if compression.etag_matches(request.if_none_match, etag):
+            response = make_response('', 304)
+            response.set_etag(etag)
+            return response
 
-        return jsonify({'success': True, 'data': q.to_dict()})
+        quotation_dict = q.to_dict()
+        quotation_dict['displayMode'] = q.display_mode or 'bifurcated'
+        response = jsonify({'success': True, 'data': quotation_view.view_model(quotation_dict)})
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
     except Exception as e:
-        return jsonify({'error': 'Failed to fetch quotation'}), 500
+        app.logger.error(f"Preview error: {str(e)}")
+        return jsonify({'error': 'Failed to build preview'}), 500
+
+# Rendered preview HTML by ETag (quotation version, variant, template version)
+# No scripts, frames or outside requests: templates only need inline styles and the logo
+PREVIEW_CSP = "default-src 'none'; img-src 'self' data:; style-src 'unsafe-inline'; base-uri 'none'; form-action 'none'"
+preview_pages = compression.CompressedBodyCache(int(os.environ.get('PREVIEW_CACHE_BYTES', 16 * 1024 * 1024)))
+
+def preview_logo():
+    """(path, content version) of the logo the templates use, or (None, None)"""
+    logos = pdf_generator_module.find_logos(pdf_generator_module.BASE_DIR)
+    if not logos:
+        return None, None
+    return logos[0], pdf_cache.file_version(logos[0])
+
+def preview_logo_src(inline):
+    path, version = preview_logo()
+    if not path:
+        return ''
+    if inline:
+        with open(path, 'rb') as f:
+            encoded = base64.b64encode(f.read()).decode('ascii')
+        return f"data:{mimetypes.guess_type(path)[0] or 'image/png'};base64,{encoded}"
+    return f"/api/pdf-assets/logo?v={version}"
+
+@app.route('/api/quotations/<quotation_id>/preview.html', methods=['GET'])
+@token_required
+def preview_quotation_html(current_user, quotation_id):
+    """
+    The quotation as the PDF templates render it, without the PDF conversion.
+    summary= / multipage= select the layout like download-pdf; inline=true embeds
+    the logo as a data URI instead of linking the cacheable asset URL.
+    """
+    try:
+        version = db.session.query(Quotation.version).filter_by(id=quotation_id).scalar()
+        if version is None:
+            return jsonify({'error': 'Quotation not found'}), 404
+
+        use_summary = request.args.get('summary', 'false').lower() == 'true'
+        use_multipage = request.args.get('multipage', 'false').lower() == 'true'
+        variant = 'multipage' if use_multipage else 'summary' if use_summary else 'standard'
+        inline = request.args.get('inline', 'false').lower() == 'true'
+
+        template_version = pdf_template_version(variant, 'wkhtmltopdf').split(':', 1)[1]
+        etag = f"{quotation_etag(quotation_id, version)}.{variant}.{template_version}{'.inline' if inline else ''}"
+        if compression.etag_matches(request.if_none_match, etag):
+            response = make_response('', 304)
+            response.set_etag(etag)
+            return response
+
+        html = preview_pages.get(etag)
+        if html is None:
+            generator = pdf_generator_module.generator_for(variant, engine='wkhtmltopdf')
+            q = Quotation.query.filter_by(id=quotation_id).first()
+            quotation_dict = q.to_dict()
+            quotation_dict['displayMode'] = q.display_mode or 'bifurcated'
+            if variant == 'multipage':
+                context = generator.multipage_context(quotation_dict)
+            else:
+                context = generator.summary_context(quotation_dict)
+            logo_src = preview_logo_src(inline)
+            context['logo_src'] = logo_src
+            if 'watermark_logo' in context:
+                context['watermark_logo'] = logo_src
+            try:
+                html = generator.render_html(context).encode('utf-8')
+            except TemplateNotFound:
+                return jsonify({'error': f'No HTML template installed for the {variant} layout'}), 404
+            preview_pages.put(etag, html)
+
+        response = make_response(html)
+        response.mimetype = 'text/html'
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'private, no-cache'
+        response.headers['Content-Security-Policy'] = PREVIEW_CSP
+        return response
+    except Exception as e:
+        app.logger.error(f"HTML preview error: {str(e)}")
+        return jsonify({'error': f'Failed to render preview: {str(e)}'}), 500
+
+@app.route('/api/pdf-assets/logo', methods=['GET'])
+def pdf_asset_logo():
+    """The template logo; ?v=<content version> URLs never change, so they are cached for a year"""
+    path, version = preview_logo()
+    if not path:
+        return jsonify({'error': 'Not found'}), 404
+    versioned = request.args.get('v') == version
+    response = send_file(path, etag=version, max_age=31536000 if versioned else 0, conditional=True)
+    if versioned:
+        response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
+
+def archived_quotation_row(quotation_id):
+    """Row dict of a quotation moved to cold storage, or None"""
+    return archive.load_archived(db.session, Quotation.__table__, QuotationArchive.__table__, quotation_id)
+
+def get_archived_quotation(quotation_id):
+    """Read-through for quotations moved to cold storage; archived rows never change"""
+    row = archived_quotation_row(quotation_id)
+    if row is None:
+        return jsonify({'error': 'Not found'}), 404
+
+    etag = quotation_etag(quotation_id, row['version'])
+    if compression.etag_matches(request.if_none_match, etag):
+        response = make_response('', 304)
+        response.set_etag(etag)
+        return response
+
+    # A transient instance reuses to_dict; it is never added to the session
+    data = Quotation(**row).to_dict()
+    data['archived'] = True
+    response = jsonify({'success': True, 'data': data})
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'max-age=86400'
+    return response
+
+def pdf_render_options(args):
+    """
+    (variant, image_quality, engine) from summary= / multipage= / quality= / engine= options.
+    Raises ValueError for an unknown quality or engine.
+    """
+    use_summary = str(args.get('summary', 'false')).lower() == 'true'
+    use_multipage = str(args.get('multipage', 'false')).lower() == 'true'
+    variant = 'multipage' if use_multipage else 'summary' if use_summary else 'standard'
+
+    # Brochure image resolution: screen (email/preview), print (default) or original
+    image_quality = str(args.get('quality', brochure.DEFAULT_QUALITY)).lower()
+    if image_quality not in brochure.QUALITIES:
+        raise ValueError(f"Invalid quality '{image_quality}'")
+
+    # wkhtmltopdf or reportlab; "auto" (the PDF_ENGINE default) picks wkhtmltopdf when installed
+    engine = resolve_engine(args.get('engine'))
+    return variant, image_quality, engine
+
+def pdf_render_spec(q, args):
+    """
+    (quotation_dict, variant, image_quality, engine, cache_key) for a PDF of q requested with
+    summary= / multipage= / quality= / engine= options. Raises ValueError for an unknown quality or engine.
+    """
+    variant, image_quality, engine = pdf_render_options(args)
+
+    # Use saved display mode from quotation
+    display_mode = q.display_mode or 'bifurcated'
+    quotation_dict = q.to_dict()
+    quotation_dict['displayMode'] = display_mode
+
+    cache_key = pdf_cache.cache_key(
+        quotation_dict, variant, display_mode,
+        pdf_template_version(variant, engine), brochure.pages.asset_version(image_quality)
+    )
+    return quotation_dict, variant, image_quality, engine, cache_key
+
+def pdf_option_error(e):
+    return jsonify({
+        'error': str(e),
+        'allowed': {'quality': list(brochure.QUALITIES), 'engine': ['auto'] + list(ENGINES)}
+    }), 400
+
+def pdf_blocked(q):
+    """403 response when q may not be rendered yet, else None"""
+    if q.status in ['pending_approval', 'pending']:
+        return jsonify({
+            'error': 'Cannot download PDF for pending quotations',
+            'message': f'Quotation {q.id} is currently {q.status}. PDF download is not allowed until approval is completed.',
+            'status': q.status
+        }), 403
+    return None
+
+def send_cached_pdf(source, cache_key, filename):
+    response = send_file(
+        source,
+        as_attachment=True,
+        download_name=filename,
+        mimetype='application/pdf',
+        etag=cache_key
+    )
+    response.headers['Content-Disposition'] = f'attachment; filename={filename}'
+    response.headers['Content-Type'] = 'application/pdf'
+    # Revalidate every time; unchanged PDFs come back as 304 via the content-addressed ETag
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
 
 @app.route('/api/quotations/<quotation_id>/download-pdf', methods=['GET'])
 @cross_origin(origins='*')
@@ -510,90 +1302,230 @@ def download_quotation_pdf(quotation_id):
         if not q:
             return jsonify({'error': 'Quotation not found'}), 404
 
-        if q.status in ['pending_approval', 'pending']:
-            return jsonify({
-                'error': 'Cannot download PDF for pending quotations',
-                'message': f'Quotation {quotation_id} is currently {q.status}. PDF download is not allowed until approval is completed.',
-                'status': q.status
-            }), 403
+        blocked = pdf_blocked(q)
+        if blocked:
+            return blocked
 
-        # Enhanced PDF generation with template options
-        app.logger.info(f"Full request URL: {request.url}")
         app.logger.info(f"Request args: {dict(request.args)}")
+        try:
+            quotation_dict, variant, image_quality, engine, cache_key = pdf_render_spec(q, request.args)
+        except ValueError as e:
+            return pdf_option_error(e)
 
-        summary_param = request.args.get('summary', 'false')
-        multipage_param = request.args.get('multipage', 'false')  # NEW: Support multi-page
+        app.logger.info(f"PDF for {quotation_id}: variant={variant}, quality={image_quality}, engine={engine}, "
+                        f"display mode={quotation_dict['displayMode']}")
+        filename = f"Quotation_{quotation_id}.pdf"
 
-        # Use saved display mode from quotation
-        display_mode = q.display_mode or 'bifurcated'
+        if request.if_none_match and compression.etag_matches(request.if_none_match, cache_key):
+            response = make_response('', 304)
+            response.set_etag(cache_key)
+            return response
 
-        app.logger.info(f"Raw summary parameter: '{summary_param}'")
-        app.logger.info(f"Raw multipage parameter: '{multipage_param}'")
-        app.logger.info(f"Using saved display mode: '{display_mode}' from quotation {quotation_id}")
+        filepath = pdf_files.get(cache_key)
+        if filepath:
+            app.logger.info(f"Serving cached PDF {cache_key[:12]} for {quotation_id}")
+            response = send_cached_pdf(filepath, cache_key, filename)
+        else:
+            # Rendered in memory: stored in the cache and sent from the same buffer
+            data = pdf_jobs.render_pdf(quotation_dict, variant, image_quality, engine)
+            pdf_files.put_bytes(cache_key, data)
+            app.logger.debug(f"PDF generated successfully ({len(data)} bytes)")
+            response = send_cached_pdf(io.BytesIO(data), cache_key, filename)
+        app.logger.debug(f"PDF sent successfully: {filename}")
+        return response
 
-        use_summary = summary_param.lower() == 'true'
-        use_multipage = multipage_param.lower() == 'true'
+    except Exception as e:
+        app.logger.error(f"PDF generation error: {str(e)}")
+        app.logger.error(f"Traceback: {traceback.format_exc()}")
+        return jsonify({'error': f'Failed to generate PDF: {str(e)}'}), 500
 
-        app.logger.info(f"use_summary: {use_summary}, use_multipage: {use_multipage}")
+def pdf_job_response(job, status=200):
+    data = pdf_jobs.job_to_dict(job)
+    data['statusUrl'] = f"/api/pdf-jobs/{job['id']}"
+    data['downloadUrl'] = f"/api/pdf-jobs/{job['id']}/download"
+    return jsonify({'success': True, 'data': data}), status
+
+PDF_PRERENDER = os.environ.get('PDF_PRERENDER', '1') != '0'
+# The options the frontend's download buttons send (Dashboard, QuotationSummary)
+PRERENDER_OPTIONS = {'summary': 'true'}
+
+def prerender_pdf(q):
+    """
+    Queue the PDF the UI downloads (summary layout) for a just-completed quotation
+    so the download that usually follows approval is a cache hit. Never fails the calling request.
+    """
+    if not PDF_PRERENDER or q.status != 'completed':
+        return None
+    try:
+        quotation_dict, variant, image_quality, engine, cache_key = pdf_render_spec(q, PRERENDER_OPTIONS)
+        job = pdf_job_queue.submit(q.id, quotation_dict, variant, image_quality, cache_key,
+                                   requested_by='prerender', engine=engine)
+        app.logger.info(f"Prerendering PDF for {q.id}: job {job['id']} ({job['status']})")
+        return job
+    except pdf_jobs.QueueFull:
+        app.logger.info(f"PDF queue full, {q.id} will render on first download")
+    except Exception as e:
+        app.logger.error(f"Could not queue PDF prerender for {q.id}: {str(e)}")
+    return None
 
-        # Initialize PDF generator based on template preference
-        if use_multipage:
-            pdf_generator = QuotationPDFGenerator(use_multipage_template=True)
-            app.logger.info("Using multi-page template")
-        elif use_summary:
-            pdf_generator = QuotationPDFGenerator(use_summary_template=True)
-            app.logger.info("Using summary template")
-        else:
-            pdf_generator = QuotationPDFGenerator()
-            app.logger.info("Using standard template")
+def wait_seconds():
+    try:
+        return float(request.args.get('wait', 0))
+    except ValueError:
+        return 0
 
-        filename = f"Quotation_{quotation_id}.pdf"
-        pdf_dir = 'temp_pdfs'
-        filepath = os.path.join(pdf_dir, filename)
-        os.makedirs(pdf_dir, exist_ok=True)
+@app.route('/api/quotations/<quotation_id>/pdf-jobs', methods=['POST'])
+@token_required
+def create_pdf_job(current_user, quotation_id):
+    """
+    Queue a PDF render; accepts summary/multipage/quality/engine like download-pdf (query or JSON body).
+    ?wait=N blocks up to N seconds so small documents come back finished in one call.
+    """
+    try:
+        q = Quotation.query.filter_by(id=quotation_id).first()
+        if not q:
+            return jsonify({'error': 'Quotation not found'}), 404
 
-        app.logger.info(f"Generating PDF at: {filepath}")
-        app.logger.info(f"PDF generator template: {pdf_generator.template_name}")
+        blocked = pdf_blocked(q)
+        if blocked:
+            return blocked
 
-        # Pass display mode to PDF generation
-        quotation_dict = q.to_dict()
-        quotation_dict['displayMode'] = display_mode
-
-        # Generate PDF based on template type
-        if use_multipage:
-            app.logger.info("Using generate_multipage_pdf method")
-            pdf_generator.generate_multipage_pdf(quotation_dict, filepath)
-        elif use_summary:
-            app.logger.info("Using generate_summary_pdf method")
-            pdf_generator.generate_summary_pdf(quotation_dict, filepath)
-        else:
-            app.logger.info("Using generate_pdf method")
-            pdf_generator.generate_pdf(quotation_dict, filepath)
+        options = dict(request.args)
+        options.update(request.get_json(silent=True) or {})
+        try:
+            quotation_dict, variant, image_quality, engine, cache_key = pdf_render_spec(q, options)
+        except ValueError as e:
+            return pdf_option_error(e)
 
-        app.logger.debug(f"PDF generated successfully at: {filepath}")
+        try:
+            job = pdf_job_queue.submit(quotation_id, quotation_dict, variant, image_quality, cache_key,
+                                       engine=engine,
+                                       requested_by=current_user.username)
+        except pdf_jobs.QueueFull as e:
+            response = jsonify({'error': 'PDF queue is full, retry shortly', 'message': str(e)})
+            response.headers['Retry-After'] = '5'
+            return response, 503
 
-        cleanup_temp_pdf(filepath, delay=300)
+        pdf_job_queue.wait(job, wait_seconds())
+        return pdf_job_response(job, 200 if job['done'].is_set() else 202)
 
-        response = send_file(
-            filepath,
-            as_attachment=True,
-            download_name=filename,
-            mimetype='application/pdf'
-        )
+    except Exception as e:
+        app.logger.error(f"PDF job error: {str(e)}")
+        return jsonify({'error': f'Failed to queue PDF: {str(e)}'}), 500
 
-        response.headers['Content-Disposition'] = f'attachment; filename={filename}'
-        response.headers['Content-Type'] = 'application/pdf'
-        response.headers['Cache-Control'] = 'no-cache, no-store, must-revalidate'
-        response.headers['Pragma'] = 'no-cache'
-        response.headers['Expires'] = '0'
+@app.route('/api/pdf-jobs/<job_id>', methods=['GET'])
+@token_required
+def get_pdf_job(current_user, job_id):
+    job = pdf_job_queue.get(job_id)
+    if not job:
+        return jsonify({'error': 'PDF job not found'}), 404
+    pdf_job_queue.wait(job, wait_seconds())
+    return pdf_job_response(job)
+
+@app.route('/api/pdf-jobs/<job_id>/download', methods=['GET'])
+@token_required
+def download_pdf_job(current_user, job_id):
+    job = pdf_job_queue.get(job_id)
+    if not job:
+        return jsonify({'error': 'PDF job not found'}), 404
+    if job['status'] == 'failed':
+        return jsonify({'error': 'PDF generation failed', 'message': job['error']}), 500
+    if job['status'] != 'done':
+        return pdf_job_response(job, 409)
+
+    # The cache may have evicted the file since the job finished
+    filepath = pdf_files.get(job['cacheKey'])
+    if not filepath:
+        return jsonify({'error': 'PDF expired from cache, submit a new job'}), 410
+    return send_cached_pdf(filepath, job['cacheKey'], f"Quotation_{job['quotationId']}.pdf")
+
+PDF_BATCH_MAX = int(os.environ.get('PDF_BATCH_MAX', 1000))
+PDF_BATCH_WORKERS = int(os.environ.get('PDF_BATCH_WORKERS', pdf_batch.DEFAULT_WORKERS))
+
+pdf_batch_pool = pdf_batch.BatchPool(
+    PDF_BATCH_WORKERS,
+    max_batches=int(os.environ.get('PDF_BATCH_CONCURRENCY', pdf_batch.DEFAULT_MAX_BATCHES))
+)
 
-        app.logger.debug(f"PDF sent successfully: {filename}")
-        return response
+def pdf_batch_ids(filters, limit=PDF_BATCH_MAX + 1):
+    """
+    Quotation ids matching status (default completed), developerName (SQL LIKE,
+    case-insensitive), developerType and from/to creation dates, oldest first
+    """
+    query = db.session.query(Quotation.id).filter(Quotation.status == (filters.get('status') or 'completed'))
+    if filters.get('developerName'):
+        query = query.filter(Quotation.developer_name.ilike(filters['developerName']))
+    if filters.get('developerType'):
+        query = query.filter(Quotation.developer_type == filters['developerType'])
+    if filters.get('from'):
+        query = query.filter(Quotation.created_at >= export.parse_date(filters['from']))
+    if filters.get('to'):
+        query = query.filter(Quotation.created_at < export.parse_date(filters['to']))
+    return [row.id for row in query.order_by(Quotation.created_at, Quotation.id).limit(limit)]
+
+def pdf_batch_specs(quotation_ids, options, load_size=50):
+    """BatchSpecs for the ids, loading rows `load_size` at a time and releasing them once specs are built"""
+    for start in range(0, len(quotation_ids), load_size):
+        chunk = quotation_ids[start:start + load_size]
+        rows = {q.id: q for q in Quotation.query.filter(Quotation.id.in_(chunk))}
+        for quotation_id in chunk:
+            q = rows.get(quotation_id)
+            if q is None:
+                yield pdf_batch.BatchSpec(quotation_id, skipped='Quotation not found')
+            elif q.status in ['pending_approval', 'pending']:
+                yield pdf_batch.BatchSpec(quotation_id, skipped=f'Quotation is {q.status}')
+            else:
+                yield pdf_batch.BatchSpec(quotation_id, *pdf_render_spec(q, options))
+        for q in rows.values():
+            db.session.expunge(q)
 
-    except Exception as e:
-        app.logger.error(f"PDF generation error: {str(e)}")
-        app.logger.error(f"Traceback: {traceback.format_exc()}")
-        return jsonify({'error': f'Failed to generate PDF: {str(e)}'}), 500
+@app.route('/api/quotations/pdf-batch', methods=['POST'])
+@token_required
+def pdf_batch_download(current_user):
+    """
+    Stream a ZIP of PDFs for {"ids": [...]} or {"filter": {...}} (see pdf_batch_ids),
+    with summary/multipage/quality/engine options as for download-pdf. Cached PDFs are
+    reused; the rest render on a shared process pool and are zipped as they finish.
+    At most PDF_BATCH_CONCURRENCY batches stream at once; further requests get a 503.
+    """
+    data = request.get_json(silent=True) or {}
+    try:
+        pdf_render_options(data)
+        if data.get('ids'):
+            if not isinstance(data['ids'], list):
+                return jsonify({'error': 'ids must be a list of quotation ids'}), 400
+            quotation_ids = list(dict.fromkeys(str(i) for i in data['ids']))
+        else:
+            quotation_ids = pdf_batch_ids(data.get('filter') or {})
+    except ValueError as e:
+        return pdf_option_error(e)
+
+    if not quotation_ids:
+        return jsonify({'error': 'No quotations match'}), 404
+    if len(quotation_ids) > PDF_BATCH_MAX:
+        return jsonify({'error': f'At most {PDF_BATCH_MAX} quotations per batch'}), 400
+
+    try:
+        pdf_batch_pool.acquire()
+    except pdf_batch.BatchBusy as e:
+        response = jsonify({'error': 'Too many PDF batches rendering, retry shortly', 'message': str(e)})
+        response.headers['Retry-After'] = '30'
+        return response, 503
+
+    try:
+        results = pdf_batch.render_batch(pdf_batch_specs(quotation_ids, data), pdf_files,
+                                         workers=PDF_BATCH_WORKERS, pool=pdf_batch_pool.executor())
+        response = Response(stream_with_context(pdf_batch.stream_zip(results)), mimetype='application/zip')
+    except Exception:
+        pdf_batch_pool.release()
+        raise
+    # The slot is held until the ZIP has been streamed (or the client went away)
+    response.call_on_close(pdf_batch_pool.release)
+    filename = f"quotations_{datetime.utcnow():%Y%m%d_%H%M%S}.zip"
+    response.headers['Content-Disposition'] = f'attachment; filename={filename}'
+    response.headers['Cache-Control'] = 'no-store'
+    app.logger.info(f"Streaming PDF batch of {len(quotation_ids)} for {current_user.username}")
+    return response
 
 @app.route('/api/quotations/<quotation_id>/terms', methods=['PUT'])
 @token_required
@@ -603,6 +1535,10 @@ def update_terms(current_user, quotation_id):
         if not q:
             return jsonify({'error': 'Quotation not found'}), 404
 
+        stale = check_if_match(q)
+        if stale:
+            return stale
+
         data = request.get_json()
         terms_accepted = data.get('termsAccepted', False)
         applicable_terms = data.get('applicableTerms', [])
@@ -644,9 +1580,14 @@ def update_terms(current_user, quotation_id):
             q.approved_by = current_user.username
             q.approved_at = datetime.utcnow()
 
+        audit.annotate(db.session, action='terms')
         db.session.commit()
-        return jsonify({'success': True, 'data': q.to_dict()})
+        prerender_pdf(q)
+        return quotation_response(q)
 
+    except StaleDataError:
+        db.session.rollback()
+        return precondition_failed(Quotation.query.filter_by(id=quotation_id).first())
     except Exception as e:
         db.session.rollback()
         app.logger.error(f"Error updating terms: {str(e)}")
@@ -663,6 +1604,10 @@ def approve(current_user, quotation_id):
         if not q:
             return jsonify({"error": "Not found"}), 404
 
+        stale = check_if_match(q)
+        if stale:
+            return stale
+
         effective_discount = q.discount_percent if q.discount_percent > 0 else (
             (q.discount_amount / (q.total_amount + q.discount_amount)) * 100
             if q.total_amount and q.discount_amount else 0
@@ -677,18 +1622,62 @@ def approve(current_user, quotation_id):
             q.status = "completed"
             q.approved_by = current_user.username
             q.approved_at = datetime.utcnow()
+            audit.annotate(db.session, action="approved", reason=data.get("reason"))
         else:
             q.status = "rejected"
             q.requires_approval = False
+            audit.annotate(db.session, action="rejected", reason=data.get("reason"))
 
         db.session.commit()
-        return jsonify({"success": True, "data": q.to_dict()})
+        prerender_pdf(q)
+        return quotation_response(q)
 
+    except StaleDataError:
+        db.session.rollback()
+        return precondition_failed(Quotation.query.filter_by(id=quotation_id).first())
     except Exception as e:
         db.session.rollback()
         app.logger.error(f"Error approving quotation: {str(e)}")
         return jsonify({"error": f"Failed to approve quotation: {str(e)}"}), 500
 
+@app.route("/api/quotations/<quotation_id>/history", methods=["GET"])
+@token_required
+def quotation_history(current_user, quotation_id):
+    """Audit trail of a quotation, oldest first"""
+    try:
+        # Include records still sitting in the write buffer
+        audit_writer.flush(timeout=2)
+        items = (QuotationEvent.query
+                 .filter_by(quotation_id=quotation_id)
+                 .order_by(QuotationEvent.occurred_at, QuotationEvent.id)
+                 .all())
+        return jsonify({"success": True, "data": [audit.event_to_dict(e) for e in items]})
+    except Exception as e:
+        app.logger.error(f"Error fetching quotation history: {str(e)}")
+        return jsonify({"error": "Failed to fetch quotation history"}), 500
+
+@app.route("/api/quotations/<quotation_id>/history/replay", methods=["GET"])
+@token_required
+def quotation_replay(current_user, quotation_id):
+    """State of a quotation as of ?at=<ISO timestamp>"""
+    try:
+        at = export.parse_date(request.args.get("at"))
+    except ValueError:
+        return jsonify({"error": "Invalid 'at' timestamp"}), 400
+    if not at:
+        return jsonify({"error": "Query parameter 'at' is required"}), 400
+
+    try:
+        audit_writer.flush(timeout=2)
+        state = audit.replay(db.session, Quotation, QuotationEvent, quotation_id, at,
+                             load_archived=archived_quotation_row)
+        if state is None:
+            return jsonify({"error": "Quotation did not exist at that time"}), 404
+        return jsonify({"success": True, "at": at.isoformat(), "data": state})
+    except Exception as e:
+        app.logger.error(f"Error replaying quotation history: {str(e)}")
+        return jsonify({"error": "Failed to replay quotation history"}), 500
+
 @app.route("/api/quotations/pending", methods=["GET"])
 @token_required
 def pending(current_user):
@@ -703,6 +1692,114 @@ def pending(current_user):
         app.logger.error(f"Error fetching pending quotations: {str(e)}")
         return jsonify({"error": "Failed to fetch pending quotations"}), 500
 
+def user_profile(user):
+    return {
+        "id": user.id,
+        "fname": user.fname,
+        "lname": user.lname,
+        "username": user.username,
+        "role": user.role,
+        "threshold": user.threshold
+    }
+
+@app.route("/api/events/token", methods=["POST"])
+@token_required
+def event_stream_token(current_user):
+    """Short-lived token for /api/events/stream?token=, which EventSource clients need"""
+    return jsonify({"token": generate_stream_token(current_user), "expiresIn": STREAM_TOKEN_SECONDS})
+
+@app.route("/api/events/stream", methods=["GET"])
+def event_stream():
+    """
+    Server-sent quotation status transitions. EventSource cannot set headers, so
+    browsers pass a stream token from POST /api/events/token as ?token= instead.
+    """
+    token, purpose = request.args.get("token"), STREAM_TOKEN_PURPOSE
+    if "Authorization" in request.headers:
+        token, purpose = request.headers["Authorization"].split(" ")[1], None
+    if not token:
+        return jsonify({"error": "Token missing"}), 401
+
+    try:
+        current_user = user_from_token(token, purpose)
+        if not current_user:
+            return jsonify({"error": "User not found"}), 401
+    except Exception as e:
+        app.logger.error(f"Token validation error: {str(e)}")
+        return jsonify({"error": "Token invalid"}), 401
+
+    last_event_id = request.headers.get("Last-Event-ID", request.args.get("lastEventId"))
+    try:
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        last_event_id = None
+
+    accepts = events.subscriber_filter(current_user.role, [
+        f"{current_user.fname or ''} {current_user.lname or ''}".strip(),
+        current_user.username
+    ])
+    subscription = events.bus.subscribe(accepts, last_event_id)
+
+    # Release the DB connection now; the stream itself never touches the database
+    db.session.remove()
+
+    response = Response(events.sse_stream(subscription), mimetype="text/event-stream")
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
+
+@app.route("/api/dashboard/bootstrap", methods=["GET"])
+@token_required
+def dashboard_bootstrap(current_user):
+    """Everything the Dashboard needs on first paint in one round trip"""
+    try:
+        per_page = min(max(request.args.get('per_page', DASHBOARD_PAGE_SIZE, type=int), 1), 200)
+        can_approve = current_user.role in ["admin", "manager"]
+
+        # Status counts and the pending total come from one aggregate query
+        rows = db.session.query(
+            Quotation.status,
+            db.func.count(Quotation.id),
+            db.func.sum(db.case((Quotation.requires_approval == True, 1), else_=0))  # noqa: E712
+        ).group_by(Quotation.status).all()
+
+        counts = {status or 'unknown': count for status, count, _ in rows}
+        total = sum(counts.values())
+        pending_total = sum(int(pending or 0) for _, _, pending in rows)
+
+        quotations = (Quotation.query
+                      .order_by(Quotation.created_at.desc())
+                      .limit(per_page)
+                      .all())
+
+        pending_block = None
+        if can_approve:
+            pending_items = (Quotation.query
+                             .filter_by(requires_approval=True)
+                             .order_by(Quotation.created_at.desc())
+                             .limit(per_page)
+                             .all())
+            pending_block = {
+                'total': pending_total,
+                'items': [q.to_list_dict() for q in pending_items]
+            }
+
+        return jsonify({
+            'success': True,
+            'profile': user_profile(current_user),
+            'counts': dict(counts, total=total),
+            'quotations': {
+                'page': 1,
+                'perPage': per_page,
+                'total': total,
+                'items': [q.to_list_dict() for q in quotations]
+            },
+            'pending': pending_block
+        })
+    except Exception as e:
+        app.logger.error(f"Dashboard bootstrap error: {str(e)}")
+        return jsonify({'error': 'Failed to load dashboard'}), 500
+
 @app.route("/api/signup", methods=["POST"])
 @role_required("admin", "manager")
 def signup(current_user):
@@ -779,14 +1876,7 @@ def login():
 @app.route("/api/me", methods=["GET"])
 @token_required
 def get_profile(current_user):
-    return jsonify({
-        "id": current_user.id,
-        "fname": current_user.fname,
-        "lname": current_user.lname,
-        "username": current_user.username,
-        "role": current_user.role,
-        "threshold": current_user.threshold
-    })
+    return jsonify(user_profile(current_user))
 
 @app.route('/api/logo.png', methods=['GET'])
 def serve_png_logo():
@@ -810,8 +1900,74 @@ def serve_jpg_logo():
         app.logger.error(f"Error serving JPG logo: {str(e)}")
         return jsonify({'error': 'JPG Logo not found'}), 404
 
+def run_expiry_job(now=None):
+    """Expire lapsed quotations, then publish and audit each transition"""
+    rows = maintenance.expire_quotations(db.engine, Quotation.__table__, now)
+    if not rows:
+        return rows
+
+    records = []
+    for row in rows:
+        changes = {'status': [row['status'], maintenance.EXPIRED_STATUS]}
+        if row['requires_approval']:
+            changes['requires_approval'] = [True, False]
+        records.append(audit.build_record(row['id'], 'expired', changes, actor='system', version=row['version']))
+    audit_writer.enqueue(records)
+
+    for row in rows:
+        payload = dict(row, status=maintenance.EXPIRED_STATUS, requires_approval=False)
+        events.bus.publish('expired', events.quotation_payload(payload, row['status']))
+    return rows
+
+def remove_derived_rows(connection, quotation_ids):
+    search_index.remove_quotations(connection, quotation_ids)
+    service_index.remove_quotations(connection, QuotationService, quotation_ids)
+
+def run_archive_job(older_than_days=None, vacuum=True):
+    """Move old closed quotations to cold storage, then ANALYZE/optimize/VACUUM"""
+    if older_than_days is None:
+        older_than_days = int(os.environ.get('ARCHIVE_AFTER_DAYS', archive.DEFAULT_ARCHIVE_AFTER_DAYS))
+    archived = archive.archive_quotations(
+        db.engine, Quotation.__table__, QuotationArchive.__table__, older_than_days,
+        before_delete=remove_derived_rows
+    )
+    if archived:
+        audit_writer.enqueue([
+            audit.build_record(quotation_id, 'archived', {}, actor='system', version=version)
+            for quotation_id, version in archived
+        ])
+    archive.optimize_database(
+        db.engine,
+        search_index.SEARCH_TABLE if search_index.index_enabled() else None,
+        vacuum=vacuum and bool(archived)
+    )
+    return archived
+
+scheduler = maintenance.JobScheduler(int(os.environ.get('MAINTENANCE_INTERVAL_SECONDS', 3600)))
+
+@scheduler.add
+def expiry_job():
+    with app.app_context():
+        run_expiry_job()
+
+@scheduler.add(every=int(os.environ.get('ARCHIVE_INTERVAL_SECONDS', 86400)))
+def archive_job():
+    with app.app_context():
+        run_archive_job()
+
 with app.app_context():
     db.create_all()
+    if os.environ.get('AUTO_MIGRATE', '1') != '0':
+        migrations.upgrade(db.engine)
+    search_index.create_search_index(db.engine)
+    service_index.ensure_service_index(db.engine, Quotation, QuotationService)
+    audit.ensure_append_only(db.engine)
+    audit_writer.start(db.engine)
+    scheduler.start()
+
+# PDF_WARMUP=0 skips, "full" also compiles the brochure image pages before the first download
+if os.environ.get('PDF_WARMUP', '1') != '0':
+    pdf_generator_module.warm_up(brochure_pages=os.environ.get('PDF_WARMUP') == 'full')
 
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=3001)
@@ -0,0 +1,105 @@
+# archive.py - Cold storage for old closed quotations (compressed rows in quotation_archive)
+import json
+import logging
+import zlib
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, delete, DateTime
+
+logger = logging.getLogger(__name__)
+
+ARCHIVABLE_STATUSES = ('completed', 'rejected', 'expired')
+DEFAULT_ARCHIVE_AFTER_DAYS = 365
+DEFAULT_CHUNK_SIZE = 200
+
+
+def pack_row(row):
+    """Compress a full quotation row, JSON blobs included"""
+    data = json.dumps(dict(row), default=lambda v: v.isoformat() if isinstance(v, datetime) else str(v))
+    return zlib.compress(data.encode('utf-8'), 6)
+
+
+def unpack_row(payload, quotation_table):
+    """Inverse of pack_row, with DateTime columns parsed back"""
+    row = json.loads(zlib.decompress(payload).decode('utf-8'))
+    for column in quotation_table.columns:
+        if isinstance(column.type, DateTime) and row.get(column.name):
+            row[column.name] = datetime.fromisoformat(row[column.name])
+    return row
+
+
+def archive_quotations(engine, quotation_table, archive_table, older_than_days=DEFAULT_ARCHIVE_AFTER_DAYS,
+                       before_delete=None, chunk_size=DEFAULT_CHUNK_SIZE, now=None):
+    """
+    Move closed quotations older than the cutoff into the archive table, one short
+    transaction per chunk so writers are never locked out for long.
+    `before_delete(connection, ids)` lets callers clear derived rows (search, service index).
+    Returns the archived rows as (id, version) pairs.
+    """
+    cutoff = (now or datetime.utcnow()) - timedelta(days=older_than_days)
+    c = quotation_table.c
+    archived = []
+
+    while True:
+        with engine.begin() as connection:
+            rows = connection.execute(
+                select(quotation_table)
+                .where(c.created_at < cutoff, c.status.in_(ARCHIVABLE_STATUSES))
+                .order_by(c.created_at)
+                .limit(chunk_size)
+            ).mappings().all()
+            if not rows:
+                break
+
+            archived_at = datetime.utcnow()
+            connection.execute(archive_table.insert(), [
+                {
+                    'id': row['id'],
+                    'status': row['status'],
+                    'created_by': row['created_by'],
+                    'developer_name': row['developer_name'],
+                    'project_name': row['project_name'],
+                    'created_at': row['created_at'],
+                    'archived_at': archived_at,
+                    'version': row['version'],
+                    'payload': pack_row(row),
+                }
+                for row in rows
+            ])
+
+            ids = [row['id'] for row in rows]
+            if before_delete:
+                before_delete(connection, ids)
+            connection.execute(delete(quotation_table).where(c.id.in_(ids)))
+            archived.extend((row['id'], row['version']) for row in rows)
+
+        logger.info(f"Archived {len(archived)} quotations so far")
+
+    return archived
+
+
+def load_archived(session, quotation_table, archive_table, quotation_id):
+    """Row dict of an archived quotation, or None"""
+    payload = session.execute(
+        select(archive_table.c.payload).where(archive_table.c.id == quotation_id)
+    ).scalar()
+    if payload is None:
+        return None
+    return unpack_row(payload, quotation_table)
+
+
+def optimize_database(engine, search_table=None, vacuum=True):
+    """Refresh planner statistics, merge FTS segments and reclaim space freed by archiving"""
+    with engine.connect() as connection:
+        if connection.dialect.name != 'sqlite':
+            return
+        connection = connection.execution_options(isolation_level='AUTOCOMMIT')
+        connection.exec_driver_sql('ANALYZE')
+        if search_table:
+            connection.exec_driver_sql(f"INSERT INTO {search_table}({search_table}) VALUES ('optimize')")
+        if vacuum:
+            try:
+                connection.exec_driver_sql('VACUUM')
+            except Exception as e:
+                # Another connection holding a transaction blocks VACUUM; the next run retries
+                logger.warning(f"VACUUM skipped: {str(e)}")
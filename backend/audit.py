@@ -0,0 +1,340 @@
+# audit.py - Append-only audit trail of quotation changes, written in batches off the request path
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy import event, inspect, select, text
+
+logger = logging.getLogger(__name__)
+
+# Model attribute -> API field name for everything the trail records
+AUDITED_FIELDS = {
+    'developer_type': 'developerType',
+    'project_region': 'projectRegion',
+    'plot_area': 'plotArea',
+    'developer_name': 'developerName',
+    'project_name': 'projectName',
+    'contact_mobile': 'contactMobile',
+    'contact_email': 'contactEmail',
+    'validity': 'validity',
+    'payment_schedule': 'paymentSchedule',
+    'rera_number': 'reraNumber',
+    'headers': 'headers',
+    'pricing_breakdown': 'pricingBreakdown',
+    'applicable_terms': 'applicableTerms',
+    'custom_terms': 'customTerms',
+    'total_amount': 'totalAmount',
+    'discount_amount': 'discountAmount',
+    'discount_percent': 'discountPercent',
+    'service_summary': 'serviceSummary',
+    'created_by': 'createdBy',
+    'status': 'status',
+    'terms_accepted': 'termsAccepted',
+    'requires_approval': 'requiresApproval',
+    'approved_by': 'approvedBy',
+    'approved_at': 'approvedAt',
+    'display_mode': 'displayMode',
+}
+
+DEFAULT_BATCH_SIZE = 200
+DEFAULT_LINGER_SECONDS = 0.2
+DEFAULT_RETRIES = 3
+DEFAULT_RETRY_DELAY_SECONDS = 0.5
+
+_PENDING_KEY = 'audit_records'
+_IN_FLIGHT_KEY = 'audit_in_flight'
+_CONTEXT_KEY = 'audit_context'
+
+
+def _plain(value):
+    """JSON-safe deep copy, so later in-place edits of mutable columns cannot alter the record"""
+    if value is None:
+        return None
+    return json.loads(json.dumps(value, default=lambda v: v.isoformat() if isinstance(v, datetime) else str(v)))
+
+
+def annotate(session, action=None, reason=None):
+    """Label the changes flushed by this session's current transaction (e.g. an approval and its reason)"""
+    context = session.info.setdefault(_CONTEXT_KEY, {})
+    if action:
+        context['action'] = action
+    if reason:
+        context['reason'] = reason
+
+
+class AuditWriter:
+    """
+    Single background thread that inserts queued audit records in batches.
+    Records are handed over after commit, so request handlers never wait on the audit insert.
+    A failed insert is retried with backoff; a batch that still fails is appended
+    to `spill_path` (NDJSON) and queued again the next time the writer starts.
+    """
+
+    def __init__(self, table, batch_size=DEFAULT_BATCH_SIZE, linger=DEFAULT_LINGER_SECONDS,
+                 retries=DEFAULT_RETRIES, retry_delay=DEFAULT_RETRY_DELAY_SECONDS, spill_path=None):
+        self.table = table
+        self.batch_size = batch_size
+        self.linger = linger
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.spill_path = spill_path
+        self.engine = None
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self, engine):
+        self.engine = engine
+        with self._lock:
+            if self._thread is None:
+                self._requeue_spilled()
+                self._thread = threading.Thread(target=self._run, name='audit-writer', daemon=True)
+                self._thread.start()
+                atexit.register(self.flush)
+
+    def enqueue(self, records):
+        for record in records:
+            self._queue.put(record)
+
+    def flush(self, timeout=None):
+        """Block until everything queued so far has been written"""
+        if self._thread is None:
+            return
+        if timeout is None:
+            self._queue.join()
+            return
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def _collect_batch(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.linger
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch):
+        """Insert one batch, retrying with exponential backoff; False once retries run out"""
+        for attempt in range(self.retries + 1):
+            try:
+                with self.engine.begin() as connection:
+                    connection.execute(self.table.insert(), batch)
+                return True
+            except Exception as e:
+                if attempt == self.retries:
+                    logger.error(f"Failed to write {len(batch)} audit records: {str(e)}")
+                    return False
+                logger.warning(f"Audit insert failed, retrying: {str(e)}")
+                time.sleep(self.retry_delay * 2 ** attempt)
+
+    def _spill(self, batch):
+        if not self.spill_path:
+            logger.error(f"No audit spill file configured; {len(batch)} audit records lost")
+            return
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.spill_path)), exist_ok=True)
+            with open(self.spill_path, 'a', encoding='utf-8') as f:
+                for record in batch:
+                    f.write(json.dumps(record, default=lambda v: v.isoformat()) + '\n')
+            logger.error(f"Spilled {len(batch)} audit records to {self.spill_path}")
+        except (OSError, TypeError, ValueError) as e:
+            logger.error(f"Could not spill {len(batch)} audit records: {str(e)}")
+
+    def _requeue_spilled(self):
+        """Queue records an earlier run could not write; ones that fail again are spilled anew"""
+        if not self.spill_path or not os.path.exists(self.spill_path):
+            return
+        replaying = self.spill_path + '.replaying'
+        try:
+            os.replace(self.spill_path, replaying)
+            with open(replaying, encoding='utf-8') as f:
+                records = [json.loads(line) for line in f if line.strip()]
+        except (OSError, ValueError) as e:
+            logger.error(f"Could not read spilled audit records: {str(e)}")
+            return
+        for record in records:
+            if record.get('occurred_at'):
+                record['occurred_at'] = datetime.fromisoformat(record['occurred_at'])
+        self.enqueue(records)
+        os.remove(replaying)
+        logger.info(f"Re-queued {len(records)} spilled audit records")
+
+    def _run(self):
+        while True:
+            batch = self._collect_batch()
+            try:
+                if not self._write(batch):
+                    self._spill(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+
+def build_record(quotation_id, action, changes, actor=None, reason=None, version=None):
+    """One quotation_event row, ready for AuditWriter.enqueue"""
+    return {
+        'quotation_id': quotation_id,
+        'action': action,
+        'actor': actor,
+        'occurred_at': datetime.utcnow(),
+        'version': version,
+        'changes': changes,
+        'reason': reason,
+    }
+
+
+def register(quotation_model, session, writer, actor_provider=lambda: None):
+    """
+    Diff audited fields on every flush and hand the records to `writer` once the
+    transaction commits. Old values that the session no longer holds (in-place
+    JSON edits, unloaded attributes) are read from the row before it is updated.
+    """
+    table = quotation_model.__table__
+
+    def info(target):
+        owning_session = inspect(target).session
+        return owning_session.info if owning_session is not None else None
+
+    def on_insert(mapper, connection, target):
+        session_info = info(target)
+        if session_info is None:
+            return
+        changes = {
+            attr: [None, _plain(getattr(target, attr))]
+            for attr in AUDITED_FIELDS if getattr(target, attr) is not None
+        }
+        session_info.setdefault(_PENDING_KEY, []).append(
+            build_record(target.id, 'created', changes, actor_provider(), None, target.version)
+        )
+
+    def before_update(mapper, connection, target):
+        session_info = info(target)
+        if session_info is None:
+            return
+        state = inspect(target)
+        changes, unknown = {}, []
+        for attr in AUDITED_FIELDS:
+            history = state.attrs[attr].history
+            if not history.has_changes():
+                continue
+            # An in-place edit of a mutable JSON column leaves no separate old value
+            if history.deleted and history.deleted[0] is not getattr(target, attr):
+                changes[attr] = [_plain(history.deleted[0]), _plain(getattr(target, attr))]
+            else:
+                unknown.append(attr)
+
+        if unknown:
+            row = connection.execute(
+                select(*[table.c[attr] for attr in unknown]).where(table.c.id == target.id)
+            ).mappings().first() or {}
+            for attr in unknown:
+                changes[attr] = [_plain(row.get(attr)), _plain(getattr(target, attr))]
+
+        changes = {attr: diff for attr, diff in changes.items() if diff[0] != diff[1]}
+        if changes:
+            record = build_record(target.id, 'updated', changes, actor_provider())
+            session_info.setdefault(_PENDING_KEY, []).append(record)
+            # The new version is only assigned by the UPDATE itself
+            session_info.setdefault(_IN_FLIGHT_KEY, {})[id(target)] = record
+
+    def after_update(mapper, connection, target):
+        session_info = info(target)
+        record = session_info.get(_IN_FLIGHT_KEY, {}).pop(id(target), None) if session_info else None
+        if record is not None:
+            record['version'] = target.version
+
+    def on_commit(committed_session):
+        records = committed_session.info.pop(_PENDING_KEY, [])
+        committed_session.info.pop(_IN_FLIGHT_KEY, None)
+        context = committed_session.info.pop(_CONTEXT_KEY, {})
+        for record in records:
+            if record['action'] != 'created' and context.get('action'):
+                record['action'] = context['action']
+            record['reason'] = context.get('reason')
+        if records:
+            writer.enqueue(records)
+
+    def on_rollback(rolled_back_session, previous_transaction):
+        for key in (_PENDING_KEY, _IN_FLIGHT_KEY, _CONTEXT_KEY):
+            rolled_back_session.info.pop(key, None)
+
+    event.listen(quotation_model, 'after_insert', on_insert)
+    event.listen(quotation_model, 'before_update', before_update)
+    event.listen(quotation_model, 'after_update', after_update)
+    event.listen(session, 'after_commit', on_commit)
+    event.listen(session, 'after_soft_rollback', on_rollback)
+
+
+def ensure_append_only(engine, table_name='quotation_event'):
+    """SQLite triggers that reject UPDATE and DELETE on the audit table"""
+    with engine.begin() as connection:
+        if connection.dialect.name != 'sqlite':
+            return
+        for operation in ('UPDATE', 'DELETE'):
+            connection.execute(text(
+                f"CREATE TRIGGER IF NOT EXISTS {table_name}_no_{operation.lower()} "
+                f"BEFORE {operation} ON {table_name} "
+                "BEGIN SELECT RAISE(ABORT, 'audit log is append-only'); END"
+            ))
+
+
+def event_to_dict(row):
+    return {
+        'id': row.id,
+        'quotationId': row.quotation_id,
+        'action': row.action,
+        'actor': row.actor,
+        'occurredAt': row.occurred_at.isoformat() if row.occurred_at else None,
+        'version': row.version,
+        'changes': {
+            AUDITED_FIELDS.get(attr, attr): {'from': diff[0], 'to': diff[1]}
+            for attr, diff in (row.changes or {}).items()
+        },
+        'reason': row.reason,
+    }
+
+
+def replay(session, quotation_model, event_model, quotation_id, at, load_archived=None):
+    """
+    State of a quotation's audited fields as of `at`: start from the current row
+    and undo every recorded change made after that moment. Quotations moved to
+    cold storage start from `load_archived(quotation_id)` (a row dict) instead.
+    Returns None if the quotation did not exist yet.
+    """
+    quotation = session.get(quotation_model, quotation_id)
+    if quotation is not None:
+        state = {attr: _plain(getattr(quotation, attr)) for attr in AUDITED_FIELDS}
+        created_at = quotation.created_at
+    else:
+        row = load_archived(quotation_id) if load_archived else None
+        if row is None:
+            return None
+        state = {attr: _plain(row.get(attr)) for attr in AUDITED_FIELDS}
+        created_at = row.get('created_at')
+
+    later = (session.query(event_model)
+             .filter(event_model.quotation_id == quotation_id, event_model.occurred_at > at)
+             .order_by(event_model.occurred_at.desc(), event_model.id.desc())
+             .all())
+    for evt in later:
+        if evt.action == 'created':
+            return None
+        for attr, diff in (evt.changes or {}).items():
+            if attr in state:
+                state[attr] = diff[0]
+
+    if created_at and created_at > at:
+        return None
+    return {AUDITED_FIELDS[attr]: value for attr, value in state.items()}
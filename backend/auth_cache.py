@@ -0,0 +1,102 @@
+# auth_cache.py - Self-contained token claims and a TTL cache of user token versions
+import threading
+import time
+
+from sqlalchemy import event, inspect
+
+DEFAULT_TTL_SECONDS = 30
+
+# Changing any of these invalidates the claims baked into issued tokens
+CLAIM_FIELDS = ('username', 'fname', 'lname', 'role', 'threshold', 'password_hash')
+
+
+class AuthenticatedUser:
+    """The request's user, rebuilt from token claims instead of a User row"""
+
+    __slots__ = ('id', 'username', 'fname', 'lname', 'role', 'threshold', 'token_version')
+
+    def __init__(self, id, username, fname=None, lname=None, role='user', threshold=0.0, token_version=1):
+        self.id = id
+        self.username = username
+        self.fname = fname
+        self.lname = lname
+        self.role = role
+        self.threshold = threshold
+        self.token_version = token_version
+
+    @classmethod
+    def from_claims(cls, claims):
+        return cls(claims['user_id'], claims.get('username'), claims.get('fname'), claims.get('lname'),
+                   claims.get('role') or 'user', claims.get('threshold') or 0.0, claims['uv'])
+
+    @classmethod
+    def from_model(cls, user):
+        return cls(user.id, user.username, user.fname, user.lname,
+                   user.role or 'user', user.threshold or 0.0, user.token_version or 1)
+
+    def __repr__(self):
+        return f"<AuthenticatedUser {self.username} ({self.role})>"
+
+
+def token_claims(user):
+    """Claims that let a request authorize without loading the user row"""
+    return {
+        'user_id': user.id,
+        'username': user.username,
+        'fname': user.fname,
+        'lname': user.lname,
+        'role': user.role,
+        'threshold': user.threshold or 0.0,
+        'uv': user.token_version or 1,
+    }
+
+
+class TokenVersionCache:
+    """
+    user_id -> current token_version, each entry kept for `ttl` seconds.
+    Local writes evict entries immediately; the TTL bounds how long another
+    process's change (password reset, role change) can go unnoticed.
+    """
+
+    def __init__(self, ttl=DEFAULT_TTL_SECONDS):
+        self.ttl = ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, user_id, load):
+        """Cached version for user_id, calling `load(user_id)` on a miss (None = no such user)"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+        if entry and entry[1] > now:
+            return entry[0]
+
+        version = load(user_id)
+        if version is not None:
+            with self._lock:
+                self._entries[user_id] = (version, now + self.ttl)
+        return version
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def register(user_model, cache):
+    """Bump token_version when claim fields change and evict the cached entry"""
+
+    def on_update(mapper, connection, target):
+        state = inspect(target)
+        if any(state.attrs[field].history.has_changes() for field in CLAIM_FIELDS):
+            target.token_version = (target.token_version or 1) + 1
+
+    def evict(mapper, connection, target):
+        cache.invalidate(target.id)
+
+    event.listen(user_model, 'before_update', on_update)
+    event.listen(user_model, 'after_update', evict)
+    event.listen(user_model, 'after_delete', evict)
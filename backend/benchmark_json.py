@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Encode-time benchmark for typical quotation payloads: Flask's stdlib provider
+versus FastJSONProvider (orjson). No database needed.
+
+    python benchmark_json.py [--repeat 20] [--list-size 500]
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(__file__))
+os.environ.setdefault('AUTO_MIGRATE', '0')
+
+from flask.json.provider import DefaultJSONProvider
+
+from app import app, Quotation
+from json_provider import FastJSONProvider, orjson_available
+
+
+def sample_quotation(index, services_per_header=12):
+    """A quotation shaped like real ones: several headers, long subservice prose"""
+    prose = "Preparation and filing of the quarterly progress report with supporting documents. " * 3
+    headers, breakdown = [], []
+    for h in range(4):
+        services = [
+            {
+                'id': f'service-{h}-{s}', 'name': f'SERVICE {h}-{s}', 'label': f'Service {h}-{s}',
+                'subServices': [{'id': f'sub-{h}-{s}-{k}', 'text': prose} for k in range(4)],
+                'baseAmount': 15000.0 + s, 'totalAmount': 17700.0 + s, 'finalAmount': 16815.0 + s,
+            }
+            for s in range(services_per_header)
+        ]
+        headers.append({'header': f'Package {h}', 'name': f'Package {h}', 'services': services})
+        breakdown.append({'header': f'Package {h}', 'services': services, 'subtotal': 212400.0})
+
+    return Quotation(
+        id=f'REQ {index:04d}', developer_type='category 1', project_region='Mumbai City',
+        plot_area=1200.0, developer_name='Skyline Developers', project_name='Harbour Heights',
+        validity='7 days', payment_schedule='50%', headers=headers, pricing_breakdown=breakdown,
+        applicable_terms=['Term A', 'Term B'], custom_terms=[], total_amount=849600.0,
+        discount_amount=0.0, discount_percent=0.0, status='completed', created_at=datetime(2025, 1, 1),
+        terms_accepted=True, requires_approval=False, display_mode='bifurcated', version=1
+    )
+
+
+def measure(provider, payload, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        body = provider.response(payload).get_data()
+        best = min(best, time.perf_counter() - started)
+    return best, len(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--list-size', type=int, default=500)
+    args = parser.parse_args()
+
+    quotations = [sample_quotation(i) for i in range(args.list_size)]
+    payloads = {
+        'single quotation (to_dict)': {'success': True, 'data': quotations[0].to_dict()},
+        f'list of {args.list_size} (to_dict)': {'success': True, 'quotations': [q.to_dict() for q in quotations]},
+        f'list of {args.list_size} (to_list_dict)': {'success': True, 'quotations': [q.to_list_dict() for q in quotations]},
+    }
+
+    stdlib = DefaultJSONProvider(app)
+    stdlib.compact = True
+    fast = FastJSONProvider(app)
+    fast.compact = True
+
+    print(f"orjson available: {orjson_available()}  (best of {args.repeat})")
+    print(f"{'payload':36} {'bytes':>10} {'stdlib ms':>10} {'fast ms':>10} {'speedup':>8}")
+    with app.app_context():
+        for name, payload in payloads.items():
+            before, size = measure(stdlib, payload, args.repeat)
+            after, _ = measure(fast, payload, args.repeat)
+            print(f"{name:36} {size:>10,} {before * 1000:>10.2f} {after * 1000:>10.2f} {before / after:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
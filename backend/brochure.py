@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Brochure pages from backend/images, compiled to PDF once and kept in memory.
+
+The source JPGs are ~1200 DPI scans. Each quality level resamples them to a
+target DPI for A4 and recompresses; the variants are written to CACHE_DIR
+named by source hash, so they survive restarts and are rebuilt only when an
+image changes. Build them ahead of time with:
+
+    python brochure.py build [--quality screen print]
+"""
+import argparse
+import hashlib
+import io
+import logging
+import os
+import sys
+import threading
+import warnings
+
+from PIL import Image
+from pypdf import PdfReader, PdfWriter
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfgen import canvas
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+IMAGES_DIR = os.path.join(BASE_DIR, "images")
+CACHE_DIR = os.environ.get("BROCHURE_CACHE_DIR", os.path.join(BASE_DIR, "instance", "brochure"))
+IMAGE_EXTENSIONS = (".jpg", ".png", ".jpeg")
+COVER_NAME = "1"
+
+# Resampling target per quality level; None embeds the source image as-is
+QUALITIES = {
+    "screen": {"dpi": int(os.environ.get("BROCHURE_SCREEN_DPI", 110)), "jpeg_quality": 70},
+    "print": {"dpi": int(os.environ.get("BROCHURE_PRINT_DPI", 220)), "jpeg_quality": 85},
+    "original": None,
+}
+DEFAULT_QUALITY = os.environ.get("PDF_IMAGE_QUALITY", "print")
+
+A4_INCHES = (A4[0] / 72.0, A4[1] / 72.0)
+
+
+def find_images(images_dir=IMAGES_DIR):
+    """
+    (cover, tail) image paths. The cover is 1.*; the tail is every other
+    numbered image in numeric order (2.jpg, 3.jpg, ... 9.jpg, 10.jpg).
+    """
+    if not os.path.isdir(images_dir):
+        return None, []
+
+    numbered = {}
+    for name in os.listdir(images_dir):
+        base, ext = os.path.splitext(name)
+        if base.isdigit() and ext.lower() in IMAGE_EXTENSIONS:
+            # Same preference order as before when 2.jpg and 2.png both exist
+            current = numbered.get(int(base))
+            if current is None or IMAGE_EXTENSIONS.index(ext.lower()) < IMAGE_EXTENSIONS.index(
+                    os.path.splitext(current)[1].lower()):
+                numbered[int(base)] = os.path.join(images_dir, name)
+
+    cover = numbered.pop(int(COVER_NAME), None)
+    return cover, [numbered[n] for n in sorted(numbered)]
+
+
+def file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def target_size(size, dpi):
+    """Pixel size that fits an A4 page at `dpi`, never upscaling"""
+    width, height = size
+    scale = min(A4_INCHES[0] * dpi / width, A4_INCHES[1] * dpi / height, 1.0)
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def optimize_image(source, destination, dpi, jpeg_quality):
+    """Resample `source` to `dpi` on A4 and save it as a JPEG at `destination`"""
+    with warnings.catch_warnings():
+        # The bundled scans exceed Pillow's decompression-bomb threshold; they are trusted assets
+        warnings.simplefilter("ignore", Image.DecompressionBombWarning)
+        with Image.open(source) as image:
+            size = target_size(image.size, dpi)
+            # JPEG: let the decoder downscale by a power of two first, then resample the rest
+            image.draft("RGB", size)
+            image = image.convert("RGB")
+            if image.size != size:
+                image = image.resize(size, Image.LANCZOS)
+
+    os.makedirs(os.path.dirname(destination), exist_ok=True)
+    temp = f"{destination}.{os.getpid()}.tmp"
+    image.save(temp, "JPEG", quality=jpeg_quality, optimize=True, dpi=(dpi, dpi))
+    os.replace(temp, destination)
+    return destination
+
+
+def variant_path(source, digest, quality, cache_dir=None):
+    """Path of the image to embed for `quality`, building the resampled variant if missing"""
+    settings = QUALITIES[quality]
+    if settings is None:
+        return source
+    name = f"{digest[:32]}-{quality}-{settings['dpi']}dpi-q{settings['jpeg_quality']}.jpg"
+    destination = os.path.join(cache_dir or CACHE_DIR, name)
+    if not os.path.exists(destination):
+        optimize_image(source, destination, settings["dpi"], settings["jpeg_quality"])
+        logger.info(f"Built {quality} variant of {source}: {destination}")
+    return destination
+
+
+def render_image_page(image_path):
+    """One A4 page with the image fitted and centred, as PDF bytes"""
+    buffer = io.BytesIO()
+    c = canvas.Canvas(buffer, pagesize=A4)
+    width, height = A4
+    try:
+        c.drawImage(image_path, 0, 0, width, height, preserveAspectRatio=True, anchor="c")
+    except Exception as e:
+        logger.warning(f"Could not draw image {image_path}: {e}")
+    c.showPage()
+    c.save()
+    return buffer.getvalue()
+
+
+class BrochurePageCache:
+    """
+    Compiled brochure pages keyed by image content hash and quality. The hash
+    is only recomputed when a file's mtime or size changes, so a steady-state
+    lookup is one stat() per image. Pages are cloned into each writer under a
+    lock because pypdf readers resolve objects lazily from a shared stream.
+    """
+
+    def __init__(self, cache_dir=None):
+        self.cache_dir = cache_dir
+        self._stats = {}     # path -> ((mtime_ns, size), digest)
+        self._readers = {}   # (digest, quality) -> PdfReader over the compiled page
+        self._lock = threading.Lock()
+        self.compiled = 0
+
+    def _digest(self, path):
+        st = os.stat(path)
+        stat_key = (st.st_mtime_ns, st.st_size)
+        known = self._stats.get(path)
+        if known and known[0] == stat_key:
+            return known[1]
+        digest = file_digest(path)
+        self._stats[path] = (stat_key, digest)
+        return digest
+
+    def reader(self, image_path, quality=None):
+        quality = quality or DEFAULT_QUALITY
+        with self._lock:
+            digest = self._digest(image_path)
+            reader = self._readers.get((digest, quality))
+            if reader is None:
+                source = variant_path(image_path, digest, quality, self.cache_dir)
+                reader = PdfReader(io.BytesIO(render_image_page(source)))
+                self._readers[(digest, quality)] = reader
+                self.compiled += 1
+                # Drop pages whose source image changed
+                live = {d for _, d in self._stats.values()}
+                for stale in [key for key in self._readers if key[0] not in live]:
+                    del self._readers[stale]
+            return reader
+
+    def append(self, writer, image_paths, quality=None):
+        for path in image_paths:
+            try:
+                reader = self.reader(path, quality)
+                with self._lock:
+                    for page in reader.pages:
+                        writer.add_page(page)
+            except Exception as e:
+                logger.warning(f"Could not add brochure page {path}: {e}")
+
+    def asset_version(self, quality=None, images_dir=IMAGES_DIR):
+        """Hash of the brochure images' contents and the quality settings they are embedded with"""
+        quality = quality or DEFAULT_QUALITY
+        cover, tail = find_images(images_dir)
+        digest = hashlib.sha256(repr((quality, QUALITIES.get(quality))).encode("utf-8"))
+        with self._lock:
+            for path in ([cover] if cover else []) + tail:
+                digest.update(f"{os.path.basename(path)}:{self._digest(path)};".encode("utf-8"))
+        return digest.hexdigest()[:16]
+
+    def clear(self):
+        with self._lock:
+            self._stats.clear()
+            self._readers.clear()
+
+
+pages = BrochurePageCache()
+
+
+def add_pdf(writer, source):
+    """Append every page of a PDF (bytes, path or file object) to writer"""
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    try:
+        for page in PdfReader(source).pages:
+            writer.add_page(page)
+    except Exception as e:
+        logger.warning(f"Could not read PDF {source}: {e}")
+
+
+def merge(generated_pdf, final_pdf=None, images_dir=IMAGES_DIR, cache=None, quality=None):
+    """
+    Cover image page, generated content, tail image pages. Returns the PDF
+    bytes, or writes them to final_pdf and returns that path.
+    """
+    cache = cache or pages
+    cover, tail = find_images(images_dir)
+    writer = PdfWriter()
+    if cover:
+        cache.append(writer, [cover], quality)
+    add_pdf(writer, generated_pdf)
+    cache.append(writer, tail, quality)
+
+    if final_pdf:
+        with open(final_pdf, "wb") as f:
+            writer.write(f)
+        return final_pdf
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+def build(qualities=None, images_dir=IMAGES_DIR, cache_dir=None, progress=print):
+    """Build every resampled variant ahead of the first download"""
+    cover, tail = find_images(images_dir)
+    for quality in qualities or [q for q in QUALITIES if QUALITIES[q]]:
+        for path in ([cover] if cover else []) + tail:
+            built = variant_path(path, file_digest(path), quality, cache_dir)
+            progress(f"{quality:8s} {os.path.basename(path)}: "
+                     f"{os.path.getsize(path) // 1024} KB -> {os.path.getsize(built) // 1024} KB")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build resampled brochure image variants")
+    parser.add_argument("command", choices=["build"], nargs="?", default="build")
+    parser.add_argument("--quality", nargs="+", choices=[q for q in QUALITIES if QUALITIES[q]],
+                        help="Quality levels to build (default: all)")
+    args = parser.parse_args(argv)
+    build(args.quality)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
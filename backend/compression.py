@@ -0,0 +1,153 @@
+# compression.py - gzip/brotli negotiation for API responses, with a cache for immutable bodies
+import gzip
+import logging
+import threading
+from collections import OrderedDict
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MIN_SIZE = 1024
+DEFAULT_CACHE_BYTES = 32 * 1024 * 1024
+
+# Compression level per content type: (gzip, brotli). Only text is listed: PDFs,
+# images and archives are already deflate/JPEG/zip streams and go out as they are.
+LEVELS = {
+    'application/json': (6, 5),
+    'text/html': (6, 5),
+    'text/csv': (6, 5),
+    'text/plain': (6, 5),
+}
+
+# Send uncompressed when compression saves less than this fraction
+MIN_SAVING = 0.1
+
+ENCODINGS = ('br', 'gzip')
+
+
+def brotli_available():
+    return brotli is not None
+
+
+def parse_accept_encoding(header):
+    """Encodings the client accepts, mapped to their q-values"""
+    accepted = {}
+    for part in (header or '').split(','):
+        pieces = [p.strip() for p in part.split(';')]
+        if not pieces[0]:
+            continue
+        q = 1.0
+        for param in pieces[1:]:
+            if param.startswith('q='):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        accepted[pieces[0].lower()] = q
+    return accepted
+
+
+def choose_encoding(header):
+    accepted = parse_accept_encoding(header)
+    candidates = [e for e in ENCODINGS if e != 'br' or brotli is not None]
+    wildcard = accepted.get('*', 0.0)
+    best, best_q = None, 0.0
+    for encoding in candidates:
+        q = accepted.get(encoding, wildcard)
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def compress(data, encoding, mimetype):
+    gzip_level, brotli_level = LEVELS.get(mimetype, (6, 5))
+    if encoding == 'br':
+        return brotli.compress(data, quality=brotli_level)
+    return gzip.compress(data, compresslevel=gzip_level, mtime=0)
+
+
+def etag_matches(etags, etag):
+    """True if a request's If-(None-)Match covers `etag` or one of its encoded variants"""
+    return etags.contains(etag) or any(etags.contains(f"{etag}-{encoding}") for encoding in ENCODINGS)
+
+
+class CompressedBodyCache:
+    """LRU of compressed bodies keyed by (path, ETag, encoding), bounded by total bytes"""
+
+    def __init__(self, max_bytes=DEFAULT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            body = self._entries.get(key)
+            if body is not None:
+                self._entries.move_to_end(key)
+            return body
+
+    def put(self, key, body):
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._size -= len(self._entries.pop(key))
+            self._entries[key] = body
+            self._size += len(body)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+
+def init_app(app, min_size=DEFAULT_MIN_SIZE, cache=None):
+    """Register the after_request hook that compresses eligible responses"""
+    from flask import request
+
+    cache = cache if cache is not None else CompressedBodyCache()
+
+    @app.after_request
+    def compress_response(response):
+        mimetype = response.mimetype
+        if mimetype not in LEVELS or 'Content-Encoding' in response.headers:
+            return response
+        if response.status_code not in (200, 201):
+            # 206 range slices, 304s and errors go out untouched
+            return response
+        if response.is_streamed or response.direct_passthrough:
+            # Generators (exports, SSE) and send_file bodies are sent as produced, never buffered
+            return response
+
+        response.vary.add('Accept-Encoding')
+        encoding = choose_encoding(request.headers.get('Accept-Encoding'))
+        if not encoding:
+            return response
+
+        etag, weak = response.get_etag()
+        key = (request.path, etag, encoding) if etag and not weak else None
+        body = cache.get(key) if key else None
+
+        if body is None:
+            data = response.get_data()
+            if len(data) < min_size:
+                return response
+            body = compress(data, encoding, mimetype)
+            if len(body) > len(data) * (1 - MIN_SAVING):
+                return response
+            if key:
+                cache.put(key, body)
+
+        response.set_data(body)
+        response.headers['Content-Encoding'] = encoding
+        response.headers.pop('Accept-Ranges', None)
+        if etag:
+            # A different representation needs a different validator
+            response.set_etag(f"{etag}-{encoding}", weak=weak)
+        return response
+
+    app.extensions['compression_cache'] = cache
+    return cache
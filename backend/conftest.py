@@ -0,0 +1,9 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+import testing_db
+
+# Runs before any test module imports app, so the whole session shares one temp database
+testing_db.use_temporary_database()
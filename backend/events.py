@@ -0,0 +1,184 @@
+# events.py - In-process event bus for quotation status transitions (feeds the SSE stream)
+import itertools
+import json
+import queue
+import threading
+from collections import deque
+from datetime import datetime
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import object_session
+
+APPROVER_ROLES = ('admin', 'manager')
+
+SUBSCRIBER_QUEUE_SIZE = 100
+HISTORY_SIZE = 200
+HEARTBEAT_SECONDS = 15
+
+_SESSION_KEY = 'quotation_events'
+
+
+class Subscription:
+    """A subscriber's bounded queue plus the filter deciding which events it receives"""
+
+    def __init__(self, accepts, maxsize=SUBSCRIBER_QUEUE_SIZE):
+        self.accepts = accepts
+        self.queue = queue.Queue(maxsize=maxsize)
+
+    def offer(self, evt):
+        if not self.accepts(evt):
+            return
+        try:
+            self.queue.put_nowait(evt)
+        except queue.Full:
+            # Slow consumer: drop its oldest event rather than block publishers
+            try:
+                self.queue.get_nowait()
+            except queue.Empty:
+                pass
+            self.queue.put_nowait(evt)
+
+    def get(self, timeout=HEARTBEAT_SECONDS):
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class EventBus:
+    """Fan-out of committed quotation events to every open stream, in this process only"""
+
+    def __init__(self, history_size=HISTORY_SIZE):
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._history = deque(maxlen=history_size)
+        self._ids = itertools.count(1)
+
+    def subscribe(self, accepts, last_event_id=None):
+        subscription = Subscription(accepts)
+        with self._lock:
+            # Replay what a reconnecting client missed, as far as history reaches
+            if last_event_id is not None:
+                for evt in self._history:
+                    if evt['id'] > last_event_id:
+                        subscription.offer(evt)
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def publish(self, event_type, payload):
+        with self._lock:
+            evt = {
+                'id': next(self._ids),
+                'type': event_type,
+                'at': datetime.utcnow().isoformat(),
+                'quotation': payload,
+            }
+            self._history.append(evt)
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            subscription.offer(evt)
+        return evt
+
+    @property
+    def subscriber_count(self):
+        with self._lock:
+            return len(self._subscribers)
+
+
+bus = EventBus()
+
+
+def event_type_for(status, approved):
+    """Name of a status transition: the new status, or 'approved' for an approver's sign-off"""
+    if status == 'completed' and approved:
+        return 'approved'
+    return status
+
+
+def quotation_payload(source, previous_status):
+    """Event body from a Quotation instance or a quotation row mapping"""
+    get = source.get if hasattr(source, 'get') else lambda key: getattr(source, key, None)
+    return {
+        'id': get('id'),
+        'status': get('status'),
+        'previousStatus': previous_status,
+        'createdBy': get('created_by'),
+        'requiresApproval': bool(get('requires_approval')),
+        'approvedBy': get('approved_by'),
+        'developerName': get('developer_name'),
+        'projectName': get('project_name'),
+        'totalAmount': get('total_amount'),
+        'version': get('version'),
+    }
+
+
+def _queue_event(target, event_type, previous_status):
+    session = object_session(target)
+    if session is None:
+        return
+    session.info.setdefault(_SESSION_KEY, []).append((event_type, quotation_payload(target, previous_status)))
+
+
+def register(quotation_model, session, event_bus=None):
+    """
+    Collect status transitions as quotations are flushed and publish them only
+    once the transaction commits; a rollback discards them.
+    """
+    event_bus = event_bus or bus
+
+    def on_insert(mapper, connection, target):
+        # Bulk-created quotations can start out pending approval or completed
+        status = target.status or 'draft'
+        _queue_event(target, 'created' if status == 'draft' else event_type_for(status, False), None)
+
+    def on_update(mapper, connection, target):
+        state = inspect(target)
+        history = state.attrs.status.history
+        if not history.has_changes():
+            return
+        previous_status = history.deleted[0] if history.deleted else None
+        approved = state.attrs.approved_by.history.has_changes() and bool(target.approved_by)
+        _queue_event(target, event_type_for(target.status, approved), previous_status)
+
+    def on_commit(committed_session):
+        for event_type, payload in committed_session.info.pop(_SESSION_KEY, []):
+            event_bus.publish(event_type, payload)
+
+    def on_rollback(rolled_back_session, previous_transaction):
+        rolled_back_session.info.pop(_SESSION_KEY, None)
+
+    event.listen(quotation_model, 'after_insert', on_insert)
+    event.listen(quotation_model, 'after_update', on_update)
+    event.listen(session, 'after_commit', on_commit)
+    event.listen(session, 'after_soft_rollback', on_rollback)
+
+
+def subscriber_filter(role, owner_names):
+    """Approvers see every transition; other users only quotations they created"""
+    if role in APPROVER_ROLES:
+        return lambda evt: True
+    names = {name for name in owner_names if name}
+    return lambda evt: evt['quotation'].get('createdBy') in names
+
+
+def format_sse(evt):
+    return f"id: {evt['id']}\nevent: {evt['type']}\ndata: {json.dumps(evt, default=str)}\n\n"
+
+
+def sse_stream(subscription, event_bus=None, heartbeat=HEARTBEAT_SECONDS):
+    """Yield SSE frames until the client disconnects; comments keep proxies from timing out"""
+    event_bus = event_bus or bus
+    try:
+        yield "retry: 5000\n\n"
+        while True:
+            evt = subscription.get(timeout=heartbeat)
+            if evt is None:
+                yield ": keep-alive\n\n"
+            else:
+                yield format_sse(evt)
+    finally:
+        event_bus.unsubscribe(subscription)
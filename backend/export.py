@@ -0,0 +1,226 @@
+# export.py - Streaming bulk export of quotations (CSV, NDJSON, XLSX)
+import csv
+import io
+import json
+import os
+import tempfile
+from datetime import datetime
+
+from sqlalchemy import select
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+DEFAULT_CHUNK_SIZE = 500
+
+# (output column, quotation table column)
+QUOTATION_COLUMNS = [
+    ('id', 'id'),
+    ('developerType', 'developer_type'),
+    ('projectRegion', 'project_region'),
+    ('plotArea', 'plot_area'),
+    ('developerName', 'developer_name'),
+    ('projectName', 'project_name'),
+    ('contactMobile', 'contact_mobile'),
+    ('contactEmail', 'contact_email'),
+    ('reraNumber', 'rera_number'),
+    ('validity', 'validity'),
+    ('paymentSchedule', 'payment_schedule'),
+    ('totalAmount', 'total_amount'),
+    ('discountAmount', 'discount_amount'),
+    ('discountPercent', 'discount_percent'),
+    ('status', 'status'),
+    ('createdBy', 'created_by'),
+    ('createdAt', 'created_at'),
+    ('approvedBy', 'approved_by'),
+    ('approvedAt', 'approved_at'),
+    ('displayMode', 'display_mode'),
+]
+
+PRICING_COLUMNS = ['header', 'serviceId', 'serviceName', 'baseAmount', 'totalAmount', 'finalAmount']
+
+
+def export_columns(flatten_pricing=False):
+    columns = [name for name, _ in QUOTATION_COLUMNS]
+    if flatten_pricing:
+        return columns + ['line' + c[0].upper() + c[1:] for c in PRICING_COLUMNS]
+    return columns + ['services']
+
+
+def _plain(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _load_json(value):
+    if isinstance(value, str):
+        try:
+            return json.loads(value)
+        except ValueError:
+            return []
+    return value or []
+
+
+def iter_quotation_rows(session, quotation_table, filters=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Yield raw quotation rows through a streamed cursor, chunk_size rows per fetch.
+    Core rows are used instead of ORM instances so nothing accumulates in the session.
+    """
+    filters = filters or {}
+    c = quotation_table.c
+    stmt = select(quotation_table).order_by(c.created_at, c.id)
+
+    if filters.get('status'):
+        stmt = stmt.where(c.status == filters['status'])
+    if filters.get('created_from'):
+        stmt = stmt.where(c.created_at >= filters['created_from'])
+    if filters.get('created_to'):
+        stmt = stmt.where(c.created_at < filters['created_to'])
+
+    result = session.execute(stmt.execution_options(stream_results=True, yield_per=chunk_size))
+    for partition in result.mappings().partitions(chunk_size):
+        for row in partition:
+            yield row
+
+
+def iter_records(rows, flatten_pricing=False, include_nested=False):
+    """Turn quotation rows into export records, optionally one record per pricing line"""
+    for row in rows:
+        base = {name: _plain(row[column]) for name, column in QUOTATION_COLUMNS}
+
+        if not flatten_pricing:
+            headers = _load_json(row['headers'])
+            base['services'] = '; '.join(
+                service.get('name') or service.get('label') or ''
+                for header in headers if isinstance(header, dict)
+                for service in header.get('services', []) or [] if isinstance(service, dict)
+            )
+            if include_nested:
+                base['pricingBreakdown'] = _load_json(row['pricing_breakdown'])
+            yield base
+            continue
+
+        lines = 0
+        for breakdown in _load_json(row['pricing_breakdown']):
+            if not isinstance(breakdown, dict):
+                continue
+            header_name = breakdown.get('header') or breakdown.get('name')
+            for service in breakdown.get('services', []) or []:
+                if not isinstance(service, dict):
+                    continue
+                record = dict(base)
+                record.update({
+                    'lineHeader': header_name,
+                    'lineServiceId': service.get('id'),
+                    'lineServiceName': service.get('name') or service.get('label'),
+                    'lineBaseAmount': service.get('baseAmount'),
+                    'lineTotalAmount': service.get('totalAmount'),
+                    'lineFinalAmount': service.get('finalAmount', service.get('totalAmount')),
+                })
+                lines += 1
+                yield record
+
+        if not lines:
+            # Keep unpriced quotations visible in flattened exports
+            yield dict(base, **{column: None for column in export_columns(True)[len(QUOTATION_COLUMNS):]})
+
+
+def stream_csv(records, columns, rows_per_chunk=DEFAULT_CHUNK_SIZE):
+    """Yield CSV text in chunks of rows_per_chunk records"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns, extrasaction='ignore')
+    writer.writeheader()
+
+    pending = 0
+    for record in records:
+        writer.writerow(record)
+        pending += 1
+        if pending >= rows_per_chunk:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def stream_ndjson(records, rows_per_chunk=DEFAULT_CHUNK_SIZE):
+    """Yield newline-delimited JSON in chunks of rows_per_chunk records"""
+    lines = []
+    for record in records:
+        lines.append(json.dumps(record, default=str))
+        if len(lines) >= rows_per_chunk:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+    if lines:
+        yield '\n'.join(lines) + '\n'
+
+
+def xlsx_available():
+    try:
+        import openpyxl  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def stream_xlsx(records, columns, read_size=64 * 1024):
+    """
+    Write records through an openpyxl write-only workbook (rows are flushed to
+    its temp files as they are appended) and stream the finished file back.
+    XLSX is a zip archive, so bytes can only be sent once the workbook is closed.
+    """
+    try:
+        from openpyxl import Workbook
+    except ImportError:
+        raise RuntimeError("XLSX export requires openpyxl (pip install openpyxl)")
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('Quotations')
+    sheet.append(columns)
+    for record in records:
+        sheet.append([record.get(column) for column in columns])
+
+    fd, path = tempfile.mkstemp(suffix='.xlsx')
+    os.close(fd)
+    try:
+        workbook.save(path)
+        with open(path, 'rb') as f:
+            while True:
+                chunk = f.read(read_size)
+                if not chunk:
+                    break
+                yield chunk
+    finally:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def export_stream(session, quotation_table, fmt, filters=None, flatten_pricing=False,
+                  chunk_size=DEFAULT_CHUNK_SIZE):
+    """Return a generator of output chunks for the requested format"""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format '{fmt}'. Use one of: {', '.join(EXPORT_FORMATS)}")
+
+    rows = iter_quotation_rows(session, quotation_table, filters, chunk_size)
+    columns = export_columns(flatten_pricing)
+
+    if fmt == 'csv':
+        return stream_csv(iter_records(rows, flatten_pricing), columns, chunk_size)
+    if fmt == 'ndjson':
+        return stream_ndjson(iter_records(rows, flatten_pricing, include_nested=True), chunk_size)
+    return stream_xlsx(iter_records(rows, flatten_pricing), columns)
+
+
+def parse_date(value):
+    """Accept YYYY-MM-DD or full ISO timestamps from query strings and CLI flags"""
+    if not value:
+        return None
+    return datetime.fromisoformat(value.replace('Z', '+00:00')).replace(tzinfo=None)
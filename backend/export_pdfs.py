@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Render quotation PDFs in bulk into one ZIP from the command line.
+
+Examples:
+    python export_pdfs.py --developer "Acme%" --from 2026-09-01 --to 2026-10-01 -o september.zip
+    python export_pdfs.py --ids "REQ 0001" "REQ 0002" --summary --quality screen -o selected.zip
+"""
+
+import argparse
+import sys
+
+from app import app, pdf_batch_ids, pdf_batch_specs, pdf_files, pdf_render_options, PDF_BATCH_WORKERS
+import pdf_batch
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render quotation PDFs into a ZIP")
+    parser.add_argument("--output", "-o", required=True, help="ZIP file to write")
+    parser.add_argument("--ids", nargs="+", help="Quotation ids (default: every quotation matching the filters)")
+    parser.add_argument("--status", default="completed", help="Only quotations with this status")
+    parser.add_argument("--developer", help="Developer name, SQL LIKE pattern (case-insensitive)")
+    parser.add_argument("--developer-type", help="Developer type, e.g. 'category 1'")
+    parser.add_argument("--from", dest="created_from", help="Created on/after (YYYY-MM-DD)")
+    parser.add_argument("--to", dest="created_to", help="Created before (YYYY-MM-DD)")
+    parser.add_argument("--summary", action="store_true", help="Summary layout")
+    parser.add_argument("--multipage", action="store_true", help="Multi-page layout")
+    parser.add_argument("--quality", help="Brochure image quality: screen, print or original")
+    parser.add_argument("--engine", help="wkhtmltopdf, reportlab or auto")
+    parser.add_argument("--workers", type=int, default=PDF_BATCH_WORKERS)
+    args = parser.parse_args()
+
+    options = {"summary": str(args.summary), "multipage": str(args.multipage), "engine": args.engine}
+    if args.quality:
+        options["quality"] = args.quality
+
+    with app.app_context():
+        try:
+            pdf_render_options(options)
+            quotation_ids = args.ids or pdf_batch_ids({
+                "status": args.status,
+                "developerName": args.developer,
+                "developerType": args.developer_type,
+                "from": args.created_from,
+                "to": args.created_to,
+            }, limit=None)
+        except ValueError as e:
+            parser.error(str(e))
+        if not quotation_ids:
+            print("No quotations match", file=sys.stderr)
+            return 1
+
+        print(f"📦 Rendering {len(quotation_ids)} quotation(s) with {args.workers} worker(s)", file=sys.stderr)
+        results = pdf_batch.render_batch(pdf_batch_specs(quotation_ids, options), pdf_files, workers=args.workers)
+        with open(args.output, "wb") as out:
+            for chunk in pdf_batch.stream_zip(results):
+                out.write(chunk)
+        print(f"✅ PDFs written to {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Export quotations to CSV, NDJSON or XLSX from the command line.
+
+Examples:
+    python export_quotations.py --format csv --output quotations.csv
+    python export_quotations.py --format xlsx --flatten-pricing --from 2026-09-01 --to 2026-10-01 -o september.xlsx
+"""
+
+import argparse
+import sys
+
+from app import app, db, Quotation
+import export
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream a quotation export")
+    parser.add_argument("--format", choices=sorted(export.EXPORT_FORMATS), default="csv")
+    parser.add_argument("--output", "-o", help="Output file (default: stdout, not allowed for xlsx)")
+    parser.add_argument("--status", help="Only export quotations with this status")
+    parser.add_argument("--from", dest="created_from", help="Created on/after (YYYY-MM-DD)")
+    parser.add_argument("--to", dest="created_to", help="Created before (YYYY-MM-DD)")
+    parser.add_argument("--flatten-pricing", action="store_true", help="One row per pricing line")
+    parser.add_argument("--chunk-size", type=int, default=export.DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    if args.format == "xlsx" and not args.output:
+        parser.error("--output is required for xlsx")
+
+    filters = {
+        "status": args.status,
+        "created_from": export.parse_date(args.created_from),
+        "created_to": export.parse_date(args.created_to),
+    }
+
+    with app.app_context():
+        chunks = export.export_stream(db.session, Quotation.__table__, args.format, filters,
+                                      flatten_pricing=args.flatten_pricing, chunk_size=args.chunk_size)
+        if args.output:
+            if args.format == "xlsx":
+                out = open(args.output, "wb")
+            else:
+                out = open(args.output, "w", encoding="utf-8", newline="")
+            with out:
+                for chunk in chunks:
+                    out.write(chunk)
+            print(f"✅ Export written to {args.output}", file=sys.stderr)
+        else:
+            for chunk in chunks:
+                sys.stdout.write(chunk)
+
+
+if __name__ == "__main__":
+    main()
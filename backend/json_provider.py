@@ -0,0 +1,60 @@
+# json_provider.py - Flask JSON provider backed by orjson, falling back to the stdlib encoder
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised only where orjson is missing
+    orjson = None
+
+# Datetimes go through default() so output matches Flask's stdlib provider (HTTP dates);
+# models already serialize their own timestamps as ISO strings
+_ORJSON_OPTIONS = (orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME) if orjson else 0
+
+
+def orjson_available():
+    return orjson is not None
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    Encodes with orjson when installed: bytes straight into the response body,
+    no intermediate str. Objects exposing to_dict() (models) can be passed to
+    jsonify directly. Anything orjson rejects (e.g. ints beyond 64 bits) is
+    re-encoded with the stdlib provider, so output never fails where it used to work.
+    """
+
+    sort_keys = False
+
+    def default(self, o):
+        to_dict = getattr(o, 'to_dict', None)
+        if callable(to_dict):
+            return to_dict()
+        return DefaultJSONProvider.default(o)
+
+    def dumps_bytes(self, obj, indent=False):
+        if orjson is not None:
+            options = _ORJSON_OPTIONS | (orjson.OPT_INDENT_2 if indent else 0)
+            try:
+                return orjson.dumps(obj, default=self.default, option=options)
+            except TypeError:
+                pass
+        if indent:
+            return super().dumps(obj, indent=2).encode('utf-8')
+        return super().dumps(obj, separators=(',', ':')).encode('utf-8')
+
+    def dumps(self, obj, **kwargs):
+        if kwargs or orjson is None:
+            # Callers asking for stdlib options (cls, indent, ...) get the stdlib encoder
+            kwargs.setdefault('default', self.default)
+            return super().dumps(obj, **kwargs)
+        return self.dumps_bytes(obj).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return super().loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(self.dumps_bytes(obj, indent) + b'\n', mimetype=self.mimetype)
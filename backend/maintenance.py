@@ -0,0 +1,91 @@
+# maintenance.py - Periodic batch jobs over the quotation table
+import logging
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy import select, update, and_
+
+logger = logging.getLogger(__name__)
+
+# Open quotations lapse once valid_until has passed; completed ones are settled and keep their status
+EXPIRABLE_STATUSES = ('draft', 'pending_approval')
+
+EXPIRED_STATUS = 'expired'
+
+
+def expire_quotations(engine, quotation_table, now=None):
+    """
+    Flip every lapsed quotation to 'expired' with a single UPDATE.
+    Returns the affected rows (with their previous status) so callers can
+    publish events and audit records for them.
+    """
+    now = now or datetime.utcnow()
+    c = quotation_table.c
+    lapsed = and_(c.valid_until.isnot(None), c.valid_until < now, c.status.in_(EXPIRABLE_STATUSES))
+
+    with engine.begin() as connection:
+        rows = [dict(row) for row in connection.execute(
+            select(c.id, c.status, c.created_by, c.requires_approval, c.approved_by,
+                   c.developer_name, c.project_name, c.total_amount, c.version)
+            .where(lapsed)
+        ).mappings()]
+        if not rows:
+            return []
+
+        # version is bumped by hand: Core updates bypass the ORM's version counter
+        connection.execute(
+            update(quotation_table)
+            .where(lapsed, c.id.in_([row['id'] for row in rows]))
+            .values(status=EXPIRED_STATUS, requires_approval=False, version=c.version + 1)
+        )
+
+    for row in rows:
+        row['version'] += 1
+    logger.info(f"Expired {len(rows)} quotations")
+    return rows
+
+
+class JobScheduler:
+    """
+    Runs registered jobs on a daemon thread that wakes every `interval` seconds.
+    Each job has its own period (`every`, defaulting to the tick interval).
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.jobs = []
+        self._stop = threading.Event()
+        self._thread = None
+
+    def add(self, job=None, every=None):
+        """Register a job; usable as @scheduler.add or @scheduler.add(every=86400)"""
+        if job is None:
+            return lambda fn: self.add(fn, every)
+        self.jobs.append({'job': job, 'every': every or self.interval, 'last_run': time.monotonic()})
+        return job
+
+    def run_once(self, force=True):
+        now = time.monotonic()
+        for entry in self.jobs:
+            if not force and now - entry['last_run'] < entry['every']:
+                continue
+            entry['last_run'] = now
+            job = entry['job']
+            try:
+                job()
+            except Exception as e:
+                logger.error(f"Maintenance job {getattr(job, '__name__', job)} failed: {str(e)}")
+
+    def start(self):
+        if self._thread is not None or not self.interval:
+            return
+        self._thread = threading.Thread(target=self._run, name='maintenance', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.run_once(force=False)
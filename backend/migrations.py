@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Versioned, idempotent schema migrations.
+
+Applied versions are recorded in the schema_version table. Every migration may be
+re-run safely: columns and indexes are only added when missing, and backfills
+only touch rows that still need them. Large backfills run in keyset-paginated
+chunks, one short transaction each, so the table is never locked for long.
+
+Runs automatically at startup (set AUTO_MIGRATE=0 to disable) or from the CLI:
+
+    python migrations.py status
+    python migrations.py upgrade [--target N] [--chunk-size 500]
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+from datetime import datetime
+
+from sqlalchemy import inspect, text
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 500
+
+MIGRATIONS = []
+
+
+def migration(version, description):
+    """Register a migration function under a version number"""
+    def register(fn):
+        MIGRATIONS.append((version, description, fn))
+        MIGRATIONS.sort(key=lambda m: m[0])
+        return fn
+    return register
+
+
+class MigrationContext:
+    """Helpers handed to each migration"""
+
+    def __init__(self, engine, chunk_size=DEFAULT_CHUNK_SIZE, progress=None):
+        self.engine = engine
+        self.chunk_size = chunk_size
+        self.progress = progress or (lambda message: logger.info(message))
+
+    @property
+    def dialect(self):
+        return self.engine.dialect.name
+
+    def has_table(self, table):
+        return inspect(self.engine).has_table(table)
+
+    def has_column(self, table, column):
+        return column in {c['name'] for c in inspect(self.engine).get_columns(table)}
+
+    def add_column(self, table, column, ddl):
+        """ALTER TABLE ... ADD COLUMN unless it already exists. Returns True when added."""
+        if not self.has_table(table) or self.has_column(table, column):
+            return False
+        with self.engine.begin() as connection:
+            connection.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+        self.progress(f"  added column {table}.{column}")
+        return True
+
+    def create_index(self, name, table, columns, unique=False):
+        """
+        Create an index if missing. PostgreSQL builds it CONCURRENTLY (no write lock);
+        SQLite has no online index build, so it is created in its own short transaction.
+        """
+        if not self.has_table(table):
+            return False
+        if name in {ix['name'] for ix in inspect(self.engine).get_indexes(table)}:
+            return False
+
+        unique_sql = "UNIQUE " if unique else ""
+        if self.dialect == 'postgresql':
+            with self.engine.connect() as connection:
+                connection = connection.execution_options(isolation_level='AUTOCOMMIT')
+                connection.execute(text(
+                    f"CREATE {unique_sql}INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} ({', '.join(columns)})"
+                ))
+        else:
+            with self.engine.begin() as connection:
+                connection.execute(text(
+                    f"CREATE {unique_sql}INDEX IF NOT EXISTS {name} ON {table} ({', '.join(columns)})"
+                ))
+        self.progress(f"  created index {name}")
+        return True
+
+    def backfill(self, table, key, columns, where, compute):
+        """
+        Update rows matching `where` in chunks ordered by `key`.
+        `compute(row)` returns the dict of new values for one row (or None to skip it).
+        Each chunk commits on its own; progress is reported after every chunk.
+        """
+        with self.engine.connect() as connection:
+            total = connection.execute(text(f"SELECT count(*) FROM {table} WHERE {where}")).scalar()
+        if not total:
+            return 0
+
+        done, last_key = 0, None
+        select_columns = ', '.join([key] + [c for c in columns if c != key])
+        while True:
+            keyset = f"AND {key} > :last_key" if last_key is not None else ""
+            with self.engine.begin() as connection:
+                rows = connection.execute(text(
+                    f"SELECT {select_columns} FROM {table} WHERE ({where}) {keyset} "
+                    f"ORDER BY {key} LIMIT :limit"
+                ), {'last_key': last_key, 'limit': self.chunk_size}).mappings().all()
+                if not rows:
+                    break
+
+                for row in rows:
+                    values = compute(row)
+                    if not values:
+                        continue
+                    assignments = ', '.join(f"{column} = :{column}" for column in values)
+                    connection.execute(
+                        text(f"UPDATE {table} SET {assignments} WHERE {key} = :_key"),
+                        dict(values, _key=row[key])
+                    )
+
+            last_key = rows[-1][key]
+            done += len(rows)
+            self.progress(f"  backfilled {done}/{total} rows of {table}")
+        return done
+
+
+def ensure_version_table(engine):
+    with engine.begin() as connection:
+        connection.execute(text(
+            "CREATE TABLE IF NOT EXISTS schema_version ("
+            "version INTEGER PRIMARY KEY, "
+            "description VARCHAR(200) NOT NULL, "
+            "applied_at DATETIME NOT NULL, "
+            "duration_ms INTEGER)"
+        ))
+
+
+def applied_versions(engine):
+    ensure_version_table(engine)
+    with engine.connect() as connection:
+        return {row[0] for row in connection.execute(text("SELECT version FROM schema_version"))}
+
+
+def pending_migrations(engine, target=None):
+    applied = applied_versions(engine)
+    return [
+        m for m in MIGRATIONS
+        if m[0] not in applied and (target is None or m[0] <= target)
+    ]
+
+
+def upgrade(engine, target=None, chunk_size=DEFAULT_CHUNK_SIZE, progress=None):
+    """Apply pending migrations in order. Returns the versions applied."""
+    context = MigrationContext(engine, chunk_size, progress)
+    applied = []
+    for version, description, fn in pending_migrations(engine, target):
+        context.progress(f"Applying migration {version}: {description}")
+        started = time.monotonic()
+        fn(context)
+        with engine.begin() as connection:
+            # Another process may have raced us to the same migration; both runs are idempotent
+            if connection.execute(text("SELECT 1 FROM schema_version WHERE version = :v"), {'v': version}).first():
+                continue
+            connection.execute(text(
+                "INSERT INTO schema_version (version, description, applied_at, duration_ms) "
+                "VALUES (:version, :description, :applied_at, :duration_ms)"
+            ), {
+                'version': version,
+                'description': description,
+                'applied_at': datetime.utcnow().isoformat(' '),
+                'duration_ms': int((time.monotonic() - started) * 1000),
+            })
+        applied.append(version)
+    return applied
+
+
+# --- Migrations -------------------------------------------------------------
+# Replaces fix_db_migration.py, migrate_database.py, recreate_database.py and
+# force_db_recreation.py. Never drop data here; add, backfill, index.
+
+@migration(1, "quotation.display_mode")
+def add_display_mode(ctx):
+    ctx.add_column('quotation', 'display_mode', "VARCHAR(20) DEFAULT 'bifurcated'")
+    ctx.backfill('quotation', 'id', ['display_mode'], "display_mode IS NULL",
+                 lambda row: {'display_mode': 'bifurcated'})
+
+
+@migration(2, "quotation.version for optimistic concurrency")
+def add_version(ctx):
+    ctx.add_column('quotation', 'version', "INTEGER NOT NULL DEFAULT 1")
+
+
+@migration(3, "quotation.valid_until with index and backfill")
+def add_valid_until(ctx):
+    from validity import compute_valid_until
+
+    def compute(row):
+        created_at = row['created_at']
+        if isinstance(created_at, str):
+            created_at = datetime.fromisoformat(created_at)
+        valid_until = compute_valid_until(created_at, row['validity'])
+        # Same text format SQLAlchemy's SQLite DateTime type writes
+        return {'valid_until': valid_until.strftime('%Y-%m-%d %H:%M:%S.%f')} if valid_until else None
+
+    ctx.add_column('quotation', 'valid_until', "DATETIME")
+    ctx.create_index('ix_quotation_valid_until', 'quotation', ['valid_until'])
+    ctx.backfill('quotation', 'id', ['created_at', 'validity'],
+                 "valid_until IS NULL AND created_at IS NOT NULL AND validity IS NOT NULL", compute)
+
+
+@migration(4, "user.token_version for self-contained token claims")
+def add_token_version(ctx):
+    ctx.add_column('user', 'token_version', "INTEGER NOT NULL DEFAULT 1")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Apply or inspect database schema migrations")
+    parser.add_argument('command', choices=['status', 'upgrade'], nargs='?', default='upgrade')
+    parser.add_argument('--target', type=int, help="Stop after this migration version")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help="Rows per backfill transaction")
+    args = parser.parse_args(argv)
+
+    # Import the app without its startup migration so progress is printed here
+    os.environ['AUTO_MIGRATE'] = '0'
+    from app import app, db
+
+    with app.app_context():
+        if args.command == 'status':
+            applied = applied_versions(db.engine)
+            for version, description, _ in MIGRATIONS:
+                print(f"{'[x]' if version in applied else '[ ]'} {version:4d}  {description}")
+            return 0
+
+        done = upgrade(db.engine, args.target, args.chunk_size, progress=print)
+        print(f"Applied {len(done)} migration(s)" if done else "Schema is up to date")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
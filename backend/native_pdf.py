@@ -0,0 +1,313 @@
+# native_pdf.py - Quotation layouts drawn with ReportLab platypus: no HTML, no wkhtmltopdf subprocess
+import io
+import os
+from urllib.parse import unquote, urlparse
+from xml.sax.saxutils import escape
+
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER, TA_JUSTIFY
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.lib.units import mm
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.platypus import (
+    Image, KeepTogether, ListFlowable, ListItem, PageBreak, Paragraph, SimpleDocTemplate, Spacer, Table,
+    TableStyle
+)
+
+# Fonts with the ₹ glyph; the built-in Helvetica has none, so "Rs." is used with it
+FONT_CANDIDATES = [
+    (os.environ.get("PDF_FONT_PATH"), os.environ.get("PDF_BOLD_FONT_PATH")),
+    ("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf"),
+    ("/Library/Fonts/Arial Unicode.ttf", None),
+    (r"C:\Windows\Fonts\arial.ttf", r"C:\Windows\Fonts\arialbd.ttf"),
+]
+
+# The HTML templates' fixed copy
+DISCLAIMER = [
+    ("Limitation of Liability:", "We shall not be liable for any direct, indirect, incidental, or damages arising "
+                                 "out of or relating to the services provided."),
+    ("Confidentiality:", "We will maintain the confidentiality of all sensitive information provided by the client, "
+                         "subject to any legal obligations."),
+    ("Intellectual Property Rights:", "Any intellectual property developed during the course of providing services "
+                                      "shall remain the property of the respective party unless otherwise agreed "
+                                      "upon in writing."),
+    ("Force Majeure:", "We shall not be liable for any delay or failure to perform our obligations under this "
+                       "agreement due to circumstances beyond our reasonable control, including but not limited to "
+                       "acts of God, natural disasters, strikes, or governmental actions."),
+    ("Client Responsibilities:", "The client is responsible for providing accurate and complete information "
+                                 "necessary for the provision of services."),
+    ("Scope Changes:", "Any changes to the scope of services may result in adjustments to the project timeline "
+                       "and costs."),
+    ("Binding Agreement:", "This proposal is provided solely for the purpose of outlining our scope of services and "
+                           "should not be construed as a definitive document or contract binding on both parties."),
+]
+
+CONTACTS = [
+    ("Phone", ["7678081406", "7304838163"]),
+    ("Email", ["info@reraeasy.com"]),
+    ("Address", ["809/810, The Landmark", "Plot No 26A, Sector 7", "Kharghar-410210"]),
+]
+
+YELLOW = colors.HexColor("#f4d03f")
+BORDER = colors.black
+LIGHT = colors.HexColor("#f9f9f9")
+
+_fonts = None
+
+
+def fonts():
+    """(regular, bold, rupee sign), registering a Unicode TTF on first use"""
+    global _fonts
+    if _fonts is None:
+        _fonts = ("Helvetica", "Helvetica-Bold", "Rs. ")
+        for regular, bold in FONT_CANDIDATES:
+            if not regular or not os.path.exists(regular):
+                continue
+            pdfmetrics.registerFont(TTFont("QuotationSans", regular))
+            bold_name = "QuotationSans"
+            if bold and os.path.exists(bold):
+                pdfmetrics.registerFont(TTFont("QuotationSans-Bold", bold))
+                bold_name = "QuotationSans-Bold"
+            _fonts = ("QuotationSans", bold_name, "\u20b9")
+            break
+    return _fonts
+
+
+def money(amount):
+    return f"{fonts()[2]}{amount:,.0f}/-"
+
+
+def _styles():
+    regular, bold, _ = fonts()
+    return {
+        "title": ParagraphStyle("title", fontName=bold, fontSize=20, leading=24, alignment=TA_CENTER),
+        "service": ParagraphStyle("service", fontName=bold, fontSize=13, leading=16, spaceAfter=6),
+        "bullet": ParagraphStyle("bullet", fontName=regular, fontSize=10.5, leading=15,
+                                 textColor=colors.HexColor("#333333"), alignment=TA_JUSTIFY),
+        "amount": ParagraphStyle("amount", fontName=bold, fontSize=15, leading=19, alignment=TA_CENTER),
+        "label": ParagraphStyle("label", fontName=regular, fontSize=11, leading=14, alignment=TA_CENTER,
+                                textColor=colors.HexColor("#666666")),
+        "included": ParagraphStyle("included", fontName=bold, fontSize=11, leading=14, alignment=TA_CENTER),
+        "heading": ParagraphStyle("heading", fontName=bold, fontSize=16, leading=20, alignment=TA_CENTER,
+                                  spaceBefore=10, spaceAfter=12),
+        "total_title": ParagraphStyle("total_title", fontName=bold, fontSize=17, leading=22, alignment=TA_CENTER),
+        "total": ParagraphStyle("total", fontName=bold, fontSize=23, leading=28, alignment=TA_CENTER,
+                                textColor=colors.HexColor("#1976d2")),
+        "body": ParagraphStyle("body", fontName=regular, fontSize=11, leading=16, alignment=TA_JUSTIFY),
+        "center": ParagraphStyle("center", fontName=regular, fontSize=11, leading=16, alignment=TA_CENTER),
+        "bold": ParagraphStyle("bold", fontName=bold, fontSize=11, leading=16),
+        "logo": ParagraphStyle("logo", fontName=bold, fontSize=14, leading=18, alignment=2),
+    }
+
+
+def _logo_path(logo_src):
+    if not logo_src:
+        return None
+    path = unquote(urlparse(logo_src).path) if logo_src.startswith("file:") else logo_src
+    if os.name == "nt" and path.startswith("/") and ":" in path[:4]:
+        path = path[1:]
+    return path if os.path.exists(path) and not path.lower().endswith(".svg") else None
+
+
+def _text(value):
+    return escape(str(value))
+
+
+def _bullets(items, style, numbered=False):
+    return ListFlowable(
+        [ListItem(Paragraph(item, style), leftIndent=14) for item in items],
+        bulletType="1" if numbered else "bullet", start="1" if numbered else "\u2022",
+        bulletFontName=style.fontName, bulletFontSize=style.fontSize, leftIndent=14,
+        spaceBefore=2,
+    )
+
+
+def _page_header(title, context, styles, width):
+    logo = _logo_path(context.get("logo_src"))
+    if logo:
+        image = Image(logo)
+        scale = 50.0 / image.imageHeight * 0.75
+        image.drawHeight, image.drawWidth = image.imageHeight * scale, image.imageWidth * scale
+        if image.drawWidth > 110:
+            ratio = 110 / image.drawWidth
+            image.drawWidth, image.drawHeight = 110, image.drawHeight * ratio
+        image.hAlign = "RIGHT"
+    else:
+        image = Paragraph("RERA Easy", styles["logo"])
+
+    header = Table([["", Paragraph(_text(title), styles["title"]), image]],
+                   colWidths=[width * 0.25, width * 0.5, width * 0.25])
+    header.setStyle(TableStyle([
+        ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+        ("LINEBELOW", (0, 0), (-1, 0), 2, BORDER),
+        ("BOTTOMPADDING", (0, 0), (-1, -1), 10),
+    ]))
+    return [header, Spacer(1, 18)]
+
+
+def _price_cell(service, header, is_last, display_mode, styles):
+    """Right-hand amount column, same rules as the templates"""
+    if display_mode != "lumpsum":
+        display_price = service.get("display_price")
+        if display_price is not None and display_price > 0:
+            return [Paragraph(money(display_price), styles["amount"]), Paragraph("Amount", styles["label"])]
+        if service.get("price", 0) > 0:
+            return [Paragraph(money(service["price"]), styles["amount"]), Paragraph("Amount", styles["label"])]
+    elif header.get("is_package") and header.get("package_total", 0) > 0 and is_last:
+        return [Paragraph(money(header["package_total"]), styles["amount"]),
+                Paragraph("Package Total", styles["label"])]
+    return [Paragraph("Included", styles["amount"]), Paragraph("in scope", styles["label"])]
+
+
+def _is_included(service, variant, header):
+    if variant == "summary":
+        display_price = service.get("display_price")
+        return service.get("price", 0) == 0 or (display_price is not None and display_price == 0)
+    return bool(header.get("name")) and "LIAISONING" in service.get("name", "").upper() or service.get("price", 0) == 0
+
+
+def _sub_service_names(service):
+    names = []
+    for sub in service.get("subServices") or []:
+        if not sub:
+            continue
+        name = (sub.get("name") or str(sub)) if isinstance(sub, dict) else str(sub)
+        names.append(_text(name))
+    return names
+
+
+def _service_box(service, header, is_last, variant, context, styles, width, amount_first=False):
+    details = [Paragraph(_text(service.get("name", "")).upper() if variant == "standard"
+                         else _text(service.get("name", "")), styles["service"])]
+    names = _sub_service_names(service)
+    if names:
+        details.append(_bullets(names, styles["bullet"]))
+    if _is_included(service, variant, header):
+        included = "Included in Scope" if variant == "summary" else "Included<br/>in scope"
+        box = Table([[Paragraph(included, styles["included"])]], colWidths=[width * 0.75 - 30])
+        box.setStyle(TableStyle([
+            ("BACKGROUND", (0, 0), (-1, -1), colors.HexColor("#f5f5f5")),
+            ("BOX", (0, 0), (-1, -1), 0.5, colors.HexColor("#dddddd")),
+        ]))
+        details += [Spacer(1, 8), box]
+
+    price = _price_cell(service, header, is_last, context.get("display_mode"), styles)
+    row, widths = [details, price], [width * 0.75, width * 0.25]
+    if amount_first:
+        row, widths = row[::-1], widths[::-1]
+    details_col = 1 if amount_first else 0
+
+    table = Table([row], colWidths=widths, splitInRow=1)
+    table.setStyle(TableStyle([
+        ("BOX", (0, 0), (-1, -1), 2, BORDER),
+        ("LINEAFTER", (0, 0), (0, 0), 2, BORDER),
+        ("BACKGROUND", (1 - details_col, 0), (1 - details_col, 0), LIGHT),
+        ("VALIGN", (0, 0), (-1, -1), "TOP"),
+        ("VALIGN", (1 - details_col, 0), (1 - details_col, 0), "MIDDLE"),
+        ("LEFTPADDING", (0, 0), (-1, -1), 12),
+        ("RIGHTPADDING", (0, 0), (-1, -1), 12),
+        ("TOPPADDING", (0, 0), (-1, -1), 12),
+        ("BOTTOMPADDING", (0, 0), (-1, -1), 12),
+    ]))
+    return [table, Spacer(1, 18)]
+
+
+def _header_pages(variant, context, styles, width, amount_first=False):
+    story = []
+    for index, header in enumerate(context.get("headers") or []):
+        if index > 0:
+            story.append(PageBreak())
+        story += _page_header(header.get("name", ""), context, styles, width)
+        services = header.get("services") or []
+        for position, service in enumerate(services):
+            story += _service_box(service, header, position == len(services) - 1, variant, context, styles,
+                                  width, amount_first)
+        if (variant != "summary" and header.get("is_package") and header.get("package_total", 0) > 0
+                and context.get("display_mode") != "lumpsum"):
+            story.append(Paragraph(f"{_text(header.get('name', ''))} Total: {money(header['package_total'])}",
+                                   styles["heading"]))
+    return story
+
+
+def _disclaimer_items(styles):
+    return _bullets([f"<b>{_text(title)}</b> {_text(text)}" for title, text in DISCLAIMER], styles["body"])
+
+
+def _summary_tail(context, styles, width):
+    """Terms & Conditions, contact and Disclaimer pages of quotation_summary_template.html"""
+    data = context.get("quotation_data") or {}
+    terms = [
+        "The above quotation is subject to the project "
+        f"<b>{_text(data.get('projectName') or 'GNP Galxy Phase - III')}</b> being developed by "
+        f"<b>{_text(data.get('developerName') or 'M/S Roshni Enterprises')}</b>.",
+        "The prices mentioned above are applicable to One Project only for the duration of the services obtained.",
+        "The prices mentioned above DO NOT include Extension Government Fees.",
+        "The above quotation does not include SRO Membership fees (if applicable).",
+        f"The Quotation is valid till <b>{_text(data.get('validityDate') or '30th September 2025')}</b>. "
+        "The Quotation may change thereafter.",
+    ]
+    story = [PageBreak(), Paragraph("Terms &amp; Conditions", styles["heading"]),
+             _bullets(terms, styles["body"], numbered=True), Spacer(1, 16),
+             Paragraph("In case of any queries, please feel free to reach out to us at <b>+91 7678081406</b> "
+                       "or email us at <b>operations@reraeasy.com</b>", styles["center"]),
+             Spacer(1, 16), Paragraph("Thanks &amp; Regards,<br/><b>RERA Easy</b>", styles["body"]),
+             PageBreak(), Paragraph("Disclaimer", styles["heading"]), _disclaimer_items(styles), Spacer(1, 24)]
+
+    footer = Table([[
+        [Paragraph(f"<b>{label}</b>", styles["center"]), Paragraph("<br/>".join(lines), styles["center"])]
+        for label, lines in CONTACTS
+    ]], colWidths=[width / 3.0] * 3)
+    footer.setStyle(TableStyle([
+        ("BACKGROUND", (0, 0), (-1, -1), YELLOW),
+        ("VALIGN", (0, 0), (-1, -1), "TOP"),
+        ("TOPPADDING", (0, 0), (-1, -1), 10),
+        ("BOTTOMPADDING", (0, 0), (-1, -1), 10),
+    ]))
+    story.append(KeepTogether(footer))
+    return story
+
+
+def _paged_tail(context, styles, width):
+    """QUOTATION SUMMARY (total, terms, reference) and DISCLAIMER pages of quotation_template.html"""
+    total = Table([[[Paragraph("TOTAL PAYABLE AMOUNT", styles["total_title"]), Spacer(1, 10),
+                     Paragraph(money(context.get("total_amount") or 0), styles["total"])]]],
+                  colWidths=[width])
+    total.setStyle(TableStyle([
+        ("BOX", (0, 0), (-1, -1), 3, BORDER),
+        ("BACKGROUND", (0, 0), (-1, -1), colors.HexColor("#f0f8ff")),
+        ("TOPPADDING", (0, 0), (-1, -1), 18),
+        ("BOTTOMPADDING", (0, 0), (-1, -1), 18),
+    ]))
+
+    story = [PageBreak()] + _page_header("QUOTATION SUMMARY", context, styles, width) + [total, Spacer(1, 24)]
+    terms = context.get("terms") or []
+    if terms:
+        story += [Paragraph("<u>Terms &amp; Conditions</u>", styles["heading"]),
+                  _bullets([_text(term) for term in terms], styles["body"])]
+    story += [Spacer(1, 20), Paragraph(_text(context.get("ref_number", "")), styles["bold"])]
+
+    story += [PageBreak()] + _page_header("DISCLAIMER", context, styles, width)
+    story += [Paragraph("<u>Disclaimer:</u>", styles["heading"]), _disclaimer_items(styles)]
+    return story
+
+
+def render(variant, context):
+    """PDF bytes for a standard, summary or multipage template context"""
+    buffer = io.BytesIO()
+    margins = (20 * mm, 15 * mm, 15 * mm, 15 * mm) if variant == "multipage" else (15 * mm, 12 * mm, 12 * mm, 12 * mm)
+    doc = SimpleDocTemplate(buffer, pagesize=A4, topMargin=margins[0], rightMargin=margins[1],
+                            bottomMargin=margins[2], leftMargin=margins[3],
+                            title=context.get("page_title") or "Quotation", author="RERA Easy")
+    styles = _styles()
+
+    if variant == "summary":
+        story = _header_pages(variant, context, styles, doc.width) + _summary_tail(context, styles, doc.width)
+    else:
+        # multipage: amount on the left, services on the right
+        story = (_header_pages(variant, context, styles, doc.width, amount_first=variant == "multipage")
+                 + _paged_tail(context, styles, doc.width))
+
+    doc.build(story)
+    return buffer.getvalue()
@@ -0,0 +1,187 @@
+# pdf_batch.py - Render many quotation PDFs on a process pool and stream them out as one ZIP
+import io
+import json
+import logging
+import multiprocessing
+import os
+import threading
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import pdf_jobs
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = os.cpu_count() or 2
+DEFAULT_MAX_BATCHES = 2
+COPY_CHUNK_BYTES = 256 * 1024
+
+
+def _process_pool(workers):
+    # spawn: the web process runs scheduler and audit threads, which fork would copy mid-state
+    return ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('spawn'))
+
+
+class BatchBusy(Exception):
+    """Raised when `max_batches` batches are already rendering"""
+
+
+class BatchPool:
+    """
+    One process pool shared by every batch request, created on first use. At
+    most `max_batches` batches hold a slot at once, so worker processes and
+    queued renders stay bounded however many clients ask for ZIPs.
+    """
+
+    def __init__(self, workers=DEFAULT_WORKERS, max_batches=DEFAULT_MAX_BATCHES):
+        self.workers = workers
+        self.max_batches = max_batches
+        self._slots = threading.BoundedSemaphore(max_batches)
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Take a batch slot; raises BatchBusy instead of waiting"""
+        if not self._slots.acquire(blocking=False):
+            raise BatchBusy(f"{self.max_batches} PDF batches already rendering")
+
+    def release(self):
+        self._slots.release()
+
+    def executor(self):
+        with self._lock:
+            if self._pool is None:
+                self._pool = _process_pool(self.workers)
+            return self._pool
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=wait, cancel_futures=True)
+                self._pool = None
+
+
+class BatchSpec:
+    """One quotation to include: its PDF cache key and, unless skipped, what to render it from"""
+
+    __slots__ = ('quotation_id', 'quotation_dict', 'variant', 'image_quality', 'engine', 'cache_key', 'skipped')
+
+    def __init__(self, quotation_id, quotation_dict=None, variant=None, image_quality=None, engine=None,
+                 cache_key=None, skipped=None):
+        self.quotation_id = quotation_id
+        self.quotation_dict = quotation_dict
+        self.variant = variant
+        self.image_quality = image_quality
+        self.engine = engine
+        self.cache_key = cache_key
+        self.skipped = skipped
+
+    @property
+    def filename(self):
+        return f"Quotation_{self.quotation_id}.pdf"
+
+
+def render_batch(specs, cache, workers=DEFAULT_WORKERS, max_in_flight=None, pool=None):
+    """
+    Yield (spec, cached_path, error) as each PDF becomes available. Cache hits
+    and skipped specs come back immediately; misses render on a process pool
+    with at most `max_in_flight` pending, so `specs` is consumed lazily and
+    memory stays bounded however many quotations the batch covers. A shared
+    `pool` (see BatchPool) is used as is; otherwise one is started and shut
+    down with the batch.
+    """
+    max_in_flight = max_in_flight or workers * 2
+    owns_pool = pool is None
+    pending = {}
+
+    def drain(block):
+        done, _ = wait(pending, timeout=None if block else 0, return_when=FIRST_COMPLETED)
+        for future in done:
+            spec = pending.pop(future)
+            try:
+                yield spec, future.result(), None
+            except Exception as e:
+                logger.error(f"Batch render of {spec.quotation_id} failed: {str(e)}")
+                yield spec, None, str(e)
+
+    try:
+        for spec in specs:
+            if spec.skipped:
+                yield spec, None, spec.skipped
+                continue
+            cached = cache.get(spec.cache_key)
+            if cached:
+                yield spec, cached, None
+                continue
+
+            if pool is None:
+                pool = _process_pool(workers)
+            future = pool.submit(pdf_jobs.render_to_cache, spec.quotation_dict, spec.variant, spec.image_quality,
+                                 spec.cache_key, cache.directory, cache.max_bytes, spec.engine)
+            pending[future] = spec
+            yield from drain(block=len(pending) >= max_in_flight)
+
+        while pending:
+            yield from drain(block=True)
+    finally:
+        for future in pending:
+            future.cancel()
+        if owns_pool and pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only, unseekable stream that hands written bytes back to the generator"""
+
+    def __init__(self):
+        self.chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def take(self):
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def stream_zip(results, copy_chunk=COPY_CHUNK_BYTES):
+    """
+    Yield a ZIP archive of batch results as bytes chunks, one PDF at a time, in
+    completion order. PDFs are stored uncompressed (they are already deflated).
+    A manifest.json listing every quotation's outcome closes the archive.
+    """
+    sink = _ChunkSink()
+    manifest = []
+    started = time.monotonic()
+    with zipfile.ZipFile(sink, 'w', zipfile.ZIP_STORED) as archive:
+        for spec, path, error in results:
+            entry = {'quotationId': spec.quotation_id, 'file': None, 'error': error}
+            if path:
+                try:
+                    with open(path, 'rb') as src, archive.open(spec.filename, 'w') as dest:
+                        for block in iter(lambda: src.read(copy_chunk), b''):
+                            dest.write(block)
+                            if sink.chunks:
+                                yield sink.take()
+                    entry['file'] = spec.filename
+                except OSError as e:
+                    # Evicted between render and copy
+                    entry['error'] = str(e)
+            manifest.append(entry)
+            chunk = sink.take()
+            if chunk:
+                yield chunk
+
+        archive.writestr('manifest.json', json.dumps({
+            'count': len(manifest),
+            'rendered': sum(1 for e in manifest if e['file']),
+            'seconds': round(time.monotonic() - started, 1),
+            'quotations': manifest,
+        }, indent=2), compress_type=zipfile.ZIP_DEFLATED)
+    yield sink.take()
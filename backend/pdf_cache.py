@@ -0,0 +1,144 @@
+# pdf_cache.py - Content-addressed on-disk cache of generated quotation PDFs with LRU size eviction
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_DIR = os.path.join(BASE_DIR, "instance", "pdf_cache")
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+# Fields that change on every write but never appear in the rendered document
+VOLATILE_FIELDS = ('version',)
+
+
+def _hash_file(digest, path):
+    try:
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    except OSError:
+        digest.update(b"missing")
+
+
+_file_versions = {}
+
+
+def file_version(*paths):
+    """Hash of the given files' contents, recomputed only when a file's mtime or size changes"""
+    stats = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+            stats.append((path, st.st_mtime_ns, st.st_size))
+        except OSError:
+            stats.append((path, None, None))
+    stats = tuple(stats)
+
+    cached = _file_versions.get(paths)
+    if cached and cached[0] == stats:
+        return cached[1]
+    digest = hashlib.sha256()
+    for path in paths:
+        _hash_file(digest, path)
+    version = digest.hexdigest()[:16]
+    _file_versions[paths] = (stats, version)
+    return version
+
+
+def cache_key(quotation_data, variant, display_mode, template_version, asset_version):
+    """Key covering everything that shapes the PDF: data, template variant, display mode, template and assets"""
+    inputs = {k: v for k, v in quotation_data.items() if k not in VOLATILE_FIELDS}
+    payload = json.dumps(
+        [inputs, variant, display_mode, template_version, asset_version],
+        sort_keys=True, separators=(',', ':'), default=str
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class PDFCache:
+    """
+    Files named <key>.pdf under `directory`. A hit refreshes the file's mtime,
+    and writes evict the least recently used files once the total passes `max_bytes`.
+    """
+
+    def __init__(self, directory=DEFAULT_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def path_for(self, key):
+        return os.path.join(self.directory, f"{key}.pdf")
+
+    def get(self, key):
+        """Path of the cached PDF, or None"""
+        path = self.path_for(key)
+        try:
+            os.utime(path)
+        except OSError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return path
+
+    def put(self, key, source_path):
+        """Move a freshly generated PDF into the cache; returns its cached path"""
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path_for(key)
+        os.replace(source_path, path)
+        self.evict()
+        return path
+
+    def put_bytes(self, key, data):
+        """Store PDF bytes under key (written to a unique temp file, then renamed into place)"""
+        os.makedirs(self.directory, exist_ok=True)
+        fd, temp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(temp, self.path_for(key))
+        except BaseException:
+            try:
+                os.remove(temp)
+            except OSError:
+                pass
+            raise
+        self.evict()
+        return self.path_for(key)
+
+    def evict(self):
+        with self._lock:
+            entries = []
+            for name in os.listdir(self.directory):
+                if not name.endswith(".pdf"):
+                    continue
+                try:
+                    st = os.stat(os.path.join(self.directory, name))
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, name))
+
+            total = sum(size for _, size, _ in entries)
+            for _, size, name in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                    total -= size
+                except OSError:
+                    pass
+
+    def clear(self):
+        if not os.path.isdir(self.directory):
+            return
+        for name in os.listdir(self.directory):
+            if name.endswith(".pdf"):
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass
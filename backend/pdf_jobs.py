@@ -0,0 +1,165 @@
+# pdf_jobs.py - Background PDF rendering on a bounded process pool, feeding the PDF cache
+import logging
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = max(1, min(4, (os.cpu_count() or 2) // 2))
+DEFAULT_MAX_PENDING = 32
+JOB_TTL_SECONDS = 3600
+MAX_WAIT_SECONDS = 30
+
+VARIANTS = ('standard', 'summary', 'multipage')
+
+
+def render_pdf(quotation_dict, variant, image_quality, engine=None):
+    """Render one quotation PDF entirely in memory; returns the bytes"""
+    from pdf_generator import generator_for
+
+    generator = generator_for(variant, image_quality, engine)
+    if variant == 'multipage':
+        return generator.generate_multipage_pdf(quotation_dict)
+    if variant == 'summary':
+        return generator.generate_summary_pdf(quotation_dict)
+    return generator.generate_pdf(quotation_dict)
+
+
+def render_to_cache(quotation_dict, variant, image_quality, cache_key, cache_dir, max_bytes, engine=None):
+    """Render one PDF into the PDF cache and return its cached path; runs in pool workers"""
+    import pdf_cache
+
+    data = render_pdf(quotation_dict, variant, image_quality, engine)
+    return pdf_cache.PDFCache(cache_dir, max_bytes).put_bytes(cache_key, data)
+
+
+class QueueFull(Exception):
+    """Raised when too many PDF jobs are already waiting"""
+
+
+class PDFJobQueue:
+    """
+    Renders run in a process pool so the PDF engine and the merge never occupy a
+    request thread. At most `max_pending` jobs may be queued or running; jobs for
+    a cache key already in flight share one render. Finished jobs are kept for
+    `ttl` seconds for status polling and download.
+    """
+
+    def __init__(self, cache, workers=DEFAULT_WORKERS, max_pending=DEFAULT_MAX_PENDING, ttl=JOB_TTL_SECONDS):
+        self.cache = cache
+        self.workers = workers
+        self.max_pending = max_pending
+        self.ttl = ttl
+        self._jobs = {}
+        self._in_flight = {}   # cache key -> job id
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def _executor(self):
+        if self._pool is None:
+            # spawn: forking a process that runs scheduler and audit threads is unsafe
+            self._pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context('spawn'))
+        return self._pool
+
+    def submit(self, quotation_id, quotation_dict, variant, image_quality, cache_key, requested_by=None,
+               engine=None):
+        """Queue a render (or complete immediately on a cache hit); returns the job dict"""
+        now = time.time()
+        job = {
+            'id': uuid.uuid4().hex,
+            'quotationId': quotation_id,
+            'variant': variant,
+            'quality': image_quality,
+            'engine': engine,
+            'cacheKey': cache_key,
+            'requestedBy': requested_by,
+            'status': 'queued',
+            'createdAt': now,
+            'finishedAt': None,
+            'error': None,
+            'path': None,
+            'done': threading.Event(),
+        }
+
+        with self._lock:
+            self._prune(now)
+            cached = self.cache.get(cache_key)
+            if cached:
+                self._finish(job, path=cached)
+                self._jobs[job['id']] = job
+                return job
+
+            shared = self._jobs.get(self._in_flight.get(cache_key))
+            if shared and not shared['done'].is_set():
+                return shared
+
+            pending = sum(1 for j in self._jobs.values() if not j['done'].is_set())
+            if pending >= self.max_pending:
+                raise QueueFull(f"{pending} PDF jobs already pending")
+
+            job['future'] = self._executor().submit(
+                render_to_cache, quotation_dict, variant, image_quality, cache_key,
+                self.cache.directory, self.cache.max_bytes, engine
+            )
+            self._jobs[job['id']] = job
+            self._in_flight[cache_key] = job['id']
+
+        job['future'].add_done_callback(lambda future: self._completed(job, future))
+        return job
+
+    def _completed(self, job, future):
+        with self._lock:
+            self._in_flight.pop(job['cacheKey'], None)
+            try:
+                self._finish(job, path=future.result())
+            except Exception as e:
+                logger.error(f"PDF job {job['id']} for {job['quotationId']} failed: {str(e)}")
+                self._finish(job, error=str(e))
+
+    def _finish(self, job, path=None, error=None):
+        job['path'] = path
+        job['error'] = error
+        job['status'] = 'failed' if error else 'done'
+        job['finishedAt'] = time.time()
+        job['done'].set()
+
+    def _prune(self, now):
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job['finishedAt'] and now - job['finishedAt'] > self.ttl]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def get(self, job_id):
+        job = self._jobs.get(job_id)
+        if job and job['status'] == 'queued' and job.get('future') and job['future'].running():
+            job['status'] = 'running'
+        return job
+
+    def wait(self, job, timeout):
+        """Block up to `timeout` seconds (capped at MAX_WAIT_SECONDS) for the job to finish"""
+        if timeout and timeout > 0:
+            job['done'].wait(min(timeout, MAX_WAIT_SECONDS))
+        return job
+
+    def shutdown(self, wait=True):
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait)
+            self._pool = None
+
+
+def job_to_dict(job):
+    return {
+        'jobId': job['id'],
+        'quotationId': job['quotationId'],
+        'variant': job['variant'],
+        'quality': job['quality'],
+        'engine': job.get('engine'),
+        'status': job['status'],
+        'error': job['error'],
+        'createdAt': job['createdAt'],
+        'finishedAt': job['finishedAt'],
+    }
@@ -0,0 +1,246 @@
+# quotation_view.py - One pass from quotation data to the view model every PDF layout and the preview API share
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+from validity import valid_until_for
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_SIZE = 256
+
+PACKAGE_MARKERS = ("package a", "package b", "package c", "package d", "package")
+
+DEFAULT_TERMS = [
+    "The above quotation is subject to this project only.",
+    "The prices mentioned above are in particular to One Project per year.",
+    "The services outlined above are included within the project scope. Any additional services not specified are excluded from this scope.",
+    "The prices mentioned above are applicable to One Project only for the duration of the services obtained.",
+    "The prices mentioned above DO NOT include Government Fees.",
+    "The prices mentioned above DO NOT include Edit Fees.",
+    "The prices listed above do not include any applicable statutory taxes.",
+    "Any and all services not mentioned in the above scope of services are not applicable.",
+    "All Out-of-pocket expenses incurred for completion of the work shall be re-imbursed to RERA Easy.",
+]
+
+APPLICABLE_TERMS = {
+    "Package A,B,C": [
+        "Payment is due at the initiation of services, followed by annual payments thereafter.",
+        "Any kind of drafting of legal documents or contracts are not applicable.",
+        "The quoted fee covers annual MahaRERA compliance services, with billing on a Yearly basis for convenience and predictable financial planning.",
+        "Invoices will be generated at a predetermined interval for each year in advance.",
+        "The initial invoice will be issued from the date of issuance or a start date as specified in the Work Order.",
+    ],
+    "Package D": [
+        "All Out-of-pocket expenses incurred for the explicit purpose of Commuting, Refreshment meals of RERA Easy's personnel shall be re-imbursed to RERA Easy, subject to submission of relevant invoices, bills and records submitted.",
+    ],
+}
+
+
+def safe_number(v, default=0):
+    if v is None:
+        return default
+    try:
+        return float(v) if v != "" else default
+    except (ValueError, TypeError):
+        return default
+
+
+def safe_string(v, default=""):
+    return default if v is None else str(v).strip()
+
+
+class PriceIndex:
+    """Header and service prices from pricingBreakdown, indexed in one pass over the breakdown"""
+
+    def __init__(self, breakdown):
+        self.breakdown = [b for b in breakdown or [] if isinstance(b, dict)]
+        self.header_totals = {}     # breakdown name/header -> header total
+        self.by_name = {}           # exact breakdown name or header -> breakdown entry
+        self.service_prices = {}    # service name -> final price
+        self.services_total = 0     # sum of every breakdown service's final amount
+        self.service_sums = {}      # id(breakdown entry) -> sum of its services' final amounts
+
+        for entry in self.breakdown:
+            key = entry.get("name") or entry.get("header")
+            if key:
+                total = entry.get("totalAmount") or entry.get("headerTotal") or entry.get("total", 0)
+                self.header_totals[key.strip()] = safe_number(total)
+            for name in (safe_string(entry.get("name")), safe_string(entry.get("header"))):
+                if name:
+                    self.by_name.setdefault(name, entry)
+
+            subtotal = 0
+            for service in entry.get("services") or []:
+                final = safe_number(service.get("finalAmount") or service.get("totalAmount", 0))
+                subtotal += final
+                if service.get("name"):
+                    price = service.get("finalAmount") or service.get("totalAmount") or service.get("price", 0)
+                    self.service_prices[service["name"].strip()] = safe_number(price)
+            self.service_sums[id(entry)] = subtotal
+            self.services_total += subtotal
+
+    def service_price(self, service):
+        return self.service_prices.get(safe_string(service.get("name", ""))) or safe_number(service.get("price", 0))
+
+    def package_total(self, header_name, services):
+        """Breakdown header total, else its services' sum, else a fuzzy name match, else the services' own prices"""
+        name = header_name.strip()
+        total = self.header_totals.get(name, 0)
+        if not total:
+            entry = self.by_name.get(name)
+            if entry and entry.get("services"):
+                total = self.service_sums[id(entry)]
+        if not total:
+            lowered = name.lower()
+            for entry in self.breakdown:
+                by_name = safe_string(entry.get("name")).lower()
+                by_header = safe_string(entry.get("header")).lower()
+                if lowered in (by_name, by_header) or any(part and part in lowered for part in (by_name, by_header)):
+                    total = safe_number(entry.get("headerTotal") or entry.get("totalAmount", 0))
+                    break
+        if not total:
+            total = sum(self.service_price(service) for service in services)
+        return total
+
+
+def _sub_services(service):
+    sub_services = []
+    for sub in service.get("subServices", []) or []:
+        if isinstance(sub, dict):
+            name = safe_string(sub.get("name", ""))
+            if name and sub.get("included", True):
+                sub_services.append({"id": sub.get("id", ""), "name": name})
+        elif isinstance(sub, str) and safe_string(sub):
+            sub_services.append({"id": "", "name": safe_string(sub)})
+    return sub_services
+
+
+def _terms(quotation_data):
+    terms = []
+    valid_until = valid_until_for(quotation_data)
+    if valid_until:
+        terms.append(f"The quotation is valid upto {valid_until.strftime('%d/%m/%Y')}.")
+
+    payment_schedule = quotation_data.get("paymentSchedule") or quotation_data.get("payment_schedule")
+    if payment_schedule:
+        terms.append(f"{payment_schedule} of the total amount must be paid in advance before commencement of work/service.")
+
+    terms.extend(DEFAULT_TERMS)
+    for category in quotation_data.get("applicableTerms") or []:
+        terms.extend(APPLICABLE_TERMS.get(category, []))
+    terms.extend(safe_string(t) for t in quotation_data.get("customTerms") or [] if safe_string(t))
+    return terms
+
+
+def _ref_number(quotation_data):
+    ref_number = safe_string(quotation_data.get("id", "REQ 0001"))
+    ref_number = ref_number.replace("REQ ", "").strip() if ref_number.upper().startswith("REQ") else ref_number
+    return f"REQ {ref_number}" if ref_number else "REQ 0001"
+
+
+def build(quotation_data):
+    """
+    Headers with resolved service prices and package totals, the grand total,
+    terms and reference number. Treat the result as read-only: it may be cached.
+    """
+    display_mode = quotation_data.get("displayMode") or "bifurcated"
+    prices = PriceIndex(quotation_data.get("pricingBreakdown"))
+
+    lumpsum = display_mode == "lumpsum"
+    headers = []
+    for header in quotation_data.get("headers", []) or []:
+        header_name = safe_string(header.get("name", ""))
+        is_package = any(marker in header_name.lower() for marker in PACKAGE_MARKERS)
+        raw_services = header.get("services", []) or []
+
+        services = []
+        for service in raw_services:
+            price = prices.service_price(service)
+            services.append({
+                "name": safe_string(service.get("name", "")),
+                "price": price,
+                "display_price": None if lumpsum else price,
+                "show_individual_price": not lumpsum,
+                "subServices": _sub_services(service),
+            })
+
+        headers.append({
+            "name": header_name,
+            "services": services,
+            "is_package": is_package,
+            "package_total": prices.package_total(header_name, raw_services) if is_package else 0,
+        })
+
+    # Stored total, else the breakdown's services, else what the headers add up to
+    total_amount = safe_number(quotation_data.get("totalAmount", 0)) or prices.services_total
+    if not total_amount:
+        total_amount = sum(
+            header["package_total"] if header["is_package"] and header["package_total"]
+            else sum(service["price"] for service in header["services"])
+            for header in headers
+        )
+
+    return {
+        "id": quotation_data.get("id"),
+        "version": quotation_data.get("version"),
+        "display_mode": display_mode,
+        "show_individual_prices": display_mode == "bifurcated",
+        "headers": headers,
+        "total_amount": total_amount,
+        "terms": _terms(quotation_data),
+        "ref_number": _ref_number(quotation_data),
+        "summary_title": headers[0]["name"].upper() if headers else "QUOTATION SUMMARY",
+        "document_title": safe_string(
+            quotation_data.get("pageTitle") or quotation_data.get("header") or "PROJECT QUOTATION"
+        ).upper(),
+    }
+
+
+class ViewModelCache:
+    """
+    LRU of built view models keyed by (quotation id, version, display mode).
+    Every write bumps the quotation's version, so entries never need invalidating;
+    data without an id and version (ad-hoc previews, tests) is built every time.
+    """
+
+    def __init__(self, maxsize=DEFAULT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, quotation_data):
+        version = quotation_data.get("version")
+        if quotation_data.get("id") is None or version is None:
+            return build(quotation_data)
+
+        key = (quotation_data["id"], version, quotation_data.get("displayMode") or "bifurcated")
+        with self._lock:
+            view = self._entries.get(key)
+            if view is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return view
+
+        view = build(quotation_data)
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = view
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return view
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+views = ViewModelCache(int(os.environ.get("VIEW_MODEL_CACHE_SIZE", DEFAULT_CACHE_SIZE)))
+
+
+def view_model(quotation_data):
+    """The (possibly cached) view model for quotation_data"""
+    return views.get(quotation_data)
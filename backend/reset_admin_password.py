@@ -11,8 +11,11 @@ def reset_admin_password():
         new_password = "1234"
         password_hash = generate_password_hash(new_password)
         
-        # Update admin user password
-        cursor.execute("UPDATE user SET password_hash = ? WHERE username = 'admin';", (password_hash,))
+        # Update admin user password; the token_version bump revokes tokens issued under the old one
+        cursor.execute(
+            "UPDATE user SET password_hash = ?, token_version = token_version + 1 WHERE username = 'admin';",
+            (password_hash,)
+        )
         
         if cursor.rowcount > 0:
             conn.commit()
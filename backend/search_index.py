@@ -0,0 +1,260 @@
+# search_index.py - Full-text search over quotations (SQLite FTS5)
+import json
+import logging
+import re
+
+from sqlalchemy import and_, event, false, inspect, or_, text
+
+logger = logging.getLogger(__name__)
+
+SEARCH_TABLE = "quotation_search"
+
+# Column order matters: bm25() weights below are positional
+SEARCH_COLUMNS = ["developer_name", "project_name", "rera_number", "contact", "created_by", "services"]
+SEARCH_WEIGHTS = [10.0, 8.0, 8.0, 4.0, 2.0, 1.0]
+
+# Quotation attributes that feed the search document
+INDEXED_ATTRIBUTES = [
+    "developer_name", "project_name", "rera_number",
+    "contact_mobile", "contact_email", "created_by", "headers"
+]
+
+MAX_PER_PAGE = 100
+
+_fts5_available = None
+
+
+def index_enabled():
+    return bool(_fts5_available)
+
+
+def fts5_available(connection):
+    """Check once whether the SQLite build ships the FTS5 extension"""
+    global _fts5_available
+    if _fts5_available is None:
+        try:
+            options = [row[0] for row in connection.execute(text("PRAGMA compile_options"))]
+            _fts5_available = "ENABLE_FTS5" in options
+        except Exception:
+            _fts5_available = False
+    return _fts5_available
+
+
+def create_search_index(engine):
+    """Create the FTS5 table and backfill it if it is new. Returns False when FTS5 is unavailable."""
+    with engine.begin() as connection:
+        if connection.dialect.name != "sqlite" or not fts5_available(connection):
+            logger.warning("FTS5 not available - quotation search falls back to LIKE queries")
+            return False
+
+        exists = connection.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {"name": SEARCH_TABLE}
+        ).first()
+
+        connection.execute(text(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5("
+            f"{', '.join(SEARCH_COLUMNS)}, "
+            "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+        ))
+
+        if not exists:
+            rebuild_search_index(connection)
+    return True
+
+
+def rebuild_search_index(connection, chunk_size=500):
+    """Re-populate the search table from the quotation table in chunks"""
+    connection.execute(text(f"DELETE FROM {SEARCH_TABLE}"))
+
+    last_rowid, indexed = 0, 0
+    while True:
+        rows = connection.execute(text(
+            "SELECT rowid, developer_name, project_name, rera_number, contact_mobile, "
+            "contact_email, created_by, headers FROM quotation "
+            "WHERE rowid > :last ORDER BY rowid LIMIT :limit"
+        ), {"last": last_rowid, "limit": chunk_size}).mappings().all()
+        if not rows:
+            break
+
+        documents = []
+        for row in rows:
+            headers = row["headers"]
+            if isinstance(headers, str):
+                try:
+                    headers = json.loads(headers)
+                except ValueError:
+                    headers = []
+            documents.append(build_document(row["rowid"], row, headers))
+
+        _insert_documents(connection, documents)
+        last_rowid = rows[-1]["rowid"]
+        indexed += len(rows)
+
+    logger.info(f"Search index rebuilt with {indexed} quotations")
+    return indexed
+
+
+def build_document(rowid, source, headers):
+    """Flatten a quotation (model instance or row mapping) into a search document"""
+    get = source.get if hasattr(source, "get") else lambda key: getattr(source, key, None)
+
+    service_names = []
+    for header in headers or []:
+        if not isinstance(header, dict):
+            continue
+        header_name = header.get("header") or header.get("name")
+        if header_name:
+            service_names.append(header_name)
+        for service in header.get("services", []) or []:
+            if isinstance(service, dict):
+                name = service.get("name") or service.get("label")
+                if name:
+                    service_names.append(name)
+
+    contact = " ".join(v for v in (get("contact_mobile"), get("contact_email")) if v)
+
+    return {
+        "rowid": rowid,
+        "developer_name": get("developer_name") or "",
+        "project_name": get("project_name") or "",
+        "rera_number": get("rera_number") or "",
+        "contact": contact,
+        "created_by": get("created_by") or "",
+        "services": " ".join(service_names),
+    }
+
+
+def _insert_documents(connection, documents):
+    if not documents:
+        return
+    connection.execute(text(
+        f"INSERT INTO {SEARCH_TABLE} (rowid, {', '.join(SEARCH_COLUMNS)}) "
+        f"VALUES (:rowid, {', '.join(':' + c for c in SEARCH_COLUMNS)})"
+    ), documents)
+
+
+def _quotation_rowid(connection, quotation_id):
+    return connection.execute(
+        text("SELECT rowid FROM quotation WHERE id = :id"), {"id": quotation_id}
+    ).scalar()
+
+
+def register(quotation_model):
+    """Keep the search table in sync with every flush of the Quotation model"""
+
+    def index_quotation(mapper, connection, target):
+        if not _fts5_available:
+            return
+        rowid = _quotation_rowid(connection, target.id)
+        if rowid is None:
+            return
+        connection.execute(text(f"DELETE FROM {SEARCH_TABLE} WHERE rowid = :rowid"), {"rowid": rowid})
+        _insert_documents(connection, [build_document(rowid, target, target.headers)])
+
+    def reindex_if_changed(mapper, connection, target):
+        state = inspect(target)
+        if any(state.attrs[name].history.has_changes() for name in INDEXED_ATTRIBUTES):
+            index_quotation(mapper, connection, target)
+
+    def remove_quotation(mapper, connection, target):
+        if not _fts5_available:
+            return
+        # Runs before the row is gone so the rowid can still be resolved
+        rowid = _quotation_rowid(connection, target.id)
+        if rowid is not None:
+            connection.execute(text(f"DELETE FROM {SEARCH_TABLE} WHERE rowid = :rowid"), {"rowid": rowid})
+
+    event.listen(quotation_model, "after_insert", index_quotation)
+    event.listen(quotation_model, "after_update", reindex_if_changed)
+    event.listen(quotation_model, "before_delete", remove_quotation)
+
+
+def remove_quotations(connection, quotation_ids):
+    """Drop search documents for quotations about to be deleted outside the ORM (archival)"""
+    if not _fts5_available or not quotation_ids:
+        return
+    placeholders = ", ".join(f":id{i}" for i in range(len(quotation_ids)))
+    connection.execute(text(
+        f"DELETE FROM {SEARCH_TABLE} WHERE rowid IN (SELECT rowid FROM quotation WHERE id IN ({placeholders}))"
+    ), {f"id{i}": quotation_id for i, quotation_id in enumerate(quotation_ids)})
+
+
+def build_match_query(raw_query):
+    """Turn free text into an FTS5 MATCH expression with prefix matching on every term"""
+    terms = re.findall(r"\w+", raw_query or "", re.UNICODE)
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def search_quotations(session, quotation_model, raw_query, page=1, per_page=20):
+    """
+    Ranked, paginated search. Returns (quotations, total) where quotations are
+    model instances in relevance order.
+    """
+    page = max(int(page), 1)
+    per_page = min(max(int(per_page), 1), MAX_PER_PAGE)
+    offset = (page - 1) * per_page
+
+    match = build_match_query(raw_query)
+    if not match:
+        return [], 0
+
+    if not _fts5_available:
+        return _like_search(quotation_model, raw_query, offset, per_page)
+
+    total = session.execute(
+        text(f"SELECT count(*) FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH :match"),
+        {"match": match}
+    ).scalar()
+
+    weights = ", ".join(str(w) for w in SEARCH_WEIGHTS)
+    ids = [row[0] for row in session.execute(text(
+        f"SELECT q.id FROM {SEARCH_TABLE} JOIN quotation q ON q.rowid = {SEARCH_TABLE}.rowid "
+        f"WHERE {SEARCH_TABLE} MATCH :match "
+        f"ORDER BY bm25({SEARCH_TABLE}, {weights}), q.created_at DESC "
+        "LIMIT :limit OFFSET :offset"
+    ), {"match": match, "limit": per_page, "offset": offset})]
+
+    if not ids:
+        return [], total
+
+    by_id = {q.id: q for q in quotation_model.query.filter(quotation_model.id.in_(ids)).all()}
+    return [by_id[i] for i in ids if i in by_id], total
+
+
+def matching(quotation_model, raw_query):
+    """
+    WHERE clause selecting the quotations the search matches, for callers that
+    filter and order the quotation query themselves (no ranking).
+    """
+    match = build_match_query(raw_query)
+    if not match:
+        return false()
+    if _fts5_available:
+        return text(
+            f"quotation.rowid IN (SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH :search_match)"
+        ).bindparams(search_match=match)
+    return _like_clause(quotation_model, raw_query)
+
+
+def _like_clause(quotation_model, raw_query):
+    return and_(*(
+        or_(
+            quotation_model.developer_name.ilike(f"%{term}%"),
+            quotation_model.project_name.ilike(f"%{term}%"),
+            quotation_model.rera_number.ilike(f"%{term}%"),
+            quotation_model.contact_mobile.ilike(f"%{term}%"),
+            quotation_model.contact_email.ilike(f"%{term}%"),
+            quotation_model.created_by.ilike(f"%{term}%"),
+        )
+        for term in re.findall(r"\w+", raw_query, re.UNICODE)
+    ))
+
+
+def _like_search(quotation_model, raw_query, offset, limit):
+    """Fallback for SQLite builds without FTS5 (no ranking, no services)"""
+    query = quotation_model.query.filter(_like_clause(quotation_model, raw_query))
+
+    total = query.count()
+    items = query.order_by(quotation_model.created_at.desc()).offset(offset).limit(limit).all()
+    return items, total
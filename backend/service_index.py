@@ -0,0 +1,210 @@
+# service_index.py - Derived service-membership index for "which quotations include service X"
+import json
+import logging
+
+from sqlalchemy import event, inspect, select, func, and_, or_, distinct
+from sqlalchemy.orm import aliased
+
+from services_data import is_package_header, is_customized_header
+
+logger = logging.getLogger(__name__)
+
+MAX_PER_PAGE = 100
+
+
+def header_type_for(header_name):
+    if is_package_header(header_name):
+        return 'package'
+    if is_customized_header(header_name):
+        return 'customized'
+    return 'regular'
+
+
+def membership_rows(quotation_id, headers):
+    """One row per (header, service) pair selected in the quotation headers"""
+    rows, seen = [], set()
+    for header in headers or []:
+        if not isinstance(header, dict):
+            continue
+        header_name = (header.get('header') or header.get('name') or '').strip()
+        header_type = header_type_for(header_name)
+
+        for service in header.get('services', []) or []:
+            if not isinstance(service, dict):
+                continue
+            service_id = service.get('id') or (service.get('name') or service.get('label') or '').strip()
+            if not service_id or (header_name, service_id) in seen:
+                continue
+            seen.add((header_name, service_id))
+            rows.append({
+                'quotation_id': quotation_id,
+                'header_name': header_name,
+                'header_type': header_type,
+                'service_id': service_id,
+                'service_name': service.get('name') or service.get('label'),
+                'is_addon': str(service_id).startswith('service-addon-'),
+            })
+    return rows
+
+
+def register(quotation_model, membership_model):
+    """Rewrite the membership rows whenever a quotation's headers are flushed"""
+    table = membership_model.__table__
+
+    def write_rows(connection, target):
+        connection.execute(table.delete().where(table.c.quotation_id == target.id))
+        rows = membership_rows(target.id, target.headers)
+        if rows:
+            connection.execute(table.insert(), rows)
+
+    def on_insert(mapper, connection, target):
+        write_rows(connection, target)
+
+    def on_update(mapper, connection, target):
+        if inspect(target).attrs.headers.history.has_changes():
+            write_rows(connection, target)
+
+    def on_delete(mapper, connection, target):
+        connection.execute(table.delete().where(table.c.quotation_id == target.id))
+
+    event.listen(quotation_model, 'after_insert', on_insert)
+    event.listen(quotation_model, 'after_update', on_update)
+    event.listen(quotation_model, 'after_delete', on_delete)
+
+
+def remove_quotations(connection, membership_model, quotation_ids):
+    """Membership cleanup for quotations deleted outside the ORM (archival)"""
+    table = membership_model.__table__
+    connection.execute(table.delete().where(table.c.quotation_id.in_(quotation_ids)))
+
+
+def ensure_service_index(engine, quotation_model, membership_model, chunk_size=500):
+    """Backfill the membership table when it is empty but quotations exist"""
+    table = membership_model.__table__
+    quotations = quotation_model.__table__
+
+    with engine.begin() as connection:
+        if connection.execute(select(table.c.id).limit(1)).first():
+            return 0
+        if not connection.execute(select(quotations.c.id).limit(1)).first():
+            return 0
+
+        indexed, last_id = 0, ''
+        while True:
+            batch = connection.execute(
+                select(quotations.c.id, quotations.c.headers)
+                .where(quotations.c.id > last_id)
+                .order_by(quotations.c.id)
+                .limit(chunk_size)
+            ).all()
+            if not batch:
+                break
+
+            rows = []
+            for quotation_id, headers in batch:
+                if isinstance(headers, str):
+                    try:
+                        headers = json.loads(headers)
+                    except ValueError:
+                        headers = []
+                rows.extend(membership_rows(quotation_id, headers))
+            if rows:
+                connection.execute(table.insert(), rows)
+
+            last_id = batch[-1][0]
+            indexed += len(batch)
+
+    logger.info(f"Service index backfilled for {indexed} quotations")
+    return indexed
+
+
+def _service_match(table, services):
+    # Ops ask by id ("service-addon-7") or by display name ("LIAISONING")
+    return or_(table.c.service_id.in_(services), table.c.service_name.in_(services))
+
+
+def resolve_service_ids(session, table, services):
+    """Requested ids/names -> set of recorded service ids per term (empty when nothing matches)"""
+    rows = session.execute(
+        select(table.c.service_id, table.c.service_name).where(_service_match(table, services)).distinct()
+    ).all()
+    return {
+        term: {service_id for service_id, service_name in rows if term in (service_id, service_name)}
+        for term in services
+    }
+
+
+def quotations_with_services(session, quotation_model, membership_model, services,
+                             match='all', header_name=None, header_type=None, addon=None,
+                             page=1, per_page=20):
+    """
+    Quotations containing the given services (ids or display names). match='all'
+    requires every service, match='any' at least one. Header filters narrow which
+    header the service sits under.
+    Returns (quotations, total) ordered newest first.
+    """
+    table = membership_model.__table__
+    page = max(int(page), 1)
+    per_page = min(max(int(per_page), 1), MAX_PER_PAGE)
+
+    conditions = []
+    if header_name:
+        conditions.append(table.c.header_name == header_name)
+    if header_type:
+        conditions.append(table.c.header_type == header_type)
+    if addon is not None:
+        conditions.append(table.c.is_addon == bool(addon))
+
+    services = list(dict.fromkeys(services or []))
+    if services and match == 'all' and len(services) > 1:
+        # One hit per requested term; a name may cover several ids and an id and its
+        # display name are the same term, so requirements are sets of ids
+        resolved = resolve_service_ids(session, table, services)
+        if not all(resolved.values()):
+            return [], 0
+        requirements = [
+            select(table.c.quotation_id).where(table.c.service_id.in_(service_ids), *conditions)
+            for service_ids in dict.fromkeys(frozenset(ids) for ids in resolved.values())
+        ]
+    else:
+        if services:
+            conditions.append(_service_match(table, services))
+        requirements = [select(table.c.quotation_id).where(and_(*conditions))]
+
+    base = quotation_model.query.filter(*(quotation_model.id.in_(required) for required in requirements))
+    total = base.count()
+    items = (base.order_by(quotation_model.created_at.desc())
+                 .offset((page - 1) * per_page)
+                 .limit(per_page)
+                 .all())
+    return items, total
+
+
+def service_co_occurrence(session, membership_model, service, header_name=None, limit=20):
+    """Services that appear alongside `service`, with the number of quotations sharing them"""
+    table = membership_model.__table__
+    anchor = aliased(table, name='anchor')
+    other = aliased(table, name='other')
+
+    anchor_conditions = [or_(anchor.c.service_id == service, anchor.c.service_name == service)]
+    if header_name:
+        anchor_conditions.append(anchor.c.header_name == header_name)
+
+    quotation_count = func.count(distinct(other.c.quotation_id)).label('quotations')
+    rows = session.execute(
+        select(other.c.service_id, func.max(other.c.service_name), quotation_count)
+        .select_from(anchor.join(other, anchor.c.quotation_id == other.c.quotation_id))
+        .where(and_(*anchor_conditions, other.c.service_id != anchor.c.service_id))
+        .group_by(other.c.service_id)
+        .order_by(quotation_count.desc())
+        .limit(limit)
+    ).all()
+
+    total = session.execute(
+        select(func.count(distinct(anchor.c.quotation_id))).where(and_(*anchor_conditions))
+    ).scalar()
+
+    return total, [
+        {'serviceId': service_id, 'serviceName': name, 'quotations': count}
+        for service_id, name, count in rows
+    ]
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Quotation archival tests
+Runs against the Flask test client - no live server required
+"""
+
+import unittest
+import uuid
+import os
+import sys
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+import testing_db
+testing_db.use_temporary_database()
+
+from sqlalchemy import text
+from app import app, db, User, Quotation, QuotationArchive, QuotationService, generate_token, run_archive_job
+
+
+class TestArchive(unittest.TestCase):
+    """Test the archival job and read-through on GET /api/quotations/<id>"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.client = app.test_client()
+        cls.suffix = uuid.uuid4().hex[:8]
+        cls.ids = [f"ARC-{cls.suffix}-{i}" for i in range(3)]
+        old = datetime.utcnow() - timedelta(days=400)
+        headers = [{"header": "Package A", "services": [{"id": f"service-arc-{cls.suffix}", "name": "ARC"}]}]
+
+        with app.app_context():
+            user = User(username=f"arc_{cls.suffix}", role="user")
+            user.set_password("secret")
+            db.session.add(user)
+            db.session.add_all([
+                Quotation(id=cls.ids[0], developer_type="category 1", project_region="Pune", plot_area=1,
+                          developer_name=f"Archived{cls.suffix}", created_at=old, status="completed",
+                          headers=headers, pricing_breakdown=[{"header": "Package A", "services": []}]),
+                Quotation(id=cls.ids[1], developer_type="category 1", project_region="Pune", plot_area=1,
+                          developer_name=f"Archived{cls.suffix}", created_at=old, status="pending_approval"),
+                Quotation(id=cls.ids[2], developer_type="category 1", project_region="Pune", plot_area=1,
+                          developer_name=f"Archived{cls.suffix}", status="completed"),
+            ])
+            db.session.commit()
+            cls.token = generate_token(user)
+            cls.user_id = user.id
+
+    @classmethod
+    def tearDownClass(cls):
+        with app.app_context():
+            for quotation_id in cls.ids:
+                q = db.session.get(Quotation, quotation_id)
+                if q:
+                    db.session.delete(q)
+                archived = db.session.get(QuotationArchive, quotation_id)
+                if archived:
+                    db.session.delete(archived)
+            user = db.session.get(User, cls.user_id)
+            if user:
+                db.session.delete(user)
+            db.session.commit()
+
+    def get(self, quotation_id, **headers):
+        headers["Authorization"] = f"Bearer {self.token}"
+        return self.client.get(f"/api/quotations/{quotation_id}", headers=headers)
+
+    def test_01_archive_job_moves_only_old_closed_quotations(self):
+        with app.app_context():
+            archived = dict(run_archive_job(vacuum=False))
+            self.assertIn(self.ids[0], archived)
+            self.assertNotIn(self.ids[1], archived)
+            self.assertNotIn(self.ids[2], archived)
+
+            self.assertIsNone(db.session.get(Quotation, self.ids[0]))
+            self.assertIsNotNone(db.session.get(QuotationArchive, self.ids[0]))
+            self.assertEqual(QuotationService.query.filter_by(quotation_id=self.ids[0]).count(), 0)
+            search_hits = db.session.execute(
+                text("SELECT count(*) FROM quotation_search WHERE quotation_search MATCH :q"),
+                {"q": f'"archived{self.suffix}"'}
+            ).scalar()
+            self.assertEqual(search_hits, 2)
+
+    def test_02_read_through(self):
+        """GET falls back to the archive, JSON blobs intact, with a stable ETag"""
+        response = self.get(self.ids[0])
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()["data"]
+        self.assertTrue(data["archived"])
+        self.assertEqual(data["status"], "completed")
+        self.assertEqual(data["headers"][0]["services"][0]["name"], "ARC")
+        self.assertEqual(data["pricingBreakdown"], [{"header": "Package A", "services": []}])
+
+        etag = response.headers["ETag"]
+        self.assertEqual(self.get(self.ids[0], **{"If-None-Match": etag}).status_code, 304)
+        self.assertEqual(self.get(f"ARC-{self.suffix}-missing").status_code, 404)
+
+    def test_03_history_replay_reads_archive(self):
+        """Replay starts from the archived row once the quotation has left the hot table"""
+        def replay(at):
+            return self.client.get(f"/api/quotations/{self.ids[0]}/history/replay",
+                                   query_string={"at": at.isoformat()},
+                                   headers={"Authorization": f"Bearer {self.token}"})
+
+        response = replay(datetime.utcnow() + timedelta(minutes=1))
+        self.assertEqual(response.status_code, 200, response.get_data(as_text=True))
+        state = response.get_json()["data"]
+        self.assertEqual(state["status"], "completed")
+        self.assertEqual(state["headers"][0]["services"][0]["name"], "ARC")
+        self.assertEqual(replay(datetime.utcnow() - timedelta(days=500)).status_code, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()
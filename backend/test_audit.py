@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Quotation audit trail tests
+Runs against the Flask test client - no live server required
+"""
+
+import json
+import shutil
+import tempfile
+import unittest
+import uuid
+import os
+import sys
+from datetime import datetime, timedelta
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+import testing_db
+testing_db.use_temporary_database()
+
+from sqlalchemy import text
+import audit
+from app import app, db, User, Quotation, QuotationEvent, audit_writer, generate_token
+
+
+class TestAuditTrail(unittest.TestCase):
+    """Test the batched audit writer, /history and /history/replay"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.client = app.test_client()
+        cls.suffix = uuid.uuid4().hex[:8]
+        cls.quotation_id = f"AUD-{cls.suffix}"
+
+        with app.app_context():
+            manager = User(username=f"aud_mgr_{cls.suffix}", role="manager", threshold=50)
+            manager.set_password("secret")
+            db.session.add(manager)
+            db.session.add(Quotation(
+                id=cls.quotation_id, developer_type="category 1", project_region="Pune",
+                plot_area=400, developer_name="Audit Test", total_amount=1000.0,
+                custom_terms=[], status="pending_approval", requires_approval=True
+            ))
+            db.session.commit()
+            cls.token = generate_token(manager)
+            cls.manager_id = manager.id
+            cls.manager_name = manager.username
+
+    @classmethod
+    def tearDownClass(cls):
+        with app.app_context():
+            q = db.session.get(Quotation, cls.quotation_id)
+            if q:
+                db.session.delete(q)
+            user = db.session.get(User, cls.manager_id)
+            if user:
+                db.session.delete(user)
+            db.session.commit()
+
+    def auth(self):
+        return {"Authorization": f"Bearer {self.token}"}
+
+    def history(self):
+        response = self.client.get(f"/api/quotations/{self.quotation_id}/history", headers=self.auth())
+        self.assertEqual(response.status_code, 200)
+        return response.get_json()["data"]
+
+    def test_01_created_event(self):
+        """Inserts record a full snapshot"""
+        events = self.history()
+        self.assertEqual(events[0]["action"], "created")
+        self.assertEqual(events[0]["changes"]["developerName"]["to"], "Audit Test")
+
+    def test_02_in_place_edits_are_diffed(self):
+        """Mutating a JSON column in place still records the old value"""
+        with app.app_context():
+            q = db.session.get(Quotation, self.quotation_id)
+            q.custom_terms.append("Net 30")
+            db.session.commit()
+
+        change = self.history()[-1]["changes"]["customTerms"]
+        self.assertEqual(change, {"from": [], "to": ["Net 30"]})
+
+    def test_03_approval_reason_and_actor(self):
+        """Approvals carry the approver and the reason given"""
+        response = self.client.put(
+            f"/api/quotations/{self.quotation_id}/approve",
+            json={"action": "approve", "reason": "Discount agreed with sales head"},
+            headers=self.auth()
+        )
+        self.assertEqual(response.status_code, 200)
+
+        event = self.history()[-1]
+        self.assertEqual(event["action"], "approved")
+        self.assertEqual(event["actor"], self.manager_name)
+        self.assertEqual(event["reason"], "Discount agreed with sales head")
+        self.assertEqual(event["changes"]["status"], {"from": "pending_approval", "to": "completed"})
+        self.assertEqual(event["version"], response.get_json()["data"]["version"])
+
+    def test_04_replay(self):
+        """Replaying before the approval restores the pending state"""
+        events = self.history()
+        approved_at = events[-1]["occurredAt"]
+        before = datetime.fromisoformat(approved_at) - timedelta(microseconds=1)
+
+        response = self.client.get(
+            f"/api/quotations/{self.quotation_id}/history/replay",
+            query_string={"at": before.isoformat()}, headers=self.auth()
+        )
+        self.assertEqual(response.status_code, 200, response.get_data(as_text=True))
+        state = response.get_json()["data"]
+        self.assertEqual(state["status"], "pending_approval")
+        self.assertIsNone(state["approvedBy"])
+
+        response = self.client.get(
+            f"/api/quotations/{self.quotation_id}/history/replay",
+            query_string={"at": "2000-01-01"}, headers=self.auth()
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_05_append_only(self):
+        """The audit table rejects updates and deletes"""
+        audit_writer.flush()
+        with app.app_context():
+            with self.assertRaises(Exception):
+                db.session.execute(text("DELETE FROM quotation_event WHERE quotation_id = :id"),
+                                   {"id": self.quotation_id})
+            db.session.rollback()
+            self.assertGreater(QuotationEvent.query.filter_by(quotation_id=self.quotation_id).count(), 0)
+
+
+class TestAuditWriterFailures(unittest.TestCase):
+    """Test that failed audit inserts are retried, then spilled and re-queued on the next start"""
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.spill_path = os.path.join(self.dir, "audit_spill.ndjson")
+        self.quotation_id = f"AUD-SPILL-{uuid.uuid4().hex[:8]}"
+        with app.app_context():
+            self.engine = db.engine
+
+    def tearDown(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def writer(self, engine):
+        writer = audit.AuditWriter(QuotationEvent.__table__, linger=0.5, retries=2, retry_delay=0,
+                                   spill_path=self.spill_path)
+        writer.start(engine)
+        return writer
+
+    def record(self, action):
+        return audit.build_record(self.quotation_id, action, {"status": [None, "draft"]}, actor="test", version=1)
+
+    def events(self):
+        with app.app_context():
+            return [e.action for e in QuotationEvent.query.filter_by(quotation_id=self.quotation_id)
+                    .order_by(QuotationEvent.id)]
+
+    def test_01_transient_failure_retried(self):
+        broken = mock.Mock(wraps=self.engine)
+        broken.begin.side_effect = [RuntimeError("database is locked"), self.engine.begin()]
+        writer = self.writer(broken)
+        writer.enqueue([self.record("created")])
+        writer.flush(timeout=10)
+        self.assertEqual(broken.begin.call_count, 2)
+        self.assertEqual(self.events(), ["created"])
+        self.assertFalse(os.path.exists(self.spill_path))
+
+    def test_02_spilled_then_requeued(self):
+        broken = mock.Mock()
+        broken.begin.side_effect = RuntimeError("disk I/O error")
+        writer = self.writer(broken)
+        writer.enqueue([self.record("created"), self.record("pricing")])
+        writer.flush(timeout=10)
+        self.assertEqual(broken.begin.call_count, 3)
+        with open(self.spill_path) as f:
+            self.assertEqual([json.loads(line)["action"] for line in f], ["created", "pricing"])
+        self.assertEqual(self.events(), [])
+
+        # Next start writes what the previous run spilled
+        writer = self.writer(self.engine)
+        writer.flush(timeout=10)
+        self.assertEqual(self.events(), ["created", "pricing"])
+        self.assertFalse(os.path.exists(self.spill_path))
+
+
+if __name__ == '__main__':
+    unittest.main()
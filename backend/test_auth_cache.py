@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Token claim / user cache tests
+Runs against the Flask test client - no live server required
+"""
+
+import unittest
+import uuid
+import os
+import sys
+from datetime import datetime, timedelta
+
+import jwt
+from sqlalchemy import event
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from auth_cache import TokenVersionCache
+from app import app, db, User, generate_token, token_versions
+
+
+class TestTokenClaims(unittest.TestCase):
+    """Test claim-based authentication, revocation and the token version cache"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.client = app.test_client()
+        suffix = uuid.uuid4().hex[:8]
+
+        with app.app_context():
+            user = User(username=f"claims_{suffix}", fname="Clara", lname="Ims", role="manager", threshold=12.5)
+            user.set_password("secret")
+            db.session.add(user)
+            db.session.commit()
+            cls.user_id = user.id
+            cls.token = generate_token(user)
+
+    @classmethod
+    def tearDownClass(cls):
+        with app.app_context():
+            user = db.session.get(User, cls.user_id)
+            if user:
+                db.session.delete(user)
+                db.session.commit()
+
+    def me(self, token):
+        return self.client.get("/api/me", headers={"Authorization": f"Bearer {token}"})
+
+    def fresh_token(self):
+        with app.app_context():
+            return generate_token(db.session.get(User, self.user_id))
+
+    def test_01_token_carries_claims(self):
+        claims = jwt.decode(self.token, app.config['SECRET_KEY'], algorithms=["HS256"])
+        self.assertEqual((claims["role"], claims["threshold"], claims["fname"]), ("manager", 12.5, "Clara"))
+        self.assertEqual(claims["uv"], 1)
+
+    def test_02_cached_requests_skip_user_query(self):
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        self.assertEqual(self.me(self.token).status_code, 200)
+        with app.app_context():
+            event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            response = self.me(self.token)
+        finally:
+            with app.app_context():
+                event.remove(db.engine, 'before_cursor_execute', record)
+
+        self.assertEqual(response.get_json()["threshold"], 12.5)
+        self.assertFalse([s for s in statements if 'FROM user' in s])
+
+    def test_03_password_reset_revokes_tokens(self):
+        token = self.fresh_token()
+        self.assertEqual(self.me(token).status_code, 200)
+
+        with app.app_context():
+            user = db.session.get(User, self.user_id)
+            user.set_password("changed")
+            db.session.commit()
+
+        self.assertEqual(self.me(token).status_code, 401)
+        self.assertEqual(self.me(self.fresh_token()).status_code, 200)
+
+    def test_04_role_change_revokes_tokens(self):
+        token = self.fresh_token()
+        with app.app_context():
+            user = db.session.get(User, self.user_id)
+            user.role = "user"
+            db.session.commit()
+
+        self.assertEqual(self.me(token).status_code, 401)
+        self.assertEqual(self.me(self.fresh_token()).get_json()["role"], "user")
+
+    def test_05_legacy_token_loads_user(self):
+        legacy = jwt.encode({"user_id": self.user_id, "exp": datetime.utcnow() + timedelta(hours=1)},
+                            app.config['SECRET_KEY'], algorithm="HS256")
+        response = self.me(legacy)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()["fname"], "Clara")
+
+    def test_06_deleted_user_rejected(self):
+        with app.app_context():
+            user = User(username=f"gone_{uuid.uuid4().hex[:8]}")
+            user.set_password("secret")
+            db.session.add(user)
+            db.session.commit()
+            token = generate_token(user)
+            self.assertEqual(self.me(token).status_code, 200)
+            db.session.delete(user)
+            db.session.commit()
+
+        self.assertEqual(self.me(token).status_code, 401)
+        self.assertIsNone(token_versions.get(-1, lambda user_id: None))
+
+    def test_07_cache_ttl(self):
+        loads = []
+        cache = TokenVersionCache(ttl=0)
+        load = lambda user_id: loads.append(user_id) or 3
+        self.assertEqual(cache.get(1, load), 3)
+        self.assertEqual(cache.get(1, load), 3)
+        self.assertEqual(len(loads), 2)
+
+        cache = TokenVersionCache(ttl=60)
+        cache.get(1, load)
+        cache.get(1, load)
+        self.assertEqual(len(loads), 3)
+        cache.invalidate(1)
+        cache.get(1, load)
+        self.assertEqual(len(loads), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
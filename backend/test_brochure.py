@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Brochure page cache tests
+Builds a throwaway images directory - no wkhtmltopdf required
+"""
+
+import io
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+from PIL import Image
+from pypdf import PdfReader
+from reportlab.pdfgen import canvas
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+import brochure
+
+
+def write_image(path, color):
+    Image.new("RGB", (60, 85), color).save(path)
+
+
+class TestBrochurePages(unittest.TestCase):
+    """Test image discovery, compile-once caching and the final merge"""
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.images = os.path.join(self.dir, "images")
+        os.makedirs(self.images)
+        for n in range(1, 11):
+            write_image(os.path.join(self.images, f"{n}.jpg"), (n * 20, 0, 0))
+        write_image(os.path.join(self.images, "logo.jpg"), "blue")
+
+        self.generated = os.path.join(self.dir, "generated.pdf")
+        c = canvas.Canvas(self.generated)
+        for _ in range(2):
+            c.drawString(100, 700, "Quotation")
+            c.showPage()
+        c.save()
+        self.cache_dir = os.path.join(self.dir, "variants")
+        self.cache = brochure.BrochurePageCache(self.cache_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def test_01_discovery_includes_all_numbered_pages(self):
+        cover, tail = brochure.find_images(self.images)
+        self.assertEqual(os.path.basename(cover), "1.jpg")
+        self.assertEqual([os.path.basename(p) for p in tail], [f"{n}.jpg" for n in range(2, 11)])
+        self.assertEqual(brochure.find_images(os.path.join(self.dir, "missing")), (None, []))
+
+    def test_02_merge_order_and_page_count(self):
+        out = os.path.join(self.dir, "final.pdf")
+        brochure.merge(self.generated, out, self.images, self.cache, quality="original")
+        reader = PdfReader(out)
+        self.assertEqual(len(reader.pages), 1 + 2 + 9)
+        self.assertIn("Quotation", reader.pages[1].extract_text())
+
+    def test_03_pages_compiled_once(self):
+        for i in range(3):
+            brochure.merge(self.generated, os.path.join(self.dir, f"out{i}.pdf"), self.images, self.cache, "original")
+        self.assertEqual(self.cache.compiled, 10)
+
+    def test_04_touch_without_change_reuses_page(self):
+        path = os.path.join(self.images, "9.jpg")
+        self.cache.reader(path, "original")
+        later = time.time() + 5
+        os.utime(path, (later, later))
+        self.cache.reader(path, "original")
+        self.assertEqual(self.cache.compiled, 1)
+
+    def test_05_changed_image_recompiles(self):
+        path = os.path.join(self.images, "9.jpg")
+        first = self.cache.reader(path, "original")
+        write_image(path, "green")
+        later = time.time() + 5
+        os.utime(path, (later, later))
+        self.assertIsNot(self.cache.reader(path, "original"), first)
+        self.assertEqual(self.cache.compiled, 2)
+
+    def test_06_variants_resampled_to_target_dpi(self):
+        source = os.path.join(self.images, "scan.jpg")
+        Image.effect_noise((2480, 3508), 60).convert("RGB").save(source, quality=95)
+        digest = brochure.file_digest(source)
+
+        screen = brochure.variant_path(source, digest, "screen", self.cache_dir)
+        with Image.open(screen) as image:
+            self.assertEqual(image.size, brochure.target_size((2480, 3508), brochure.QUALITIES["screen"]["dpi"]))
+        self.assertLess(os.path.getsize(screen), os.path.getsize(source))
+        self.assertEqual(brochure.variant_path(source, digest, "original", self.cache_dir), source)
+
+        # Built once per source hash
+        built_at = os.stat(screen).st_mtime_ns
+        self.assertEqual(brochure.variant_path(source, digest, "screen", self.cache_dir), screen)
+        self.assertEqual(os.stat(screen).st_mtime_ns, built_at)
+
+    def test_07_small_images_never_upscaled(self):
+        self.assertEqual(brochure.target_size((60, 85), 300), (60, 85))
+        self.assertEqual(brochure.target_size((9922, 14032), 110), (909, 1286))
+
+    def test_08_quality_variants_cached_separately(self):
+        path = os.path.join(self.images, "2.jpg")
+        self.cache.reader(path, "screen")
+        self.cache.reader(path, "print")
+        self.cache.reader(path, "screen")
+        self.assertEqual(self.cache.compiled, 2)
+
+
+    def test_09_in_memory_merge_is_thread_safe(self):
+        with open(self.generated, "rb") as f:
+            generated = f.read()
+        before = set(os.listdir(self.dir))
+        results = []
+
+        def run():
+            results.append(brochure.merge(generated, images_dir=self.images, cache=self.cache, quality="original"))
+
+        threads = [threading.Thread(target=run) for _ in range(6)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(len(results), 6)
+        for data in results:
+            self.assertEqual(len(PdfReader(io.BytesIO(data)).pages), 12)
+        self.assertEqual(set(os.listdir(self.dir)), before)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Bulk quotation create tests
+Runs against the Flask test client - no live server required
+"""
+
+import os
+import sys
+import unittest
+import uuid
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+import app as app_module
+from app import app, db, User, Quotation, generate_token
+
+
+class TestBulkCreate(unittest.TestCase):
+    """Test /api/quotations/bulk: creation, validation, rollback and id collisions"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.client = app.test_client()
+        cls.developer = f"Bulk Developer {uuid.uuid4().hex[:8]}"
+        with app.app_context():
+            user = User(username=f"bulk_{uuid.uuid4().hex[:8]}", role="user")
+            user.set_password("secret")
+            db.session.add(user)
+            db.session.commit()
+            cls.user_id = user.id
+            cls.auth = {"Authorization": f"Bearer {generate_token(user)}"}
+
+    @classmethod
+    def tearDownClass(cls):
+        with app.app_context():
+            for q in Quotation.query.filter_by(developer_name=cls.developer).all():
+                db.session.delete(q)
+            user = db.session.get(User, cls.user_id)
+            if user:
+                db.session.delete(user)
+            db.session.commit()
+
+    def spec(self, **overrides):
+        spec = {"developerType": "category 1", "projectRegion": "Pune", "plotArea": 1000,
+                "developerName": self.developer, "headers": []}
+        spec.update(overrides)
+        return spec
+
+    def post(self, specs, **options):
+        return self.client.post("/api/quotations/bulk", headers=self.auth, json={"quotations": specs, **options})
+
+    def saved(self):
+        with app.app_context():
+            return Quotation.query.filter_by(developer_name=self.developer).count()
+
+    def test_01_creates_sequential_quotations(self):
+        before = self.saved()
+        response = self.post([self.spec(customTerms=["Site visit extra"]), self.spec()])
+        self.assertEqual(response.status_code, 201)
+        data = response.get_json()
+        self.assertEqual(data["createdCount"], 2)
+        first, second = (int(c["id"].split(" ")[1]) for c in data["created"])
+        self.assertEqual(second, first + 1)
+        self.assertEqual(self.saved(), before + 2)
+        with app.app_context():
+            self.assertEqual(db.session.get(Quotation, data["created"][0]["id"]).custom_terms, ["Site visit extra"])
+
+    def test_02_malformed_items_rejected(self):
+        before = self.saved()
+        for bad in (self.spec(customTerms="Site visit extra"), self.spec(headers={"name": "x"}), "not an object"):
+            response = self.post([self.spec(), bad])
+            self.assertEqual(response.status_code, 400)
+            self.assertIn("quotations[1]", response.get_json()["error"])
+        self.assertEqual(self.saved(), before)
+
+    def test_03_invalid_items_reported_per_item(self):
+        before = self.saved()
+        response = self.post([self.spec(), self.spec(plotArea="wide")])
+        self.assertEqual(response.status_code, 201)
+        data = response.get_json()
+        self.assertEqual(data["createdCount"], 1)
+        self.assertEqual(data["errors"], [{"index": 1, "error": "plotArea must be a number"}])
+        self.assertEqual(self.saved(), before + 1)
+
+        response = self.post([self.spec(), self.spec(developerName="")], allOrNothing=True)
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(self.saved(), before + 1)
+
+    def test_04_failed_commit_saves_nothing(self):
+        before = self.saved()
+        with mock.patch.object(db.session, "commit", side_effect=RuntimeError("disk full")):
+            response = self.post([self.spec(), self.spec()])
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(self.saved(), before)
+
+    def test_05_id_collision_renumbers(self):
+        with app.app_context():
+            taken = app_module.get_next_quotation_number()
+            db.session.add(Quotation(id=f"REQ {taken:04d}", developer_type="category 1", project_region="Pune",
+                                     plot_area=1, developer_name=self.developer))
+            db.session.commit()
+
+        # First reservation is stale, as if a concurrent create committed in between
+        numbers = iter([taken, taken + 1])
+        with mock.patch.object(app_module, "get_next_quotation_number", side_effect=lambda: next(numbers)):
+            response = self.post([self.spec(), self.spec()])
+        self.assertEqual(response.status_code, 201, response.get_json())
+        ids = [c["id"] for c in response.get_json()["created"]]
+        self.assertEqual(ids, [f"REQ {taken + 1:04d}", f"REQ {taken + 2:04d}"])
+        with app.app_context():
+            self.assertEqual(Quotation.query.filter(Quotation.id.in_(ids)).count(), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Response compression tests
+Runs against the Flask test client - no live server required
+"""
+
+import gzip
+import json
+import unittest
+import uuid
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+import brotli
+
+import compression
+from compression import choose_encoding
+from flask import Flask, Response, send_file
+from app import app, db, User, Quotation, generate_token
+
+
+class TestCompression(unittest.TestCase):
+    """Test Accept-Encoding negotiation, thresholds and ETag variants"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.client = app.test_client()
+        suffix = uuid.uuid4().hex[:8]
+        cls.quotation_id = f"GZ-{suffix}"
+        prose = "Preparation and filing of quarterly progress reports. " * 40
+
+        with app.app_context():
+            user = User(username=f"gz_{suffix}", role="user")
+            user.set_password("secret")
+            db.session.add(user)
+            db.session.add(Quotation(
+                id=cls.quotation_id, developer_type="category 1", project_region="Pune", plot_area=1,
+                developer_name="Compression Test",
+                headers=[{"header": "Package A", "services": [{"id": "s1", "name": "S1", "subServices": [prose]}]}]
+            ))
+            db.session.commit()
+            cls.auth = {"Authorization": f"Bearer {generate_token(user)}"}
+            cls.user_id = user.id
+
+    @classmethod
+    def tearDownClass(cls):
+        with app.app_context():
+            q = db.session.get(Quotation, cls.quotation_id)
+            if q:
+                db.session.delete(q)
+            user = db.session.get(User, cls.user_id)
+            if user:
+                db.session.delete(user)
+            db.session.commit()
+
+    def get(self, path, encoding=None, **headers):
+        if encoding:
+            headers["Accept-Encoding"] = encoding
+        return self.client.get(path, headers=dict(self.auth, **headers))
+
+    def test_01_negotiation(self):
+        self.assertEqual(choose_encoding("gzip, deflate, br"), "br")
+        self.assertEqual(choose_encoding("gzip;q=1.0, br;q=0.5"), "gzip")
+        self.assertEqual(choose_encoding("br;q=0, gzip"), "gzip")
+        self.assertIsNone(choose_encoding("identity"))
+        self.assertIsNone(choose_encoding(None))
+
+    def test_02_gzip_and_brotli_bodies(self):
+        path = f"/api/quotations/{self.quotation_id}"
+        plain = self.get(path)
+        self.assertNotIn("Content-Encoding", plain.headers)
+
+        gz = self.get(path, "gzip")
+        self.assertEqual(gz.headers["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", gz.headers["Vary"])
+        self.assertEqual(json.loads(gzip.decompress(gz.get_data())), plain.get_json())
+
+        br = self.get(path, "br")
+        self.assertEqual(br.headers["Content-Encoding"], "br")
+        self.assertEqual(json.loads(brotli.decompress(br.get_data())), plain.get_json())
+
+    def test_03_encoded_etag_revalidates(self):
+        """ETags of compressed variants are distinct yet still match on revalidation"""
+        path = f"/api/quotations/{self.quotation_id}"
+        plain_etag = self.get(path).headers["ETag"]
+        gz_etag = self.get(path, "gzip").headers["ETag"]
+        self.assertNotEqual(plain_etag, gz_etag)
+        self.assertEqual(self.get(path, "gzip", **{"If-None-Match": gz_etag}).status_code, 304)
+
+    def test_04_small_responses_untouched(self):
+        response = self.get("/api/me", "gzip, br")
+        self.assertNotIn("Content-Encoding", response.headers)
+        self.assertEqual(response.get_json()["username"][:3], "gz_")
+
+    def test_05_cached_body_reused(self):
+        path = f"/api/quotations/{self.quotation_id}"
+        cache = app.extensions["compression_cache"]
+        first = self.get(path, "gzip").get_data()
+        self.assertTrue(any(key[0] == path for key in cache._entries))
+        self.assertEqual(self.get(path, "gzip").get_data(), first)
+
+
+class TestCompressionSkips(unittest.TestCase):
+    """Test that file and binary responses are never buffered or recompressed"""
+
+    @classmethod
+    def setUpClass(cls):
+        handle, cls.path = tempfile.mkstemp(suffix=".txt")
+        with os.fdopen(handle, "w") as f:
+            f.write("plain text served from disk\n" * 200)
+
+        cls.app = Flask(__name__)
+        cls.passthrough = []
+
+        # Registered first, so it runs after compression and sees what goes to the server
+        @cls.app.after_request
+        def record_passthrough(response):
+            cls.passthrough.append(response.direct_passthrough)
+            return response
+
+        compression.init_app(cls.app)
+        cls.app.add_url_rule("/file", "file", lambda: send_file(cls.path, mimetype="text/plain"))
+        cls.app.add_url_rule("/pdf", "pdf", lambda: Response(b"%PDF-1.4 " + b"0" * 8192, mimetype="application/pdf"))
+        cls.app.add_url_rule("/image", "image", lambda: Response(b"\x89PNG" + b"0" * 8192, mimetype="image/png"))
+        cls.app.add_url_rule("/text", "text", lambda: Response("0" * 8192, mimetype="text/plain"))
+        cls.client = cls.app.test_client()
+
+    @classmethod
+    def tearDownClass(cls):
+        os.remove(cls.path)
+
+    def get(self, path):
+        return self.client.get(path, headers={"Accept-Encoding": "gzip, br"})
+
+    def test_01_send_file_passes_through(self):
+        response = self.get("/file")
+        self.assertEqual(self.passthrough[-1], True)
+        self.assertNotIn("Content-Encoding", response.headers)
+        self.assertIn("Accept-Ranges", response.headers)
+        response.close()
+
+    def test_02_binary_types_untouched(self):
+        for path in ("/pdf", "/image"):
+            response = self.get(path)
+            self.assertNotIn("Content-Encoding", response.headers)
+            self.assertEqual(response.get_data()[:4], b"%PDF" if path == "/pdf" else b"\x89PNG")
+        self.assertEqual(self.get("/text").headers["Content-Encoding"], "br")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+ETag / conditional request tests for quotation reads and writes
+Runs against the Flask test client - no live server required
+"""
+
+import unittest
+import uuid
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from app import app, db, User, Quotation, generate_token
+
+
+class TestQuotationConditionalRequests(unittest.TestCase):
+    """Test version-backed ETags, If-None-Match and If-Match"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.client = app.test_client()
+        suffix = uuid.uuid4().hex[:8]
+        cls.quotation_id = f"ETAG-{suffix}"
+
+        with app.app_context():
+            user = User(username=f"etag_{suffix}", role="user", threshold=100)
+            user.set_password("secret")
+            db.session.add(user)
+            db.session.add(Quotation(
+                id=cls.quotation_id, developer_type="category 1", project_region="Mumbai City",
+                plot_area=300, developer_name="ETag Developer", headers=[]
+            ))
+            db.session.commit()
+            cls.token = generate_token(user)
+            cls.user_id = user.id
+
+        cls.auth = {"Authorization": f"Bearer {cls.token}"}
+
+    @classmethod
+    def tearDownClass(cls):
+        with app.app_context():
+            q = db.session.get(Quotation, cls.quotation_id)
+            if q:
+                db.session.delete(q)
+            user = db.session.get(User, cls.user_id)
+            if user:
+                db.session.delete(user)
+            db.session.commit()
+
+    def test_01_get_returns_etag_and_304(self):
+        """Unchanged reads revalidate to 304 with an empty body"""
+        first = self.client.get(f"/api/quotations/{self.quotation_id}")
+        self.assertEqual(first.status_code, 200)
+        etag = first.headers["ETag"]
+        self.assertTrue(etag)
+
+        second = self.client.get(f"/api/quotations/{self.quotation_id}", headers={"If-None-Match": etag})
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second.get_data(), b"")
+
+    def test_02_mutation_bumps_version(self):
+        """Every update produces a new version and ETag"""
+        before = self.client.get(f"/api/quotations/{self.quotation_id}").get_json()["data"]["version"]
+
+        response = self.client.put(f"/api/quotations/{self.quotation_id}",
+                                   json={"serviceSummary": "updated"}, headers=self.auth)
+        self.assertEqual(response.status_code, 200)
+        after = response.get_json()["data"]["version"]
+        self.assertGreater(after, before)
+
+        stale = self.client.get(f"/api/quotations/{self.quotation_id}",
+                                headers={"If-None-Match": f'"{self.quotation_id}.v{before}"'})
+        self.assertEqual(stale.status_code, 200)
+
+    def test_03_if_match_rejects_stale_writes(self):
+        """A write based on an old version gets 412 and changes nothing"""
+        current = self.client.get(f"/api/quotations/{self.quotation_id}")
+        etag = current.headers["ETag"]
+
+        ok = self.client.put(f"/api/quotations/{self.quotation_id}/pricing",
+                             json={"totalAmount": 1000}, headers={**self.auth, "If-Match": etag})
+        self.assertEqual(ok.status_code, 200)
+
+        conflict = self.client.put(f"/api/quotations/{self.quotation_id}/pricing",
+                                   json={"totalAmount": 5}, headers={**self.auth, "If-Match": etag})
+        self.assertEqual(conflict.status_code, 412)
+        self.assertEqual(conflict.get_json()["currentVersion"], ok.get_json()["data"]["version"])
+
+        latest = self.client.get(f"/api/quotations/{self.quotation_id}").get_json()["data"]
+        self.assertEqual(latest["totalAmount"], 1000)
+
+    def test_04_writes_without_if_match_still_allowed(self):
+        """Clients that do not send If-Match keep last-write-wins behaviour"""
+        response = self.client.put(f"/api/quotations/{self.quotation_id}/terms",
+                                   json={"termsAccepted": True}, headers=self.auth)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("ETag", response.headers)
+
+
+if __name__ == '__main__':
+    unittest.main()
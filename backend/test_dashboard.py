@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Dashboard bootstrap tests
+Runs against the Flask test client - no live server required
+"""
+
+import unittest
+import uuid
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from app import app, db, User, Quotation, generate_token
+
+
+class TestDashboardBootstrap(unittest.TestCase):
+    """Test /api/dashboard/bootstrap and paginated quotation lists"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.client = app.test_client()
+        cls.suffix = uuid.uuid4().hex[:8]
+        cls.ids = [f"DASH-{cls.suffix}-{i}" for i in range(3)]
+
+        with app.app_context():
+            manager = User(username=f"dash_mgr_{cls.suffix}", role="manager", threshold=10)
+            manager.set_password("secret")
+            user = User(username=f"dash_user_{cls.suffix}", role="user")
+            user.set_password("secret")
+            db.session.add_all([manager, user])
+
+            for i, quotation_id in enumerate(cls.ids):
+                db.session.add(Quotation(
+                    id=quotation_id, developer_type="category 1", project_region="Pune",
+                    plot_area=400, developer_name="Dashboard Test",
+                    project_name=f"Orchid {cls.suffix}" if i == 2 else None,
+                    status="pending_approval" if i == 0 else "draft",
+                    requires_approval=(i == 0),
+                    headers=[{"header": "Package A", "services": [
+                        {"id": "service-a", "name": "SERVICE A", "subServices": ["long text"]}
+                    ]}]
+                ))
+            db.session.commit()
+            cls.manager_token = generate_token(manager)
+            cls.user_token = generate_token(user)
+            cls.user_ids = [manager.id, user.id]
+
+    @classmethod
+    def tearDownClass(cls):
+        with app.app_context():
+            for quotation_id in cls.ids:
+                q = db.session.get(Quotation, quotation_id)
+                if q:
+                    db.session.delete(q)
+            for user_id in cls.user_ids:
+                user = db.session.get(User, user_id)
+                if user:
+                    db.session.delete(user)
+            db.session.commit()
+
+    def get(self, path, token, **params):
+        response = self.client.get(path, query_string=params,
+                                   headers={"Authorization": f"Bearer {token}"})
+        self.assertEqual(response.status_code, 200, response.get_data(as_text=True))
+        return response.get_json()
+
+    def test_01_manager_bootstrap(self):
+        """Profile, counts, first page and pending queue in one response"""
+        data = self.get("/api/dashboard/bootstrap", self.manager_token)
+        self.assertEqual(data["profile"]["role"], "manager")
+        self.assertGreaterEqual(data["counts"]["total"], 3)
+        self.assertGreaterEqual(data["counts"]["pending_approval"], 1)
+        self.assertEqual(data["quotations"]["total"], data["counts"]["total"])
+        pending_ids = [q["id"] for q in data["pending"]["items"]]
+        self.assertIn(self.ids[0], pending_ids)
+
+    def test_02_user_has_no_pending_block(self):
+        """Regular users get counts and quotations but no approval queue"""
+        data = self.get("/api/dashboard/bootstrap", self.user_token)
+        self.assertIsNone(data["pending"])
+
+    def test_03_list_view_is_slim(self):
+        """List rows keep service names but drop subservice details"""
+        data = self.get("/api/quotations", self.user_token, view="list", page=1, per_page=2)
+        self.assertEqual(data["perPage"], 2)
+        self.assertLessEqual(len(data["quotations"]), 2)
+        self.assertGreaterEqual(data["total"], 3)
+
+        data = self.get("/api/dashboard/bootstrap", self.user_token)
+        row = next(q for q in data["quotations"]["items"] if q["id"] == self.ids[1])
+        self.assertEqual(row["headers"], [{"header": "Package A", "services": [{"id": "service-a", "name": "SERVICE A"}]}])
+        self.assertNotIn("pricingBreakdown", row)
+
+    def test_04_search_covers_unloaded_pages(self):
+        """?q= filters in SQL, so a match beyond the first page is still found"""
+        data = self.get("/api/quotations", self.user_token, view="list", page=1, per_page=1, q=f"orchid {self.suffix}")
+        self.assertEqual(data["total"], 1)
+        self.assertEqual(data["quotations"][0]["id"], self.ids[2])
+
+        # Quotation ids match by substring
+        data = self.get("/api/quotations", self.user_token, view="list", page=1, per_page=1, q=self.suffix)
+        self.assertEqual(data["total"], 3)
+
+    def test_05_server_side_sort_and_pending(self):
+        """?sort=/&order= order the whole result before paging; requiresApproval selects the pending tab"""
+        pages = [self.get("/api/quotations", self.user_token, view="list", page=page, per_page=1,
+                          q=self.suffix, sort="id", order="desc")["quotations"][0]["id"] for page in (1, 2, 3)]
+        self.assertEqual(pages, list(reversed(self.ids)))
+
+        data = self.get("/api/quotations", self.manager_token, view="list", page=1, per_page=50,
+                        q=self.suffix, requiresApproval="true")
+        self.assertEqual([q["id"] for q in data["quotations"]], [self.ids[0]])
+
+        response = self.client.get("/api/quotations", query_string={"sort": "password"},
+                                   headers={"Authorization": f"Bearer {self.user_token}"})
+        self.assertEqual(response.status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
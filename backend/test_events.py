@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Quotation event stream tests
+Runs against the Flask test client - no live server required
+"""
+
+import unittest
+import uuid
+import os
+import sys
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+import events
+import app as app_module
+from app import app, db, User, Quotation, generate_token
+
+
+class TestEventStream(unittest.TestCase):
+    """Test the event bus feeding /api/events/stream"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.client = app.test_client()
+        cls.suffix = uuid.uuid4().hex[:8]
+        cls.ids = [f"EVT-{cls.suffix}-{i}" for i in range(2)]
+
+        with app.app_context():
+            manager = User(username=f"evt_mgr_{cls.suffix}", role="manager", threshold=50)
+            manager.set_password("secret")
+            owner = User(username=f"evt_owner_{cls.suffix}", role="user")
+            owner.set_password("secret")
+            db.session.add_all([manager, owner])
+            db.session.commit()
+            cls.manager_token = generate_token(manager)
+            cls.owner_token = generate_token(owner)
+            cls.owner_name = owner.username
+            cls.user_ids = [manager.id, owner.id]
+
+    @classmethod
+    def tearDownClass(cls):
+        with app.app_context():
+            for quotation_id in cls.ids:
+                q = db.session.get(Quotation, quotation_id)
+                if q:
+                    db.session.delete(q)
+            for user_id in cls.user_ids:
+                user = db.session.get(User, user_id)
+                if user:
+                    db.session.delete(user)
+            db.session.commit()
+
+    def add_quotation(self, quotation_id, created_by, **fields):
+        with app.app_context():
+            db.session.add(Quotation(
+                id=quotation_id, developer_type="category 1", project_region="Pune",
+                plot_area=400, developer_name="Event Test", created_by=created_by, **fields
+            ))
+            db.session.commit()
+
+    def drain(self, subscription):
+        received = []
+        while True:
+            evt = subscription.get(timeout=0.05)
+            if evt is None:
+                return received
+            received.append(evt)
+
+    def test_01_published_after_commit_only(self):
+        """Rolled back changes publish nothing; committed transitions do"""
+        subscription = events.bus.subscribe(lambda evt: evt['quotation']['id'] in self.ids)
+        try:
+            with app.app_context():
+                db.session.add(Quotation(
+                    id=self.ids[0], developer_type="category 1", project_region="Pune",
+                    plot_area=400, developer_name="Event Test", created_by=self.owner_name
+                ))
+                db.session.flush()
+                db.session.rollback()
+            self.assertEqual(self.drain(subscription), [])
+
+            self.add_quotation(self.ids[0], self.owner_name)
+            with app.app_context():
+                q = db.session.get(Quotation, self.ids[0])
+                q.status = "pending_approval"
+                q.requires_approval = True
+                db.session.commit()
+
+            received = self.drain(subscription)
+            self.assertEqual([e['type'] for e in received], ['created', 'pending_approval'])
+            self.assertEqual(received[1]['quotation']['previousStatus'], 'draft')
+        finally:
+            events.bus.unsubscribe(subscription)
+
+    def test_02_approve_endpoint_publishes_approved(self):
+        """The approve endpoint emits an 'approved' event carrying the approver"""
+        subscription = events.bus.subscribe(lambda evt: evt['quotation']['id'] == self.ids[0])
+        try:
+            response = self.client.put(
+                f"/api/quotations/{self.ids[0]}/approve", json={"action": "approve"},
+                headers={"Authorization": f"Bearer {self.manager_token}"}
+            )
+            self.assertEqual(response.status_code, 200, response.get_data(as_text=True))
+            received = self.drain(subscription)
+            self.assertEqual([e['type'] for e in received], ['approved'])
+            self.assertEqual(received[0]['quotation']['approvedBy'], f"evt_mgr_{self.suffix}")
+        finally:
+            events.bus.unsubscribe(subscription)
+
+    def test_03_role_and_ownership_filter(self):
+        """Approvers see everything, other users only their own quotations"""
+        mine = {'quotation': {'createdBy': self.owner_name}}
+        theirs = {'quotation': {'createdBy': 'Someone Else'}}
+        user_filter = events.subscriber_filter('user', ['', self.owner_name])
+        manager_filter = events.subscriber_filter('manager', ['Manager'])
+        self.assertTrue(user_filter(mine))
+        self.assertFalse(user_filter(theirs))
+        self.assertTrue(manager_filter(theirs))
+
+    def stream_token(self):
+        response = self.client.post("/api/events/token", headers={"Authorization": f"Bearer {self.owner_token}"})
+        self.assertEqual(response.status_code, 200)
+        return response.get_json()["token"]
+
+    def test_04_stream_endpoint(self):
+        """The SSE endpoint authenticates via a ?token= stream token and replays missed events"""
+        self.assertEqual(self.client.get("/api/events/stream").status_code, 401)
+
+        self.add_quotation(self.ids[1], self.owner_name)
+        response = self.client.get(
+            "/api/events/stream",
+            query_string={"token": self.stream_token(), "lastEventId": 0},
+            buffered=False
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, "text/event-stream")
+
+        frames = response.response
+        self.assertEqual(next(frames), b"retry: 5000\n\n")
+        body = b""
+        while self.ids[1].encode() not in body:
+            body += next(frames)
+        self.assertIn(b"event: created", body)
+        response.close()
+
+    def test_05_stream_token_is_single_purpose(self):
+        """Session tokens are refused in the URL, stream tokens everywhere but the stream"""
+        self.assertEqual(self.client.post("/api/events/token").status_code, 401)
+        self.assertEqual(
+            self.client.get("/api/events/stream", query_string={"token": self.owner_token}).status_code, 401
+        )
+        self.assertEqual(
+            self.client.get("/api/quotations", headers={"Authorization": f"Bearer {self.stream_token()}"}).status_code,
+            401
+        )
+
+        with mock.patch.object(app_module, "STREAM_TOKEN_SECONDS", -1):
+            expired = self.stream_token()
+        self.assertEqual(self.client.get("/api/events/stream", query_string={"token": expired}).status_code, 401)
+
+
+if __name__ == '__main__':
+    unittest.main()
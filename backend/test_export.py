@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Quotation export tests
+Record building and the CSV / NDJSON / XLSX writers, plus the streamed endpoint
+"""
+
+import csv
+import io
+import json
+import os
+import sys
+import unittest
+import uuid
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+import export
+from app import app, db, User, Quotation, generate_token
+
+BREAKDOWN = [
+    {"header": "Project Registration", "services": [
+        {"id": "reg", "name": "Registration", "baseAmount": 100, "totalAmount": 120, "finalAmount": 110},
+        "legacy free-text line",
+        {"id": "qpr", "label": "QPR", "baseAmount": 50, "totalAmount": 60},
+    ]},
+    "not a header",
+]
+
+
+def row(**overrides):
+    data = {column: None for _, column in export.QUOTATION_COLUMNS}
+    data.update(id="EXP-1", developer_name="Export Developer", total_amount=170.0,
+                created_at=datetime(2026, 9, 1, 10, 30), headers=json.dumps(BREAKDOWN),
+                pricing_breakdown=json.dumps(BREAKDOWN))
+    data.update(overrides)
+    return data
+
+
+class TestExportRecords(unittest.TestCase):
+    """Test record flattening and each output format"""
+
+    def test_01_services_summary_skips_non_dicts(self):
+        record, = export.iter_records([row()])
+        self.assertEqual(record["services"], "Registration; QPR")
+        self.assertEqual(record["createdAt"], "2026-09-01T10:30:00")
+        self.assertNotIn("pricingBreakdown", record)
+
+    def test_02_flatten_pricing_skips_non_dicts(self):
+        records = list(export.iter_records([row()], flatten_pricing=True))
+        self.assertEqual([r["lineServiceName"] for r in records], ["Registration", "QPR"])
+        # finalAmount falls back to totalAmount
+        self.assertEqual(records[1]["lineFinalAmount"], 60)
+        self.assertTrue(all(r["id"] == "EXP-1" for r in records))
+
+    def test_03_flatten_keeps_unpriced_quotations(self):
+        record, = export.iter_records([row(pricing_breakdown=None)], flatten_pricing=True)
+        self.assertEqual(set(record), set(export.export_columns(True)))
+        self.assertIsNone(record["lineServiceName"])
+
+    def test_04_csv_chunks(self):
+        columns = export.export_columns()
+        chunks = list(export.stream_csv(export.iter_records(row(id=f"EXP-{n}") for n in range(5)), columns,
+                                        rows_per_chunk=2))
+        self.assertEqual(len(chunks), 3)
+        parsed = list(csv.DictReader(io.StringIO("".join(chunks))))
+        self.assertEqual([r["id"] for r in parsed], [f"EXP-{n}" for n in range(5)])
+        self.assertEqual(parsed[0]["services"], "Registration; QPR")
+
+    def test_05_ndjson_chunks(self):
+        records = export.iter_records((row(id=f"EXP-{n}") for n in range(3)), include_nested=True)
+        chunks = list(export.stream_ndjson(records, rows_per_chunk=2))
+        self.assertEqual(len(chunks), 2)
+        lines = [json.loads(line) for line in "".join(chunks).splitlines()]
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(lines[0]["pricingBreakdown"], BREAKDOWN)
+
+    @unittest.skipUnless(export.xlsx_available(), "openpyxl not installed")
+    def test_06_xlsx(self):
+        from openpyxl import load_workbook
+
+        columns = export.export_columns(True)
+        data = b"".join(export.stream_xlsx(export.iter_records([row()], flatten_pricing=True), columns,
+                                           read_size=1024))
+        sheet = load_workbook(io.BytesIO(data), read_only=True)["Quotations"]
+        values = list(sheet.values)
+        self.assertEqual(list(values[0]), columns)
+        self.assertEqual(len(values), 3)
+        self.assertEqual(values[1][columns.index("lineServiceId")], "reg")
+
+
+class TestExportEndpoint(unittest.TestCase):
+    """Test /api/quotations/export streams filtered rows"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.client = app.test_client()
+        suffix = uuid.uuid4().hex[:8]
+        cls.status = f"export-{suffix}"
+        cls.ids = [f"EXP-{suffix}-{n}" for n in range(3)]
+        with app.app_context():
+            user = User(username=f"export_{suffix}", role="user")
+            user.set_password("secret")
+            db.session.add(user)
+            for quotation_id in cls.ids:
+                db.session.add(Quotation(
+                    id=quotation_id, developer_type="category 1", project_region="Pune", plot_area=1,
+                    developer_name="Export Developer", status=cls.status, pricing_breakdown=BREAKDOWN
+                ))
+            db.session.commit()
+            cls.user_id = user.id
+            cls.auth = {"Authorization": f"Bearer {generate_token(user)}"}
+
+    @classmethod
+    def tearDownClass(cls):
+        with app.app_context():
+            for quotation_id in cls.ids:
+                q = db.session.get(Quotation, quotation_id)
+                if q:
+                    db.session.delete(q)
+            user = db.session.get(User, cls.user_id)
+            if user:
+                db.session.delete(user)
+            db.session.commit()
+
+    def get_export(self, **params):
+        return self.client.get("/api/quotations/export", headers=self.auth,
+                               query_string=dict(status=self.status, **params))
+
+    def test_01_csv_streamed(self):
+        response = self.get_export(format="csv", chunk_size=50)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.is_streamed)
+        self.assertEqual(response.mimetype, "text/csv")
+        parsed = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+        self.assertEqual(sorted(r["id"] for r in parsed), self.ids)
+
+    def test_02_ndjson_flattened(self):
+        response = self.get_export(format="ndjson", flatten="pricing")
+        self.assertTrue(response.is_streamed)
+        lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        self.assertEqual(len(lines), 2 * len(self.ids))
+
+    @unittest.skipUnless(export.xlsx_available(), "openpyxl not installed")
+    def test_03_xlsx(self):
+        response = self.get_export(format="xlsx")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.get_data().startswith(b"PK"))
+
+    def test_04_validation(self):
+        self.assertEqual(self.get_export(format="pdf").status_code, 400)
+        self.assertEqual(self.get_export(**{"from": "yesterday"}).status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+JSON provider tests
+"""
+
+import json
+import os
+import sys
+import unittest
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from flask import jsonify
+from flask.json.provider import DefaultJSONProvider
+
+from app import app, Quotation
+from json_provider import FastJSONProvider
+
+
+class TestFastJSONProvider(unittest.TestCase):
+    """Output must decode to exactly what the stdlib provider produced"""
+
+    def setUp(self):
+        self.fast = FastJSONProvider(app)
+        self.stdlib = DefaultJSONProvider(app)
+        self.quotation = Quotation(
+            id="REQ 9999", developer_type="category 1", project_region="Pune", plot_area=10.0,
+            developer_name="Jsön Dévelopers", headers=[{"header": "Package A", "services": [{"id": "s1"}]}],
+            pricing_breakdown=[], total_amount=100.0, discount_amount=0.0, discount_percent=0.0,
+            created_at=datetime(2025, 1, 2, 3, 4, 5), version=3
+        )
+
+    def test_parity_with_stdlib(self):
+        payload = {"data": self.quotation.to_dict(), "when": datetime(2025, 1, 2)}
+        self.assertEqual(json.loads(self.fast.dumps(payload)), json.loads(self.stdlib.dumps(payload)))
+
+    def test_models_serialize_directly(self):
+        with app.app_context():
+            body = jsonify(self.quotation).get_json()
+        self.assertEqual(body["id"], "REQ 9999")
+        self.assertEqual(body["headers"][0]["services"][0]["id"], "s1")
+
+    def test_stdlib_fallback(self):
+        """Values orjson rejects still encode"""
+        self.assertEqual(json.loads(self.fast.dumps({"big": 2 ** 70})), {"big": 2 ** 70})
+        self.assertEqual(self.fast.loads(b'{"a": [1, 2]}'), {"a": [1, 2]})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Schema migration tests
+Run against a throwaway SQLite database, independent of the app database
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from sqlalchemy import create_engine, inspect, text
+
+import migrations
+
+
+class TestMigrations(unittest.TestCase):
+    """Upgrade a pre-migration quotation table in place"""
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        self.engine = create_engine(f"sqlite:///{self.path}")
+        with self.engine.begin() as connection:
+            # The quotation table as it looked before display_mode existed
+            connection.execute(text(
+                "CREATE TABLE quotation (id VARCHAR(50) PRIMARY KEY, validity VARCHAR(20), "
+                "created_at DATETIME, status VARCHAR(20))"
+            ))
+            connection.execute(text(
+                "INSERT INTO quotation (id, validity, created_at, status) VALUES (:id, :validity, :created_at, 'draft')"
+            ), [
+                {'id': f"REQ {i:04d}", 'validity': '7 days', 'created_at': '2024-01-01 10:00:00.000000'}
+                for i in range(25)
+            ])
+
+    def tearDown(self):
+        self.engine.dispose()
+        os.remove(self.path)
+
+    def test_01_upgrade_adds_columns_and_backfills_in_chunks(self):
+        messages = []
+        applied = migrations.upgrade(self.engine, chunk_size=10, progress=messages.append)
+        self.assertEqual(applied, [m[0] for m in migrations.MIGRATIONS])
+
+        columns = {c['name'] for c in inspect(self.engine).get_columns('quotation')}
+        self.assertTrue({'display_mode', 'version', 'valid_until'} <= columns)
+        self.assertIn('ix_quotation_valid_until', {ix['name'] for ix in inspect(self.engine).get_indexes('quotation')})
+
+        with self.engine.connect() as connection:
+            row = connection.execute(text(
+                "SELECT display_mode, version, valid_until FROM quotation WHERE id = 'REQ 0003'"
+            )).one()
+        self.assertEqual(tuple(row), ('bifurcated', 1, '2024-01-08 10:00:00.000000'))
+        self.assertIn("  backfilled 20/25 rows of quotation", messages)
+
+    def test_02_idempotent(self):
+        migrations.upgrade(self.engine, progress=lambda message: None)
+        self.assertEqual(migrations.upgrade(self.engine), [])
+        self.assertEqual(migrations.pending_migrations(self.engine), [])
+
+        # Re-running a recorded migration against an already migrated table is a no-op
+        with self.engine.begin() as connection:
+            connection.execute(text("DELETE FROM schema_version"))
+        self.assertEqual(len(migrations.upgrade(self.engine, progress=lambda message: None)),
+                         len(migrations.MIGRATIONS))
+
+    def test_03_target(self):
+        self.assertEqual(migrations.upgrade(self.engine, target=1, progress=lambda message: None), [1])
+        self.assertEqual([m[0] for m in migrations.pending_migrations(self.engine)][:1], [2])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+ReportLab engine tests
+The HTML templates are the reference: the native PDF must carry the same words
+"""
+
+import collections
+import io
+import os
+import re
+import sys
+import unittest
+import uuid
+from html.parser import HTMLParser
+from unittest import mock
+
+from pypdf import PdfReader
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+import native_pdf
+import pdf_generator
+from pdf_generator import QuotationPDFGenerator, resolve_engine
+
+
+class VisibleText(HTMLParser):
+    """Text a browser would render, skipping <head>, <style> and <script>"""
+
+    def __init__(self):
+        super().__init__()
+        self.parts = []
+        self.hidden = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in ("head", "style", "script"):
+            self.hidden += 1
+
+    def handle_endtag(self, tag):
+        if tag in ("head", "style", "script"):
+            self.hidden -= 1
+
+    def handle_data(self, data):
+        if not self.hidden:
+            self.parts.append(data)
+
+
+def words(text):
+    # Case-insensitive (templates upper-case with CSS); list numbering is layout, not content
+    text = text.replace("Rs. ", "₹").casefold()
+    return collections.Counter(w for w in re.findall(r"[\w₹@/-]+", text) if not re.fullmatch(r"\d{1,2}", w))
+
+
+def pdf_text(data):
+    return " ".join(page.extract_text() for page in PdfReader(io.BytesIO(data)).pages)
+
+
+def sample(display_mode="bifurcated"):
+    return {
+        "id": "REQ 0042",
+        "projectName": "Skyline Towers",
+        "developerName": "Acme Builders",
+        "validityDate": "31st March 2026",
+        "totalAmount": 50000,
+        "displayMode": display_mode,
+        "customTerms": ["Fees payable in advance", "GST extra as applicable"],
+        "headers": [
+            {"name": "Project Registration", "services": [
+                {"name": "Registration", "price": 30000, "subServices": [{"name": "Form filing"}, "Document check"]},
+                {"name": "Liaisoning", "price": 0},
+            ]},
+            {"name": "Compliance Package", "is_package": True, "package_total": 20000, "services": [
+                {"name": "Quarterly Progress Report", "price": 12000},
+                {"name": "Annual Audit", "price": 8000},
+            ]},
+        ],
+    }
+
+
+class TestNativePDF(unittest.TestCase):
+    """Test text parity with the HTML templates, the multipage layout and engine selection"""
+
+    def assert_parity(self, display_mode, **variant):
+        generator = QuotationPDFGenerator(engine="reportlab", **variant)
+        context = generator.summary_context(sample(display_mode))
+        html = VisibleText()
+        html.feed(generator.render_html(context))
+        native = pdf_text(native_pdf.render(generator.variant, context))
+        self.assertEqual(words(" ".join(html.parts)), words(native))
+
+    def test_01_standard_matches_template_text(self):
+        for display_mode in ("bifurcated", "lumpsum"):
+            with self.subTest(display_mode=display_mode):
+                self.assert_parity(display_mode)
+
+    def test_02_summary_matches_template_text(self):
+        for display_mode in ("bifurcated", "lumpsum"):
+            with self.subTest(display_mode=display_mode):
+                self.assert_parity(display_mode, use_summary_template=True)
+
+    def test_03_lumpsum_hides_service_prices(self):
+        generator = QuotationPDFGenerator(use_summary_template=True, engine="reportlab")
+        text = words(pdf_text(native_pdf.render("summary", generator.summary_context(sample("lumpsum")))))
+        bifurcated = words(pdf_text(native_pdf.render("summary", generator.summary_context(sample()))))
+        self.assertIn("package", text)
+        self.assertNotIn("₹30", text)
+        self.assertIn("₹30", bifurcated)
+
+    def test_04_multipage_one_page_per_header(self):
+        generator = QuotationPDFGenerator(use_multipage_template=True, engine="reportlab")
+        context = generator.multipage_context(sample())
+        reader = PdfReader(io.BytesIO(native_pdf.render("multipage", context)))
+        self.assertGreaterEqual(len(reader.pages), len(context["headers"]) + 2)
+        self.assertIn("TOTAL PAYABLE AMOUNT", reader.pages[len(context["headers"])].extract_text())
+
+    def test_05_engine_resolution(self):
+        self.assertEqual(resolve_engine("reportlab"), "reportlab")
+        with self.assertRaises(ValueError):
+            resolve_engine("latex")
+        with mock.patch.object(pdf_generator, "resolve_wkhtmltopdf", return_value=None):
+            self.assertEqual(resolve_engine("auto"), "reportlab")
+        with mock.patch.object(pdf_generator, "resolve_wkhtmltopdf", return_value="/usr/bin/wkhtmltopdf"):
+            self.assertEqual(resolve_engine("auto"), "wkhtmltopdf")
+
+    def test_06_download_with_reportlab_engine(self):
+        from app import app, db, Quotation
+        quotation_id = f"NATIVE-{uuid.uuid4().hex[:8]}"
+        with app.app_context():
+            db.session.add(Quotation(
+                id=quotation_id, developer_type="category 1", project_region="Pune", plot_area=1,
+                developer_name="Native Developer", status="completed", headers=sample()["headers"]
+            ))
+            db.session.commit()
+        try:
+            client = app.test_client()
+            response = client.get(f"/api/quotations/{quotation_id}/download-pdf?engine=reportlab&quality=screen")
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response.get_data().startswith(b"%PDF"))
+            self.assertIn("Registration", pdf_text(response.get_data()))
+            self.assertEqual(client.get(f"/api/quotations/{quotation_id}/download-pdf?engine=latex").status_code,
+                             400)
+        finally:
+            with app.app_context():
+                db.session.delete(db.session.get(Quotation, quotation_id))
+                db.session.commit()
+
+
+if __name__ == '__main__':
+    unittest.main()
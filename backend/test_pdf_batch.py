@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Batch PDF ZIP tests
+Runs against the Flask test client; misses render in a real process pool
+"""
+
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+import uuid
+import zipfile
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+import pdf_batch
+import pdf_cache
+import app as app_module
+from app import app, db, User, Quotation, generate_token, pdf_render_spec
+
+
+def read_zip(chunks):
+    return zipfile.ZipFile(io.BytesIO(b"".join(chunks)))
+
+
+class TestPDFBatch(unittest.TestCase):
+    """Test the streamed ZIP, cache reuse, skipped quotations and the batch endpoint"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.client = app.test_client()
+        cls.dir = tempfile.mkdtemp()
+        cls.original_dir = app_module.pdf_files.directory
+        app_module.pdf_files.directory = cls.dir
+        suffix = uuid.uuid4().hex[:8]
+        cls.developer = f"Batch Developer {suffix}"
+        cls.ids = [f"BATCH-{suffix}-{n}" for n in range(3)]
+
+        with app.app_context():
+            user = User(username=f"batch_{suffix}", role="user")
+            user.set_password("secret")
+            db.session.add(user)
+            for n, qid in enumerate(cls.ids):
+                db.session.add(Quotation(
+                    id=qid, developer_type="category 1", project_region="Pune", plot_area=1,
+                    developer_name=cls.developer, status="pending_approval" if n == 2 else "completed",
+                    headers=[{"name": "Registration", "services": [{"name": f"Service {n}", "price": 1000}]}]
+                ))
+            db.session.commit()
+            cls.user_id = user.id
+            cls.auth = {"Authorization": f"Bearer {generate_token(user)}"}
+
+    @classmethod
+    def tearDownClass(cls):
+        app_module.pdf_batch_pool.shutdown()
+        app_module.pdf_files.directory = cls.original_dir
+        shutil.rmtree(cls.dir, ignore_errors=True)
+        with app.app_context():
+            for qid in cls.ids:
+                q = db.session.get(Quotation, qid)
+                if q:
+                    db.session.delete(q)
+            user = db.session.get(User, cls.user_id)
+            if user:
+                db.session.delete(user)
+            db.session.commit()
+
+    def test_01_stream_zip_with_manifest(self):
+        path = os.path.join(self.dir, "one.pdf")
+        with open(path, "wb") as f:
+            f.write(b"%PDF-one" * 100000)
+        results = [
+            (pdf_batch.BatchSpec("A"), path, None),
+            (pdf_batch.BatchSpec("B"), None, "boom"),
+        ]
+        chunks = list(pdf_batch.stream_zip(iter(results), copy_chunk=64 * 1024))
+        self.assertGreater(len(chunks), 2)
+        archive = read_zip(chunks)
+        self.assertIsNone(archive.testzip())
+        self.assertEqual(archive.read("Quotation_A.pdf"), b"%PDF-one" * 100000)
+        manifest = json.loads(archive.read("manifest.json"))
+        self.assertEqual(manifest["rendered"], 1)
+        self.assertEqual(manifest["quotations"][1]["error"], "boom")
+
+    def test_02_render_batch_consumes_specs_lazily(self):
+        cache = pdf_cache.PDFCache(self.dir)
+        seeded = []
+        for n in range(5):
+            key = f"lazy-{n}"
+            cache.put_bytes(key, b"%PDF-lazy")
+            seeded.append(pdf_batch.BatchSpec(f"L{n}", cache_key=key))
+        consumed = []
+
+        def specs():
+            for spec in seeded:
+                consumed.append(spec.quotation_id)
+                yield spec
+
+        results = pdf_batch.render_batch(specs(), cache, workers=1)
+        first = next(results)
+        self.assertEqual(first[0].quotation_id, "L0")
+        self.assertEqual(consumed, ["L0"])
+        self.assertEqual(len(list(results)), 4)
+
+    def post(self, payload):
+        # Closing the response is what hands the batch slot back
+        with self.client.post("/api/quotations/pdf-batch", headers=self.auth, json=payload) as response:
+            response.get_data()
+        return response
+
+    def test_03_endpoint_by_filter(self):
+        with app.app_context():
+            key = pdf_render_spec(db.session.get(Quotation, self.ids[0]), {"engine": "reportlab"})[-1]
+        app_module.pdf_files.put_bytes(key, b"%PDF-cached-batch")
+
+        response = self.post({
+            "filter": {"developerName": self.developer.lower()}, "engine": "reportlab", "quality": "screen"
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, "application/zip")
+        archive = read_zip([response.get_data()])
+        # Pending quotations are not in the default completed filter
+        self.assertEqual(sorted(archive.namelist()),
+                         sorted(["manifest.json", f"Quotation_{self.ids[0]}.pdf", f"Quotation_{self.ids[1]}.pdf"]))
+
+    def test_04_endpoint_by_ids(self):
+        response = self.post({
+            "ids": [self.ids[0], self.ids[2], "NOPE"], "engine": "reportlab", "quality": "screen"
+        })
+        manifest = json.loads(read_zip([response.get_data()]).read("manifest.json"))
+        outcomes = {entry["quotationId"]: entry for entry in manifest["quotations"]}
+        self.assertIsNotNone(outcomes[self.ids[0]]["file"])
+        self.assertIn("pending_approval", outcomes[self.ids[2]]["error"])
+        self.assertEqual(outcomes["NOPE"]["error"], "Quotation not found")
+
+    def test_05_validation(self):
+        self.assertEqual(self.client.post("/api/quotations/pdf-batch", json={"ids": ["x"]}).status_code, 401)
+        self.assertEqual(self.client.post("/api/quotations/pdf-batch", headers=self.auth,
+                                          json={"ids": ["x"], "quality": "huge"}).status_code, 400)
+        self.assertEqual(self.client.post("/api/quotations/pdf-batch", headers=self.auth,
+                                          json={"filter": {"developerName": "nobody-at-all"}}).status_code, 404)
+
+    def test_06_concurrent_batches_capped(self):
+        pool = app_module.pdf_batch_pool
+        payload = {"ids": [self.ids[0]], "engine": "reportlab"}
+        for _ in range(pool.max_batches):
+            pool.acquire()
+        try:
+            busy = self.client.post("/api/quotations/pdf-batch", headers=self.auth, json=payload)
+            self.assertEqual(busy.status_code, 503)
+            self.assertIn("Retry-After", busy.headers)
+        finally:
+            for _ in range(pool.max_batches):
+                pool.release()
+
+        # A streamed batch hands its slot back once the response is closed
+        self.assertEqual(self.post(payload).status_code, 200)
+        for _ in range(pool.max_batches):
+            pool.acquire()
+        for _ in range(pool.max_batches):
+            pool.release()
+
+    def test_07_shared_pool_outlives_batches(self):
+        pool = pdf_batch.BatchPool(workers=1)
+        cache = pdf_cache.PDFCache(os.path.join(self.dir, "shared"))
+        try:
+            executor = pool.executor()
+            for qid in self.ids[:2]:
+                with app.app_context():
+                    q = db.session.get(Quotation, qid)
+                    spec = pdf_batch.BatchSpec(qid, *pdf_render_spec(q, {"engine": "reportlab", "quality": "screen"}))
+                (_, path, error), = pdf_batch.render_batch(iter([spec]), cache, workers=1, pool=executor)
+                self.assertIsNone(error)
+                self.assertTrue(os.path.exists(path))
+            # The batch finished without shutting the shared pool down
+            self.assertIs(pool.executor(), executor)
+            self.assertEqual(executor.submit(abs, -1).result(timeout=60), 1)
+        finally:
+            pool.shutdown()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+PDF cache tests
+Runs against the Flask test client - cache hits never need wkhtmltopdf
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+import uuid
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+import brochure
+import pdf_cache
+import app as app_module
+from app import app, db, Quotation
+
+
+class TestPDFCacheStore(unittest.TestCase):
+    """Test keys and the on-disk LRU"""
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.cache = pdf_cache.PDFCache(os.path.join(self.dir, "cache"), max_bytes=250)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def generated(self, size=100):
+        path = os.path.join(self.dir, f"{uuid.uuid4().hex}.pdf")
+        with open(path, "wb") as f:
+            f.write(b"%" * size)
+        return path
+
+    def test_01_key_covers_rendered_inputs(self):
+        data = {'id': 'REQ 1', 'totalAmount': 100, 'version': 1}
+        key = pdf_cache.cache_key(data, 'standard', 'bifurcated', 't1', 'a1')
+        self.assertEqual(key, pdf_cache.cache_key(dict(data, version=7), 'standard', 'bifurcated', 't1', 'a1'))
+        for changed in (
+            pdf_cache.cache_key(dict(data, totalAmount=101), 'standard', 'bifurcated', 't1', 'a1'),
+            pdf_cache.cache_key(data, 'summary', 'bifurcated', 't1', 'a1'),
+            pdf_cache.cache_key(data, 'standard', 'lumpsum', 't1', 'a1'),
+            pdf_cache.cache_key(data, 'standard', 'bifurcated', 't2', 'a1'),
+            pdf_cache.cache_key(data, 'standard', 'bifurcated', 't1', 'a2'),
+        ):
+            self.assertNotEqual(key, changed)
+
+    def test_02_put_and_get(self):
+        self.assertIsNone(self.cache.get("k1"))
+        path = self.cache.put("k1", self.generated())
+        self.assertEqual(self.cache.get("k1"), path)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_03_put_bytes_is_atomic(self):
+        path = self.cache.put_bytes("k2", b"%PDF-bytes")
+        with open(path, "rb") as f:
+            self.assertEqual(f.read(), b"%PDF-bytes")
+        self.assertEqual(os.listdir(self.cache.directory), ["k2.pdf"])
+
+    def test_04_least_recently_used_evicted(self):
+        self.cache.put("a", self.generated())
+        self.cache.put("b", self.generated())
+        past = time.time() - 60
+        os.utime(self.cache.path_for("a"), (past - 10, past - 10))
+        os.utime(self.cache.path_for("b"), (past, past))
+        self.cache.get("a")  # a becomes most recent
+        self.cache.put("c", self.generated())
+        self.assertIsNotNone(self.cache.get("a"))
+        self.assertIsNone(self.cache.get("b"))
+        self.assertIsNotNone(self.cache.get("c"))
+
+    def test_05_file_version_tracks_content(self):
+        path = os.path.join(self.dir, "template.html")
+        with open(path, "w") as f:
+            f.write("<p>one</p>")
+        first = pdf_cache.file_version(path)
+        self.assertEqual(pdf_cache.file_version(path), first)
+        with open(path, "w") as f:
+            f.write("<p>two!</p>")
+        self.assertNotEqual(pdf_cache.file_version(path), first)
+
+
+class TestPDFDownloadCache(unittest.TestCase):
+    """Test that download-pdf serves cached files without regenerating"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.client = app.test_client()
+        cls.dir = tempfile.mkdtemp()
+        cls.original_dir = app_module.pdf_files.directory
+        app_module.pdf_files.directory = cls.dir
+        cls.quotation_id = f"PDF-{uuid.uuid4().hex[:8]}"
+        with app.app_context():
+            db.session.add(Quotation(
+                id=cls.quotation_id, developer_type="category 1", project_region="Pune", plot_area=1,
+                developer_name="Cache Developer", status="completed", headers=[]
+            ))
+            db.session.commit()
+
+    @classmethod
+    def tearDownClass(cls):
+        app_module.pdf_files.directory = cls.original_dir
+        shutil.rmtree(cls.dir, ignore_errors=True)
+        with app.app_context():
+            q = db.session.get(Quotation, cls.quotation_id)
+            if q:
+                db.session.delete(q)
+                db.session.commit()
+
+    def key(self, variant='standard', quality=None):
+        with app.app_context():
+            q = db.session.get(Quotation, self.quotation_id)
+            data = q.to_dict()
+            data['displayMode'] = q.display_mode or 'bifurcated'
+            return pdf_cache.cache_key(data, variant, data['displayMode'],
+                                       app_module.pdf_template_version(variant),
+                                       brochure.pages.asset_version(quality))
+
+    def seed(self, key, body):
+        path = os.path.join(self.dir, "seed.pdf")
+        with open(path, "wb") as f:
+            f.write(body)
+        app_module.pdf_files.put(key, path)
+
+    def test_01_hit_served_without_generation(self):
+        self.seed(self.key('summary'), b"%PDF-cached-summary")
+        response = self.client.get(f"/api/quotations/{self.quotation_id}/download-pdf?summary=true")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_data(), b"%PDF-cached-summary")
+        self.assertEqual(response.headers["ETag"], f'"{self.key("summary")}"')
+
+    def test_02_revalidation_returns_304(self):
+        key = self.key('standard', 'screen')
+        self.seed(key, b"%PDF-cached-screen")
+        response = self.client.get(f"/api/quotations/{self.quotation_id}/download-pdf?quality=screen",
+                                   headers={"If-None-Match": f'"{key}"'})
+        self.assertEqual(response.status_code, 304)
+
+    def test_03_quality_changes_key(self):
+        self.assertNotEqual(self.key('standard', 'screen'), self.key('standard', 'print'))
+        response = self.client.get(f"/api/quotations/{self.quotation_id}/download-pdf?quality=huge")
+        self.assertEqual(response.status_code, 400)
+
+    def test_04_template_version_covers_render_code(self):
+        with mock.patch.object(pdf_cache, "file_version", return_value="v") as file_version:
+            for engine in ("reportlab", "wkhtmltopdf"):
+                app_module.pdf_template_version("summary", engine)
+                hashed = {os.path.basename(path) for path in file_version.call_args[0]}
+                for name in ("pdf_generator.py", "quotation_view.py", "validity.py", "brochure.py"):
+                    self.assertIn(name, hashed)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Shared PDF generator tests
+Process-wide generators, compiled-template reuse, logo lookup and warm-up
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+import pdf_generator
+from pdf_generator import find_logos, generator_for, template_environment
+
+
+class TestSharedGenerators(unittest.TestCase):
+    """Test that per-request setup is reused and re-checked only when files change"""
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def test_01_generator_reused_per_variant(self):
+        summary = generator_for("summary", "screen", "reportlab")
+        self.assertIs(generator_for("summary", "screen", "reportlab"), summary)
+        self.assertIsNot(generator_for("standard", "screen", "reportlab"), summary)
+        self.assertIsNot(generator_for("summary", "print", "reportlab"), summary)
+        self.assertIs(summary.env, generator_for("standard", "screen", "reportlab").env)
+
+    def test_02_templates_compiled_once_until_changed(self):
+        path = os.path.join(self.dir, "page.html")
+        with open(path, "w") as f:
+            f.write("one {{ x }}")
+        env = template_environment(self.dir)
+        self.assertIs(template_environment(self.dir), env)
+
+        template = env.get_template("page.html")
+        self.assertIs(env.get_template("page.html"), template)
+        with open(path, "w") as f:
+            f.write("two {{ x }}")
+        later = time.time() + 5
+        os.utime(path, (later, later))
+        self.assertEqual(env.get_template("page.html").render(x=1), "two 1")
+
+    def test_03_logo_rescanned_on_directory_change(self):
+        self.assertEqual(find_logos(self.dir), [])
+        with open(os.path.join(self.dir, "logo.jpg"), "wb") as f:
+            f.write(b"jpg")
+        later = time.time() + 5
+        os.utime(self.dir, (later, later))
+        self.assertEqual(find_logos(self.dir), [os.path.join(self.dir, "logo.jpg")])
+
+        with mock.patch("os.listdir") as listdir:
+            find_logos(self.dir)
+            listdir.assert_not_called()
+
+    def test_04_wkhtmltopdf_lookup_cached(self):
+        pdf_generator._wkhtmltopdf.clear()
+        with mock.patch("shutil.which", return_value=None) as which:
+            pdf_generator.resolve_wkhtmltopdf()
+            pdf_generator.resolve_wkhtmltopdf()
+            self.assertEqual(which.call_count, 1)
+        pdf_generator._wkhtmltopdf.clear()
+
+    def test_05_warm_up(self):
+        pdf_generator.warm_up(engine="reportlab")
+        generator = generator_for("summary", engine="reportlab")
+        with mock.patch.object(generator.env.loader, "get_source", wraps=generator.env.loader.get_source) as source:
+            generator.env.get_template(generator.template_name)
+            source.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
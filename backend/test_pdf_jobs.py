@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+PDF job queue tests
+Runs against the Flask test client; renders run in a real process pool
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+import uuid
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+import pdf_cache
+import pdf_jobs
+import app as app_module
+from app import app, db, User, Quotation, generate_token, pdf_render_spec
+
+
+class TestPDFJobs(unittest.TestCase):
+    """Test job submission, status polling, download handoff and back-pressure"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.client = app.test_client()
+        cls.dir = tempfile.mkdtemp()
+        cls.original_dir = app_module.pdf_files.directory
+        app_module.pdf_files.directory = cls.dir
+        suffix = uuid.uuid4().hex[:8]
+        cls.quotation_id = f"JOB-{suffix}"
+        cls.pending_id = f"JOBP-{suffix}"
+
+        with app.app_context():
+            user = User(username=f"jobs_{suffix}", role="user")
+            user.set_password("secret")
+            db.session.add(user)
+            for qid, status in ((cls.quotation_id, "completed"), (cls.pending_id, "pending_approval")):
+                db.session.add(Quotation(
+                    id=qid, developer_type="category 1", project_region="Pune", plot_area=1,
+                    developer_name="Job Developer", status=status, headers=[]
+                ))
+            db.session.commit()
+            cls.user_id = user.id
+            cls.auth = {"Authorization": f"Bearer {generate_token(user)}"}
+
+    @classmethod
+    def tearDownClass(cls):
+        app_module.pdf_job_queue.shutdown()
+        app_module.pdf_files.directory = cls.original_dir
+        shutil.rmtree(cls.dir, ignore_errors=True)
+        with app.app_context():
+            for qid in (cls.quotation_id, cls.pending_id):
+                q = db.session.get(Quotation, qid)
+                if q:
+                    db.session.delete(q)
+            user = db.session.get(User, cls.user_id)
+            if user:
+                db.session.delete(user)
+            db.session.commit()
+
+    def spec(self, **options):
+        with app.app_context():
+            return pdf_render_spec(db.session.get(Quotation, self.quotation_id), options)
+
+    def test_01_cached_job_completes_immediately(self):
+        key = self.spec(summary='true')[-1]
+        seed = os.path.join(self.dir, "seed.pdf")
+        with open(seed, "wb") as f:
+            f.write(b"%PDF-job")
+        app_module.pdf_files.put(key, seed)
+
+        response = self.client.post(f"/api/quotations/{self.quotation_id}/pdf-jobs", json={"summary": "true"},
+                                    headers=self.auth)
+        self.assertEqual(response.status_code, 200)
+        job = response.get_json()["data"]
+        self.assertEqual(job["status"], "done")
+
+        status = self.client.get(job["statusUrl"], headers=self.auth).get_json()["data"]
+        self.assertEqual(status["status"], "done")
+        download = self.client.get(job["downloadUrl"], headers=self.auth)
+        self.assertEqual(download.get_data(), b"%PDF-job")
+        self.assertEqual(download.headers["ETag"], f'"{key}"')
+
+    def test_02_render_runs_in_pool(self):
+        response = self.client.post(f"/api/quotations/{self.quotation_id}/pdf-jobs?multipage=true&wait=60",
+                                    headers=self.auth)
+        job = response.get_json()["data"]
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNotNone(job["finishedAt"])
+        if job["status"] == "failed":
+            # No wkhtmltopdf in this environment: the worker's error is reported, not raised
+            self.assertIn("wkhtmltopdf", job["error"])
+            self.assertEqual(self.client.get(job["downloadUrl"], headers=self.auth).status_code, 500)
+        else:
+            self.assertEqual(self.client.get(job["downloadUrl"], headers=self.auth).status_code, 200)
+
+    def test_03_validation(self):
+        self.assertEqual(self.client.get("/api/pdf-jobs/nope", headers=self.auth).status_code, 404)
+        self.assertEqual(self.client.post(f"/api/quotations/{self.pending_id}/pdf-jobs",
+                                          headers=self.auth).status_code, 403)
+        self.assertEqual(self.client.post(f"/api/quotations/{self.quotation_id}/pdf-jobs?quality=huge",
+                                          headers=self.auth).status_code, 400)
+        self.assertEqual(self.client.post(f"/api/quotations/{self.quotation_id}/pdf-jobs").status_code, 401)
+
+    def test_04_queue_bound(self):
+        queue = pdf_jobs.PDFJobQueue(pdf_cache.PDFCache(self.dir), workers=1, max_pending=0)
+        with self.assertRaises(pdf_jobs.QueueFull):
+            queue.submit("X", {}, "standard", "screen", "uncached-key")
+        queue.shutdown()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+PDF prerender tests
+Completing a quotation queues the summary PDF the UI downloads; that download is then a cache hit
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+import uuid
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+import app as app_module
+from app import app, db, User, Quotation, generate_token, pdf_render_spec
+
+
+class TestPrerender(unittest.TestCase):
+    """Test which writes trigger a prerender and that it lands under the download's cache key"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.client = app.test_client()
+        cls.dir = tempfile.mkdtemp()
+        cls.original_dir = app_module.pdf_files.directory
+        app_module.pdf_files.directory = cls.dir
+        cls.suffix = uuid.uuid4().hex[:8]
+        cls.ids = []
+
+        with app.app_context():
+            admin = User(username=f"pre_admin_{cls.suffix}", role="admin", threshold=100)
+            admin.set_password("secret")
+            db.session.add(admin)
+            db.session.commit()
+            cls.user_id = admin.id
+            cls.auth = {"Authorization": f"Bearer {generate_token(admin)}"}
+
+    @classmethod
+    def tearDownClass(cls):
+        app_module.pdf_job_queue.shutdown()
+        app_module.pdf_files.directory = cls.original_dir
+        shutil.rmtree(cls.dir, ignore_errors=True)
+        with app.app_context():
+            for quotation_id in cls.ids:
+                q = db.session.get(Quotation, quotation_id)
+                if q:
+                    db.session.delete(q)
+            user = db.session.get(User, cls.user_id)
+            if user:
+                db.session.delete(user)
+            db.session.commit()
+
+    def add_quotation(self, status="pending_approval", display_mode="lumpsum"):
+        quotation_id = f"PRE-{self.suffix}-{len(self.ids)}"
+        self.ids.append(quotation_id)
+        with app.app_context():
+            db.session.add(Quotation(
+                id=quotation_id, developer_type="category 1", project_region="Pune", plot_area=1,
+                developer_name="Prerender Developer", status=status, requires_approval=True,
+                display_mode=display_mode, headers=[
+                    {"name": "Registration", "services": [{"name": "Registration", "price": 1000}]}
+                ]
+            ))
+            db.session.commit()
+        return quotation_id
+
+    def test_01_approve_prerenders_ui_variant(self):
+        quotation_id = self.add_quotation()
+        with mock.patch.object(app_module.pdf_job_queue, "submit") as submit:
+            response = self.client.put(f"/api/quotations/{quotation_id}/approve", headers=self.auth,
+                                       json={"action": "approve"})
+        self.assertEqual(response.status_code, 200)
+        submit.assert_called_once()
+        args, kwargs = submit.call_args
+        self.assertEqual(args[1]["displayMode"], "lumpsum")
+        self.assertEqual(args[2], "summary")
+        with app.app_context():
+            q = db.session.get(Quotation, quotation_id)
+            self.assertEqual(args[4], pdf_render_spec(q, {"summary": "true"})[-1])
+        self.assertEqual(kwargs["requested_by"], "prerender")
+
+    def test_02_no_prerender_unless_completed(self):
+        rejected = self.add_quotation()
+        pending = self.add_quotation(status="completed")
+        with mock.patch.object(app_module.pdf_job_queue, "submit") as submit:
+            self.client.put(f"/api/quotations/{rejected}/approve", headers=self.auth, json={"action": "reject"})
+            # Custom terms send it back for approval
+            self.client.put(f"/api/quotations/{pending}/terms", headers=self.auth,
+                            json={"termsAccepted": True, "customTerms": ["Special clause"]})
+        submit.assert_not_called()
+
+    def test_03_first_download_is_cache_hit(self):
+        quotation_id = self.add_quotation()
+        queue, jobs = app_module.pdf_job_queue, []
+        submit = queue.submit
+
+        def record(*args, **kwargs):
+            jobs.append(submit(*args, **kwargs))
+            return jobs[-1]
+
+        with mock.patch.object(queue, "submit", side_effect=record):
+            self.client.put(f"/api/quotations/{quotation_id}/approve", headers=self.auth, json={"action": "approve"})
+        job, = jobs
+        app_module.pdf_job_queue.wait(job, 60)
+        self.assertEqual(job["status"], "done", job["error"])
+
+        hits = app_module.pdf_files.hits
+        # Same URL as the Dashboard's download button
+        response = self.client.get(f"/api/quotations/{quotation_id}/download-pdf?summary=true&displayMode=lumpsum")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(app_module.pdf_files.hits - hits, 1)
+
+    def test_04_queue_full_does_not_fail_request(self):
+        quotation_id = self.add_quotation()
+        with mock.patch.object(app_module.pdf_job_queue, "submit",
+                               side_effect=app_module.pdf_jobs.QueueFull("full")):
+            response = self.client.put(f"/api/quotations/{quotation_id}/approve", headers=self.auth,
+                                       json={"action": "approve"})
+        self.assertEqual(response.status_code, 200)
+
+
+if __name__ == '__main__':
+    unittest.main()
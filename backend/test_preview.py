@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+HTML preview tests
+Runs against the Flask test client; no PDF engine involved
+"""
+
+import os
+import sys
+import unittest
+import uuid
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+import app as app_module
+from app import app, db, User, Quotation, generate_token
+
+
+class TestHTMLPreview(unittest.TestCase):
+    """Test preview rendering, its per-version cache, escaping, auth and the logo asset URL"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.client = app.test_client()
+        suffix = uuid.uuid4().hex[:8]
+        cls.quotation_id = f"HTML-{suffix}"
+        cls.xss_id = f"HTML-XSS-{suffix}"
+        with app.app_context():
+            user = User(username=f"preview_{suffix}", role="user")
+            user.set_password("secret")
+            db.session.add(user)
+            db.session.add(Quotation(
+                id=cls.xss_id, developer_type="category 1", project_region="Pune", plot_area=1,
+                developer_name="<script>alert(1)</script>", status="completed", headers=[
+                    {"name": "<img src=x onerror=alert(2)>", "services": [{"name": "Registration", "price": 1}]},
+                ]
+            ))
+            db.session.add(Quotation(
+                id=cls.quotation_id, developer_type="category 1", project_region="Pune", plot_area=1,
+                developer_name="Preview Developer", status="pending_approval", headers=[
+                    {"name": "Project Registration", "services": [{"name": "Registration", "price": 25000}]},
+                ]
+            ))
+            db.session.commit()
+            cls.user_id = user.id
+            cls.auth = {"Authorization": f"Bearer {generate_token(user)}"}
+
+    @classmethod
+    def tearDownClass(cls):
+        with app.app_context():
+            for quotation_id in (cls.quotation_id, cls.xss_id):
+                q = db.session.get(Quotation, quotation_id)
+                if q:
+                    db.session.delete(q)
+            user = db.session.get(User, cls.user_id)
+            if user:
+                db.session.delete(user)
+            db.session.commit()
+
+    def url(self, query=""):
+        return f"/api/quotations/{self.quotation_id}/preview.html{query}"
+
+    def get(self, url, headers=None):
+        return self.client.get(url, headers={**self.auth, **(headers or {})})
+
+    def test_01_summary_rendered_before_approval(self):
+        response = self.get(self.url("?summary=true"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, "text/html")
+        self.assertIn("default-src 'none'", response.headers["Content-Security-Policy"])
+        html = response.get_data(as_text=True)
+        self.assertIn("Registration", html)
+        self.assertIn("/api/pdf-assets/logo?v=", html)
+        self.assertNotIn("file://", html)
+
+    def test_02_cached_by_version(self):
+        first = self.get(self.url("?summary=true"))
+        with mock.patch.object(app_module.pdf_generator_module, "generator_for") as generator_for:
+            again = self.get(self.url("?summary=true"))
+            generator_for.assert_not_called()
+        self.assertEqual(again.get_data(), first.get_data())
+        self.assertEqual(self.get(self.url("?summary=true"),
+                                         headers={"If-None-Match": first.headers["ETag"]}).status_code, 304)
+
+        with app.app_context():
+            q = db.session.get(Quotation, self.quotation_id)
+            q.developer_name = "Renamed Developer"
+            db.session.commit()
+        changed = self.get(self.url("?summary=true"), headers={"If-None-Match": first.headers["ETag"]})
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed.headers["ETag"], first.headers["ETag"])
+
+    def test_03_inline_logo(self):
+        html = self.get(self.url("?inline=true")).get_data(as_text=True)
+        self.assertIn("data:image/", html)
+        self.assertNotIn("/api/pdf-assets/logo", html)
+
+    def test_04_logo_asset_cacheable(self):
+        html = self.get(self.url()).get_data(as_text=True)
+        start = html.index("/api/pdf-assets/logo?v=")
+        url = html[start:html.index('"', start)]
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("immutable", response.headers["Cache-Control"])
+        self.assertEqual(self.client.get(url, headers={"If-None-Match": response.headers["ETag"]}).status_code, 304)
+
+    def test_05_missing(self):
+        self.assertEqual(self.get("/api/quotations/NOPE-404/preview.html").status_code, 404)
+        if not os.path.exists(os.path.join(os.path.dirname(__file__), "quotation_multipage_template.html")):
+            self.assertEqual(self.get(self.url("?multipage=true")).status_code, 404)
+
+    def test_06_user_fields_escaped(self):
+        html = self.get(f"/api/quotations/{self.xss_id}/preview.html?summary=true").get_data(as_text=True)
+        self.assertNotIn("<script>alert(1)", html)
+        self.assertNotIn("<img src=x", html)
+        self.assertIn("&lt;script&gt;alert(1)&lt;/script&gt;", html)
+        self.assertIn("&lt;img src=x onerror=alert(2)&gt;", html)
+
+    def test_07_requires_token(self):
+        self.assertEqual(self.client.get(self.url("?summary=true")).status_code, 401)
+
+
+if __name__ == '__main__':
+    unittest.main()
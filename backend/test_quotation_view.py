@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Quotation view model tests
+Checks the shared price/total resolution, its per-version cache and the preview API
+"""
+
+import os
+import sys
+import unittest
+import uuid
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+import quotation_view
+from pdf_generator import QuotationPDFGenerator
+
+
+def sample(**overrides):
+    data = {
+        "id": "REQ 0007",
+        "version": 3,
+        "totalAmount": 0,
+        "displayMode": "bifurcated",
+        "headers": [
+            {"name": "Project Registration", "services": [
+                {"name": "Registration", "price": 100, "subServices": ["Form filing", {"name": ""},
+                                                                      {"name": "Hidden", "included": False}]},
+            ]},
+            {"name": "Package B", "services": [
+                {"name": "QPR", "price": 0},
+                {"name": "Audit", "price": 0},
+            ]},
+        ],
+        "pricingBreakdown": [
+            {"header": "Project Registration", "services": [{"name": "Registration", "finalAmount": 25000}]},
+            {"header": "Package B", "services": [{"name": "QPR", "finalAmount": 9000},
+                                                 {"name": "Audit", "finalAmount": 6000}]},
+        ],
+    }
+    data.update(overrides)
+    return data
+
+
+class TestQuotationView(unittest.TestCase):
+    """Test price resolution, cache reuse and that every layout sees the same numbers"""
+
+    def setUp(self):
+        quotation_view.views.clear()
+
+    def test_01_prices_and_totals(self):
+        view = quotation_view.build(sample())
+        registration, package = view["headers"]
+        self.assertEqual(registration["services"][0]["price"], 25000)
+        self.assertEqual(registration["services"][0]["subServices"], [{"id": "", "name": "Form filing"}])
+        self.assertTrue(package["is_package"])
+        self.assertEqual(package["package_total"], 15000)
+        self.assertEqual(view["total_amount"], 40000)
+        self.assertEqual(view["ref_number"], "REQ 0007")
+        self.assertEqual(view["summary_title"], "PROJECT REGISTRATION")
+
+    def test_02_lumpsum_hides_service_prices(self):
+        view = quotation_view.build(sample(displayMode="lumpsum"))
+        service = view["headers"][0]["services"][0]
+        self.assertIsNone(service["display_price"])
+        self.assertFalse(view["show_individual_prices"])
+
+    def test_03_stored_total_wins(self):
+        self.assertEqual(quotation_view.build(sample(totalAmount="52000"))["total_amount"], 52000)
+        no_breakdown = sample(pricingBreakdown=[])
+        self.assertEqual(quotation_view.build(no_breakdown)["total_amount"], 100)
+
+    def test_04_cached_per_version(self):
+        hits = quotation_view.views.hits
+        first = quotation_view.view_model(sample())
+        self.assertIs(quotation_view.view_model(sample()), first)
+        self.assertIsNot(quotation_view.view_model(sample(version=4)), first)
+        self.assertIsNot(quotation_view.view_model(sample(displayMode="lumpsum")), first)
+        self.assertEqual(quotation_view.views.hits - hits, 1)
+        unversioned = sample(version=None)
+        self.assertIsNot(quotation_view.view_model(unversioned), quotation_view.view_model(unversioned))
+
+    def test_05_layouts_share_numbers(self):
+        summary = QuotationPDFGenerator(use_summary_template=True, engine="reportlab").summary_context(sample())
+        multipage = QuotationPDFGenerator(use_multipage_template=True, engine="reportlab").multipage_context(sample())
+        self.assertEqual(summary["total_amount"], multipage["total_amount"])
+        self.assertEqual(summary["headers"], multipage["headers"])
+        self.assertEqual(summary["terms"], multipage["terms"])
+        self.assertEqual(multipage["page_title"], "PROJECT QUOTATION")
+
+    def test_06_preview_endpoint(self):
+        from app import app, db, User, Quotation, generate_token
+        quotation_id = f"VIEW-{uuid.uuid4().hex[:8]}"
+        with app.app_context():
+            user = User(username=f"view_{uuid.uuid4().hex[:8]}", role="user")
+            user.set_password("secret")
+            db.session.add(user)
+            db.session.add(Quotation(
+                id=quotation_id, developer_type="category 1", project_region="Pune", plot_area=1,
+                developer_name="View Developer", status="draft", headers=sample()["headers"],
+                pricing_breakdown=sample()["pricingBreakdown"]
+            ))
+            db.session.commit()
+            user_id = user.id
+            auth = {"Authorization": f"Bearer {generate_token(user)}"}
+        try:
+            client = app.test_client()
+            self.assertEqual(client.get(f"/api/quotations/{quotation_id}/preview").status_code, 401)
+            response = client.get(f"/api/quotations/{quotation_id}/preview", headers=auth)
+            self.assertEqual(response.status_code, 200)
+            data = response.get_json()["data"]
+            self.assertEqual(data["headers"][1]["package_total"], 15000)
+            self.assertEqual(client.get(f"/api/quotations/{quotation_id}/preview",
+                                        headers={"If-None-Match": response.headers["ETag"], **auth}).status_code, 304)
+            self.assertEqual(client.get("/api/quotations/NOPE-404/preview", headers=auth).status_code, 404)
+        finally:
+            with app.app_context():
+                db.session.delete(db.session.get(Quotation, quotation_id))
+                db.session.delete(db.session.get(User, user_id))
+                db.session.commit()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Quotation search tests
+Runs against the Flask test client - no live server required
+"""
+
+import unittest
+import uuid
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from app import app, db, User, Quotation, generate_token
+
+
+class TestQuotationSearch(unittest.TestCase):
+    """Test the FTS5-backed /api/quotations/search endpoint"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.client = app.test_client()
+        cls.suffix = uuid.uuid4().hex[:8]
+        cls.ids = [f"SRCH-{cls.suffix}-{i}" for i in range(3)]
+
+        with app.app_context():
+            user = User(username=f"search_{cls.suffix}", fname="Search", lname="Tester", role="user")
+            user.set_password("secret")
+            db.session.add(user)
+
+            db.session.add_all([
+                Quotation(
+                    id=cls.ids[0], developer_type="category 1", project_region="Mumbai City",
+                    plot_area=300, developer_name=f"Skyline{cls.suffix} Developers",
+                    project_name="Harbour Heights", rera_number=f"P5180{cls.suffix}",
+                    headers=[{"header": "Package A", "name": "Package A", "services": [
+                        {"id": "service-package-a-1", "name": "Quarterly Progress Report"}
+                    ]}]
+                ),
+                Quotation(
+                    id=cls.ids[1], developer_type="category 2", project_region="Pune",
+                    plot_area=800, developer_name=f"Riverside{cls.suffix} Builders",
+                    project_name=f"Skyline{cls.suffix} Towers",
+                    headers=[{"header": "Legal Services", "name": "Legal Services", "services": [
+                        {"id": "service-legal-1", "name": "LEGAL CONSULTATION"}
+                    ]}]
+                ),
+                Quotation(
+                    id=cls.ids[2], developer_type="category 3", project_region="Thane",
+                    plot_area=1200, developer_name=f"Unrelated{cls.suffix} Estates",
+                    headers=[]
+                ),
+            ])
+            db.session.commit()
+            cls.token = generate_token(user)
+            cls.user_id = user.id
+
+    @classmethod
+    def tearDownClass(cls):
+        with app.app_context():
+            for quotation_id in cls.ids:
+                q = db.session.get(Quotation, quotation_id)
+                if q:
+                    db.session.delete(q)
+            user = db.session.get(User, cls.user_id)
+            if user:
+                db.session.delete(user)
+            db.session.commit()
+
+    def search(self, **params):
+        response = self.client.get(
+            "/api/quotations/search",
+            query_string=params,
+            headers={"Authorization": f"Bearer {self.token}"}
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.get_json()
+
+    def test_01_prefix_match(self):
+        """Partial words match via prefix queries"""
+        data = self.search(q=f"riverside{self.suffix[:4]}")
+        self.assertEqual([q["id"] for q in data["quotations"]], [self.ids[1]])
+
+    def test_02_ranking_prefers_developer_name(self):
+        """Developer name hits rank above project name hits"""
+        data = self.search(q=f"skyline{self.suffix}")
+        self.assertEqual(data["total"], 2)
+        self.assertEqual([q["id"] for q in data["quotations"]], [self.ids[0], self.ids[1]])
+
+    def test_03_service_and_rera_fields(self):
+        """Selected service names and RERA numbers are searchable"""
+        data = self.search(q=f"quarterly skyline{self.suffix}")
+        self.assertEqual([q["id"] for q in data["quotations"]], [self.ids[0]])
+
+        data = self.search(q=f"P5180{self.suffix}")
+        self.assertEqual([q["id"] for q in data["quotations"]], [self.ids[0]])
+
+    def test_04_pagination(self):
+        """Results are paginated and report the overall total"""
+        data = self.search(q=f"skyline{self.suffix}", per_page=1, page=2)
+        self.assertEqual(data["total"], 2)
+        self.assertEqual([q["id"] for q in data["quotations"]], [self.ids[1]])
+
+    def test_05_index_follows_updates(self):
+        """Updating and deleting quotations keeps the index in sync"""
+        with app.app_context():
+            q = db.session.get(Quotation, self.ids[2])
+            q.project_name = f"Lakeview{self.suffix}"
+            db.session.commit()
+
+        data = self.search(q=f"lakeview{self.suffix}")
+        self.assertEqual([q["id"] for q in data["quotations"]], [self.ids[2]])
+
+    def test_06_empty_and_unsafe_queries(self):
+        """Blank queries and FTS syntax characters do not error"""
+        self.assertEqual(self.search(q="")["total"], 0)
+        self.assertEqual(self.search(q='"* OR ( NEAR')["quotations"], [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Service membership index tests
+Runs against the Flask test client - no live server required
+"""
+
+import unittest
+import uuid
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from sqlalchemy import text
+from app import app, db, User, Quotation, generate_token
+
+
+def header(name, *service_ids):
+    return {"header": name, "name": name, "services": [{"id": sid, "name": sid.upper()} for sid in service_ids]}
+
+
+class TestServiceIndex(unittest.TestCase):
+    """Test /api/quotations/by-service and /api/services/co-occurrence"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.client = app.test_client()
+        cls.suffix = uuid.uuid4().hex[:8]
+        cls.form5 = f"service-addon-form5-{cls.suffix}"
+        cls.liaison = f"service-addon-liaison-{cls.suffix}"
+        cls.legal = f"service-legal-{cls.suffix}"
+        cls.ids = [f"SVC-{cls.suffix}-{i}" for i in range(3)]
+        # Two distinct service ids recorded under one display name
+        cls.drafting = f"Drafting {cls.suffix}"
+        cls.drafting_ids = [f"service-drafting-{cls.suffix}-{i}" for i in range(2)]
+        cls.shared_ids = [f"SVC-{cls.suffix}-shared-{i}" for i in range(2)]
+
+        with app.app_context():
+            user = User(username=f"svc_{cls.suffix}", role="user")
+            user.set_password("secret")
+            db.session.add(user)
+
+            # Raw headers are stored as-is so the test controls the service ids
+            rows = [
+                [header("Package C", cls.form5, cls.liaison)],
+                [header("Package A", cls.liaison), header("Legal Services", cls.legal)],
+                [header("Customized Header", cls.form5)],
+            ]
+            for quotation_id, headers in zip(cls.ids, rows):
+                db.session.add(Quotation(
+                    id=quotation_id, developer_type="category 1", project_region="Mumbai City",
+                    plot_area=500, developer_name="Index Test", headers=headers
+                ))
+            shared_rows = [
+                [{"header": "Legal Services", "name": "Legal Services", "services": [
+                    {"id": cls.drafting_ids[0], "name": cls.drafting}, {"id": cls.legal, "name": cls.legal.upper()}]}],
+                [{"header": "Legal Services", "name": "Legal Services", "services": [
+                    {"id": cls.drafting_ids[1], "name": cls.drafting}]}],
+            ]
+            for quotation_id, headers in zip(cls.shared_ids, shared_rows):
+                db.session.add(Quotation(
+                    id=quotation_id, developer_type="category 1", project_region="Mumbai City",
+                    plot_area=500, developer_name="Index Test", headers=headers
+                ))
+            db.session.commit()
+            cls.token = generate_token(user)
+            cls.user_id = user.id
+
+    @classmethod
+    def tearDownClass(cls):
+        with app.app_context():
+            for quotation_id in cls.ids + cls.shared_ids:
+                q = db.session.get(Quotation, quotation_id)
+                if q:
+                    db.session.delete(q)
+            user = db.session.get(User, cls.user_id)
+            if user:
+                db.session.delete(user)
+            db.session.commit()
+
+    def get(self, path, **params):
+        response = self.client.get(path, query_string=params,
+                                   headers={"Authorization": f"Bearer {self.token}"})
+        self.assertEqual(response.status_code, 200, response.get_data(as_text=True))
+        return response.get_json()
+
+    def ids_for(self, **params):
+        data = self.get("/api/quotations/by-service", **params)
+        return sorted(q["id"] for q in data["quotations"])
+
+    def test_01_membership(self):
+        """Quotations including a single service"""
+        self.assertEqual(self.ids_for(service=self.form5), [self.ids[0], self.ids[2]])
+
+    def test_02_all_vs_any(self):
+        """match=all requires every service, match=any at least one"""
+        self.assertEqual(self.ids_for(service=[self.form5, self.liaison]), [self.ids[0]])
+        self.assertEqual(self.ids_for(service=[self.form5, self.liaison], match="any"), self.ids)
+
+    def test_02_all_normalizes_ids_and_names(self):
+        """An id, its display name and repeats count as one service; an unknown service matches nothing"""
+        self.assertEqual(self.ids_for(service=[self.form5, self.form5.upper(), self.form5]), [self.ids[0], self.ids[2]])
+        self.assertEqual(self.ids_for(service=[self.form5, self.liaison.upper()]), [self.ids[0]])
+        self.assertEqual(self.ids_for(service=[self.form5, f"no-such-service-{self.suffix}"]), [])
+
+    def test_02_all_name_covering_several_ids(self):
+        """A name recorded under several ids needs one hit among them, not all of them"""
+        self.assertEqual(self.ids_for(service=self.drafting), self.shared_ids)
+        self.assertEqual(self.ids_for(service=[self.drafting, self.legal]), [self.shared_ids[0]])
+        self.assertEqual(self.ids_for(service=[self.drafting_ids[1], self.drafting]), [self.shared_ids[1]])
+        self.assertEqual(self.ids_for(service=[self.drafting_ids[1], self.legal]), [])
+
+    def test_03_header_filters(self):
+        """Package C quotations with add-ons, and header type filtering"""
+        self.assertEqual(self.ids_for(service=self.liaison, header="Package C"), [self.ids[0]])
+        self.assertEqual(self.ids_for(service=self.form5, headerType="customized"), [self.ids[2]])
+
+    def test_04_co_occurrence(self):
+        """Services appearing together with a given service"""
+        data = self.get("/api/services/co-occurrence", service=self.liaison)
+        self.assertEqual(data["quotations"], 2)
+        related = {r["serviceId"]: r["quotations"] for r in data["related"]}
+        self.assertEqual(related, {self.form5: 1, self.legal: 1})
+
+    def test_05_index_follows_header_updates(self):
+        """Replacing headers rewrites the membership rows"""
+        with app.app_context():
+            q = db.session.get(Quotation, self.ids[1])
+            q.headers = [header("Legal Services", self.legal, self.form5)]
+            db.session.commit()
+
+        self.assertEqual(self.ids_for(service=self.form5), self.ids)
+        self.assertEqual(self.ids_for(service=self.liaison), [self.ids[0]])
+
+    def test_06_query_uses_index(self):
+        """Membership lookups are index searches, not table scans"""
+        with app.app_context():
+            plan = db.session.execute(text(
+                "EXPLAIN QUERY PLAN SELECT quotation_id FROM quotation_service WHERE service_id = :s"
+            ), {"s": self.form5}).all()
+        detail = " ".join(str(row[-1]) for row in plan)
+        self.assertIn("USING", detail)
+        self.assertNotIn("SCAN quotation_service", detail)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Validity / expiry tests
+Runs against the Flask test client - no live server required
+"""
+
+import unittest
+import uuid
+import os
+import sys
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+import testing_db
+testing_db.use_temporary_database()
+
+from validity import parse_validity_days, valid_until_for
+from app import app, db, User, Quotation, audit_writer, generate_token, run_expiry_job
+
+
+class TestParseValidity(unittest.TestCase):
+    """Validity strings are parsed once, in one place"""
+
+    def test_parse(self):
+        self.assertEqual(parse_validity_days("7 days"), 7)
+        self.assertEqual(parse_validity_days("17 days"), 17)
+        self.assertEqual(parse_validity_days("2 weeks"), 14)
+        self.assertEqual(parse_validity_days("1 month"), 30)
+        self.assertIsNone(parse_validity_days("until further notice"))
+        self.assertIsNone(parse_validity_days(None))
+
+    def test_valid_until_for_prefers_stored_value(self):
+        data = {"validUntil": "2025-01-10T00:00:00", "validity": "30 days", "createdAt": "2025-01-01T00:00:00"}
+        self.assertEqual(valid_until_for(data), datetime(2025, 1, 10))
+        del data["validUntil"]
+        self.assertEqual(valid_until_for(data), datetime(2025, 1, 31))
+
+
+class TestExpiry(unittest.TestCase):
+    """Test valid_until tracking, the expiry job and list filters"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.client = app.test_client()
+        cls.suffix = uuid.uuid4().hex[:8]
+        cls.ids = [f"VAL-{cls.suffix}-{i}" for i in range(4)]
+        old = datetime.utcnow() - timedelta(days=20)
+
+        with app.app_context():
+            user = User(username=f"val_{cls.suffix}", role="user")
+            user.set_password("secret")
+            db.session.add(user)
+            db.session.add_all([
+                Quotation(id=cls.ids[0], developer_type="category 1", project_region="Pune", plot_area=1,
+                          developer_name="Validity Test", validity="7 days", created_at=old,
+                          status="pending_approval", requires_approval=True),
+                Quotation(id=cls.ids[1], developer_type="category 1", project_region="Pune", plot_area=1,
+                          developer_name="Validity Test", validity="30 days", created_at=old),
+                Quotation(id=cls.ids[2], developer_type="category 1", project_region="Pune", plot_area=1,
+                          developer_name="Validity Test", validity="7 days", created_at=old, status="rejected"),
+                Quotation(id=cls.ids[3], developer_type="category 1", project_region="Pune", plot_area=1,
+                          developer_name="Validity Test", validity="7 days", created_at=old, status="completed"),
+            ])
+            db.session.commit()
+            cls.token = generate_token(user)
+            cls.user_id = user.id
+            cls.old = old
+
+    @classmethod
+    def tearDownClass(cls):
+        with app.app_context():
+            for quotation_id in cls.ids:
+                q = db.session.get(Quotation, quotation_id)
+                if q:
+                    db.session.delete(q)
+            user = db.session.get(User, cls.user_id)
+            if user:
+                db.session.delete(user)
+            db.session.commit()
+
+    def test_01_valid_until_computed_on_write(self):
+        with app.app_context():
+            q = db.session.get(Quotation, self.ids[1])
+            self.assertEqual(q.valid_until, self.old + timedelta(days=30))
+            q.validity = "15 days"
+            db.session.commit()
+            self.assertEqual(q.valid_until, self.old + timedelta(days=15))
+            self.assertEqual(q.to_dict()["validUntil"], (self.old + timedelta(days=15)).isoformat())
+
+    def test_02_expiry_job(self):
+        """Lapsed open quotations expire in one pass; rejected and completed ones are left alone"""
+        with app.app_context():
+            expired = {row['id'] for row in run_expiry_job()}
+            self.assertIn(self.ids[0], expired)
+            self.assertIn(self.ids[1], expired)
+            self.assertNotIn(self.ids[2], expired)
+            self.assertNotIn(self.ids[3], expired)
+
+            q = db.session.get(Quotation, self.ids[0])
+            self.assertEqual(q.status, "expired")
+            self.assertFalse(q.requires_approval)
+            self.assertEqual(q.version, 2)
+
+        audit_writer.flush()
+        response = self.client.get(f"/api/quotations/{self.ids[0]}/history",
+                                   headers={"Authorization": f"Bearer {self.token}"})
+        last = response.get_json()["data"][-1]
+        self.assertEqual(last["action"], "expired")
+        self.assertEqual(last["changes"]["status"], {"from": "pending_approval", "to": "expired"})
+
+    def test_03_list_filter(self):
+        response = self.client.get("/api/quotations", query_string={"expired": "true"},
+                                   headers={"Authorization": f"Bearer {self.token}"})
+        ids = {q["id"] for q in response.get_json()["quotations"]}
+        self.assertTrue(set(self.ids) <= ids)
+
+        response = self.client.get("/api/quotations", query_string={"expired": "false"},
+                                   headers={"Authorization": f"Bearer {self.token}"})
+        ids = {q["id"] for q in response.get_json()["quotations"]}
+        self.assertFalse(set(self.ids) & ids)
+
+
+if __name__ == '__main__':
+    unittest.main()
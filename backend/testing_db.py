@@ -0,0 +1,32 @@
+"""
+Throwaway SQLite database for the test suite
+Import before app so it binds to a temp file instead of the shared dev database
+(quotation_event is append-only, so rows written there could never be cleaned up)
+"""
+
+import atexit
+import os
+import shutil
+import tempfile
+
+_directory = None
+
+
+def use_temporary_database():
+    """Point DATABASE_URL at a fresh temp file unless one is already configured"""
+    global _directory
+    if _directory or os.environ.get("DATABASE_URL"):
+        return
+    _directory = tempfile.mkdtemp(prefix="quotations-test-")
+    os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(_directory, "quotations.db")
+    os.environ.setdefault("AUDIT_SPILL_PATH", os.path.join(_directory, "audit_spill.ndjson"))
+    # Registered before app is imported, so it runs after the audit writer's exit flush
+    atexit.register(remove_temporary_database)
+
+
+def remove_temporary_database():
+    """Delete the temp database created by use_temporary_database, if any"""
+    global _directory
+    if _directory:
+        shutil.rmtree(_directory, ignore_errors=True)
+        _directory = None
@@ -0,0 +1,71 @@
+# validity.py - Turn free-text validity ("7 days", "2 weeks") into a concrete valid-until date
+import re
+from datetime import datetime, timedelta
+
+from sqlalchemy import event, inspect
+
+_UNIT_DAYS = (('week', 7), ('month', 30), ('year', 365))
+
+
+def parse_validity_days(validity):
+    """Number of days a validity string covers, or None when it has no number"""
+    if validity is None:
+        return None
+    if isinstance(validity, (int, float)):
+        return int(validity) if validity > 0 else None
+
+    text = str(validity).lower()
+    match = re.search(r'\d+', text)
+    if not match:
+        return None
+    days = int(match.group())
+    for unit, multiplier in _UNIT_DAYS:
+        if unit in text:
+            days *= multiplier
+            break
+    return days if days > 0 else None
+
+
+def compute_valid_until(created_at, validity):
+    days = parse_validity_days(validity)
+    if not days or created_at is None:
+        return None
+    return created_at + timedelta(days=days)
+
+
+def valid_until_for(quotation_data):
+    """
+    Valid-until date for a serialized quotation: the stored validUntil when present,
+    otherwise derived from validity and createdAt (older payloads, previews).
+    """
+    stored = quotation_data.get('validUntil')
+    if stored:
+        try:
+            return datetime.fromisoformat(str(stored).replace('Z', '+00:00')).replace(tzinfo=None)
+        except ValueError:
+            pass
+
+    created_at = quotation_data.get('createdAt')
+    try:
+        base_date = (datetime.fromisoformat(str(created_at).replace('Z', '+00:00')).replace(tzinfo=None)
+                     if created_at else datetime.now())
+    except ValueError:
+        base_date = datetime.now()
+    return compute_valid_until(base_date, quotation_data.get('validity') or quotation_data.get('validityPeriod'))
+
+
+def register(quotation_model):
+    """Keep valid_until in step with validity and created_at on every write"""
+
+    def on_insert(mapper, connection, target):
+        if target.created_at is None:
+            target.created_at = datetime.utcnow()
+        target.valid_until = compute_valid_until(target.created_at, target.validity)
+
+    def on_update(mapper, connection, target):
+        state = inspect(target)
+        if state.attrs.validity.history.has_changes() or state.attrs.created_at.history.has_changes():
+            target.valid_until = compute_valid_until(target.created_at, target.validity)
+
+    event.listen(quotation_model, 'before_insert', on_insert)
+    event.listen(quotation_model, 'before_update', on_update)
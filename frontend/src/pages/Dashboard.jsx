@@ -1,4 +1,4 @@
-import React, { useEffect, useState, useMemo } from "react";
+import React, { useEffect, useRef, useState } from "react";
 import { useNavigate } from "react-router-dom";
 import {
   Container,
@@ -49,14 +49,23 @@ export default function Dashboard() {
 
   const [quotations, setQuotations] = useState([]);
   const [pending, setPending] = useState([]);
+  const [quotationTotal, setQuotationTotal] = useState(0);
+  const [pendingTotal, setPendingTotal] = useState(0);
+  const [quotationPage, setQuotationPage] = useState(1);
+  const [pendingPage, setPendingPage] = useState(1);
+  const [tabCounts, setTabCounts] = useState({ all: 0, pending: 0 });
+  const [loadingMore, setLoadingMore] = useState(false);
   const [activeTab, setActiveTab] = useState(0);
   const [user, setUser] = useState(null);
   const [showApprovalModal, setShowApprovalModal] = useState(false);
   const [selectedQuotation, setSelectedQuotation] = useState(null);
   const [approvalAction, setApprovalAction] = useState("approve");
+  const [approvalReason, setApprovalReason] = useState("");
 
   const [unifiedSearch, setUnifiedSearch] = useState("");
   const [sortConfig, setSortConfig] = useState({ key: null, direction: "asc" });
+  // Query string each tab's rows were last loaded with
+  const loadedQuery = useRef({});
 
   const { getDisplayModeForAPI, getDisplayModeDescription } = useDisplayMode();
   const role = localStorage.getItem("role");
@@ -101,6 +110,7 @@ export default function Dashboard() {
       rejected: { label: "Rejected", color: "error" },
       pending_approval: { label: "Pending", color: "warning" },
       draft: { label: "Draft", color: "default" },
+      expired: { label: "Expired", color: "default" },
     };
 
     const config = statusConfig[displayStatus] || {
@@ -118,116 +128,83 @@ export default function Dashboard() {
     );
   };
 
-  const fetchProfile = async () => {
-    if (token) {
-      try {
-        const res = await fetch("http://localhost:3001/api/me", {
-          headers: { Authorization: `Bearer ${token}` },
-        });
-        const data = await res.json();
-        if (res.ok) {
-          setUser(data);
-        } else {
-          handleLogout();
-        }
-      } catch (error) {
-        console.error("Failed to fetch profile:", error);
-        handleLogout();
-      }
+  // Search and sort run on the server so they cover every quotation, not just the pages loaded so far
+  const listParams = (tab, page, search = unifiedSearch, sort = sortConfig) => {
+    const params = new URLSearchParams({ view: "list", page: String(page), per_page: "50" });
+    if (tab === 1) params.set("requiresApproval", "true");
+    if (search.trim()) params.set("q", search.trim());
+    if (sort.key) {
+      params.set("sort", sort.key);
+      params.set("order", sort.direction);
+    }
+    return params.toString();
+  };
+
+  const fetchQuotationPage = async (tab, page) => {
+    const res = await fetch(`http://localhost:3001/api/quotations?${listParams(tab, page)}`, {
+      headers: { Authorization: `Bearer ${token}` },
+    });
+    const data = await res.json();
+    if (!res.ok) {
+      throw new Error(data.error || `HTTP ${res.status}`);
     }
+    return data;
   };
 
-  const fetchQuotations = async () => {
+  // Profile, first page of quotations, status counts and the pending queue head in one request
+  const fetchBootstrap = async () => {
+    if (!token) return;
     try {
-      const res = await fetch("http://localhost:3001/api/quotations", {
+      const res = await fetch("http://localhost:3001/api/dashboard/bootstrap", {
         headers: { Authorization: `Bearer ${token}` },
       });
       const data = await res.json();
-      if (res.ok) setQuotations(data.quotations || data.data);
+      if (!res.ok) {
+        handleLogout();
+        return;
+      }
+      setQuotations(data.quotations.items || []);
+      setQuotationTotal(data.quotations.total || 0);
+      setQuotationPage(1);
+      setPending(data.pending?.items || []);
+      setPendingTotal(data.pending?.total || 0);
+      setPendingPage(1);
+      setTabCounts({ all: data.quotations.total || 0, pending: data.pending?.total || 0 });
+      // Bootstrap rows are unfiltered and newest first; an active search or sort reloads them
+      loadedQuery.current = {
+        0: listParams(0, 1, "", { key: null }),
+        1: listParams(1, 1, "", { key: null }),
+      };
+      setUser(data.profile);
     } catch (error) {
-      console.error("Failed to fetch quotations:", error);
+      console.error("Failed to load dashboard:", error);
+      handleLogout();
     }
   };
 
-  const fetchPending = async () => {
-    if (role === "admin" || role === "manager") {
-      try {
-        const res = await fetch("http://localhost:3001/api/quotations/pending", {
-          headers: { Authorization: `Bearer ${token}` },
-        });
-        const data = await res.json();
-        if (res.ok) {
-          setPending(data.data);
-        } else if (res.status === 403) {
-          setPending([]);
-        }
-      } catch (error) {
-        console.error("Failed to fetch pending quotations:", error);
+  const loadMoreQuotations = async () => {
+    setLoadingMore(true);
+    try {
+      if (activeTab === 1) {
+        const data = await fetchQuotationPage(1, pendingPage + 1);
+        setPending((current) => [...current, ...(data.quotations || [])]);
+        setPendingTotal(data.total || 0);
+        setPendingPage(pendingPage + 1);
+      } else {
+        const data = await fetchQuotationPage(0, quotationPage + 1);
+        setQuotations((current) => [...current, ...(data.quotations || [])]);
+        setQuotationTotal(data.total || 0);
+        setQuotationPage(quotationPage + 1);
       }
+    } catch (error) {
+      console.error("Failed to fetch more quotations:", error);
+    } finally {
+      setLoadingMore(false);
     }
   };
 
-  // Unified search with filter and sort
-  const filteredAndSortedData = useMemo(() => {
-    let data = activeTab === 1 ? pending : quotations;
-
-    if (unifiedSearch) {
-      const searchLower = unifiedSearch.toLowerCase();
-      data = data.filter((q) => {
-        const searchableFields = [
-          q.id?.toString(),
-          q.projectName,
-          q.developerName,
-          q.promoterName,
-          q.status,
-          q.createdBy,
-          q.approvedBy,
-          q.totalAmount?.toString(),
-          ...(q.headers || []).flatMap((header) =>
-            (header.services || []).map((service) => service.name || service.serviceName)
-          ),
-        ];
-
-        const searchableText = searchableFields
-          .filter((field) => field != null && field !== undefined)
-          .join(" ")
-          .toLowerCase();
-
-        return searchableText.includes(searchLower);
-      });
-    }
-
-    if (sortConfig.key) {
-      data = [...data].sort((a, b) => {
-        let aValue = a[sortConfig.key];
-        let bValue = b[sortConfig.key];
-
-        if (sortConfig.key === "createdAt") {
-          aValue = new Date(aValue);
-          bValue = new Date(bValue);
-        } else if (
-          sortConfig.key === "totalAmount" ||
-          sortConfig.key === "effectiveDiscountPercent"
-        ) {
-          aValue = Number(aValue) || 0;
-          bValue = Number(bValue) || 0;
-        } else {
-          aValue = String(aValue || "").toLowerCase();
-          bValue = String(bValue || "").toLowerCase();
-        }
-
-        if (aValue < bValue) {
-          return sortConfig.direction === "asc" ? -1 : 1;
-        }
-        if (aValue > bValue) {
-          return sortConfig.direction === "asc" ? 1 : -1;
-        }
-        return 0;
-      });
-    }
-
-    return data;
-  }, [quotations, pending, activeTab, unifiedSearch, sortConfig]);
+  const tableData = activeTab === 1 ? pending : quotations;
+  const tableTotal = activeTab === 1 ? pendingTotal : quotationTotal;
 
   const handleSort = (key) => {
     let direction = "asc";
@@ -246,6 +223,7 @@ export default function Dashboard() {
     }
     setSelectedQuotation(quotation);
     setApprovalAction(action);
+    setApprovalReason("");
     setShowApprovalModal(true);
   };
 
@@ -261,14 +239,13 @@ export default function Dashboard() {
             "Content-Type": "application/json",
             Authorization: `Bearer ${token}`,
           },
-          body: JSON.stringify({ action: approvalAction }),
+          body: JSON.stringify({ action: approvalAction, reason: approvalReason.trim() || undefined }),
         }
       );
 
       const data = await res.json();
       if (res.ok) {
-        fetchPending();
-        fetchQuotations();
+        fetchBootstrap();
         setShowApprovalModal(false);
         setSelectedQuotation(null);
         alert(`Quotation ${approvalAction}d successfully!`);
@@ -446,11 +423,94 @@ export default function Dashboard() {
       navigate("/login");
       return;
     }
-    fetchProfile();
-    fetchQuotations();
-    fetchPending();
+    fetchBootstrap();
   }, [token, navigate]);
 
+  // Reload the active tab's first page when its search or sort changes (debounced while typing)
+  useEffect(() => {
+    if (!user) return;
+    const query = listParams(activeTab, 1);
+    if (loadedQuery.current[activeTab] === query) return;
+    let cancelled = false;
+    const timer = setTimeout(async () => {
+      try {
+        const data = await fetchQuotationPage(activeTab, 1);
+        if (cancelled) return;
+        loadedQuery.current[activeTab] = query;
+        if (activeTab === 1) {
+          setPending(data.quotations || []);
+          setPendingTotal(data.total || 0);
+          setPendingPage(1);
+        } else {
+          setQuotations(data.quotations || []);
+          setQuotationTotal(data.total || 0);
+          setQuotationPage(1);
+        }
+      } catch (error) {
+        console.error("Failed to search quotations:", error);
+      }
+    }, 300);
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
+  }, [user, activeTab, unifiedSearch, sortConfig]);
+
+  // Status transitions are pushed over SSE instead of polling; bursts collapse into one refresh
+  useEffect(() => {
+    if (!token) return;
+    let source = null;
+    let lastEventId = null;
+    let cancelled = false;
+    let refreshTimer = null;
+    let reconnectTimer = null;
+    const scheduleRefresh = (event) => {
+      lastEventId = event.lastEventId || lastEventId;
+      clearTimeout(refreshTimer);
+      refreshTimer = setTimeout(fetchBootstrap, 300);
+    };
+    const reconnect = () => {
+      clearTimeout(reconnectTimer);
+      reconnectTimer = setTimeout(connect, 5000);
+    };
+    // EventSource cannot send headers, so the URL carries a short-lived stream-only token
+    const connect = async () => {
+      try {
+        const res = await fetch("http://localhost:3001/api/events/token", {
+          method: "POST",
+          headers: { Authorization: `Bearer ${token}` },
+        });
+        if (cancelled) return;
+        if (!res.ok) {
+          reconnect();
+          return;
+        }
+        const data = await res.json();
+        if (cancelled) return;
+        const params = new URLSearchParams({ token: data.token });
+        if (lastEventId) params.set("lastEventId", lastEventId);
+        source = new EventSource(`http://localhost:3001/api/events/stream?${params}`);
+        ["created", "pending_approval", "approved", "rejected", "completed", "draft", "expired"].forEach((type) =>
+          source.addEventListener(type, scheduleRefresh)
+        );
+        // The browser retries dropped connections with the same URL; once the stream
+        // token has expired that retry is refused, so fetch a new token and resume
+        source.onerror = () => {
+          if (source.readyState === EventSource.CLOSED) reconnect();
+        };
+      } catch (error) {
+        if (!cancelled) reconnect();
+      }
+    };
+    connect();
+    return () => {
+      cancelled = true;
+      clearTimeout(refreshTimer);
+      clearTimeout(reconnectTimer);
+      if (source) source.close();
+    };
+  }, [token]);
+
   if (!user) {
     return (
       <Container maxWidth="xl" sx={{ py: 4 }}>
@@ -540,7 +600,7 @@ export default function Dashboard() {
             <TextField
               fullWidth
               variant="outlined"
-              placeholder="Search across all columns (ID, Project, Promoter, Services, Created By, Approved By...)"
+              placeholder="Search by ID, project, promoter, RERA number, contact, services or created by"
               value={unifiedSearch}
               onChange={(e) => setUnifiedSearch(e.target.value)}
               size="small"
@@ -575,7 +635,7 @@ export default function Dashboard() {
             <Stack direction="row" spacing={2} justifyContent="flex-end" alignItems="center">
               {unifiedSearch && (
                 <Alert severity="info" sx={{ py: 0.5 }}>
-                  Showing {filteredAndSortedData.length} of {activeTab === 1 ? pending.length : quotations.length} quotations
+                  {tableTotal} matching quotation{tableTotal === 1 ? "" : "s"}
                 </Alert>
               )}
               <Tooltip title={`PDF downloads will use: ${getDisplayModeDescription()}`}></Tooltip>
@@ -587,9 +647,9 @@ export default function Dashboard() {
       {/* Tabs */}
       <Box sx={{ borderBottom: 1, borderColor: "divider", mb: 2 }}>
         <Tabs value={activeTab} onChange={handleTabChange}>
-          <Tab label={`ALL QUOTATIONS (${quotations.length})`} sx={{ textTransform: "none", fontWeight: "bold" }} />
+          <Tab label={`ALL QUOTATIONS (${tabCounts.all})`} sx={{ textTransform: "none", fontWeight: "bold" }} />
           {(role === "admin" || role === "manager") && (
-            <Tab label={`PENDING APPROVAL (${pending.length})`} sx={{ textTransform: "none", fontWeight: "bold" }} />
+            <Tab label={`PENDING APPROVAL (${tabCounts.pending})`} sx={{ textTransform: "none", fontWeight: "bold" }} />
           )}
         </Tabs>
       </Box>
@@ -687,7 +747,7 @@ export default function Dashboard() {
           </TableHead>
 
           <TableBody>
-            {filteredAndSortedData.length === 0 ? (
+            {tableData.length === 0 ? (
               <TableRow>
                 <TableCell
                   colSpan={activeTab === 1 && (role === "admin" || role === "manager") ? 11 : 10}
@@ -702,7 +762,7 @@ export default function Dashboard() {
                 </TableCell>
               </TableRow>
             ) : (
-              filteredAndSortedData.map((q) => {
+              tableData.map((q) => {
                 const serviceInfo = getServicesSummary(q);
                 return (
                   <TableRow key={q.id}>
@@ -798,6 +858,14 @@ export default function Dashboard() {
         </Table>
       </TableContainer>
 
+      {tableData.length < tableTotal && (
+        <Box sx={{ display: "flex", justifyContent: "center", mt: 2 }}>
+          <Button variant="outlined" onClick={loadMoreQuotations} disabled={loadingMore} sx={{ textTransform: "none" }}>
+            {loadingMore ? "Loading..." : `Load more (${tableData.length} of ${tableTotal})`}
+          </Button>
+        </Box>
+      )}
+
       {/* Approval Modal */}
       <Dialog
         open={showApprovalModal}
@@ -929,6 +997,16 @@ export default function Dashboard() {
               </Card>
             </Stack>
           )}
+          <TextField
+            label={approvalAction === "approve" ? "Approval note (optional)" : "Reason for rejection"}
+            value={approvalReason}
+            onChange={(e) => setApprovalReason(e.target.value)}
+            fullWidth
+            multiline
+            minRows={2}
+            size="small"
+            sx={{ mt: 2 }}
+          />
         </DialogContent>
         <DialogActions sx={{ px: 3, pb: 2 }}>
           <Button